@@ -0,0 +1,100 @@
+# =======================================================================================
+# ADVISOR FEATURES: SIDEBAR ANSWERS -> MODEL FEATURE ROWS
+# =======================================================================================
+#
+# One definition of the advisor's input space and scores. The page uses it for one set of
+# answers; offline tools use it for many: distillation samples the whole space, and the
+# peer index scores every surveyed workplace exactly as the page would.
+
+import numpy as np
+import pandas as pd
+
+AGE_RANGE = (18, 80)
+GENDERS = ['Female', 'Male', 'Other']
+# Free-text gender normalization of survey.csv, as in generate_clean_csv.py
+MALE_ANSWERS = {'male', 'm', 'male (cis)', 'man'}
+FEMALE_ANSWERS = {'female', 'f', 'woman', 'female (cis)'}
+ENCODING_MAPS = {
+    'no_employees': {'1-5': 0, '6-25': 1, '26-100': 2, '100-500': 3, '500-1000': 4, 'More than 1000': 5},
+    'benefits': {'Yes': 1, 'No': 0, "Don't know": -1},
+    'care_options': {'Yes': 1, 'No': 0, "Not sure": -1},
+    'wellness_program': {'Yes': 1, 'No': 0, "Don't know": -1},
+    'seek_help': {'Yes': 1, 'No': 0, "Don't know": -1},
+    'anonymity': {'Yes': 1, 'No': 0, "Don't know": -1},
+    'tech_company': {'Yes': 1, 'No': 0},
+    'remote_work': {'Yes': 1, 'No': 0},
+    'family_history': {'Yes': 1, 'No': 0},
+    'leave': {'Very difficult': -2, 'Somewhat difficult': -1, "Don't know": 0, 'Somewhat easy': 1, 'Very easy': 2},
+    'mental_health_consequence': {'No': 2, 'Maybe': 1, 'Yes': 0},
+    'phys_health_consequence': {'No': 2, 'Maybe': 1, 'Yes': 0},
+    'coworkers': {'Yes': 2, 'Some of them': 1, 'No': 0},
+    'supervisor': {'Yes': 2, 'Some of them': 1, 'No': 0},
+    'mental_vs_physical': {'Yes': 1, 'No': 0, "Don't know": -1}
+}
+
+
+def encode_inputs(inputs):
+    """Model feature row for the raw sidebar answers"""
+    input_data = {'Age': inputs['age']}
+    input_data.update({name: mapping[inputs[name]] for name, mapping in ENCODING_MAPS.items()})
+    input_data['Gender_male'] = 1 if inputs['gender'] == 'Male' else 0
+    input_data['Gender_other'] = 1 if inputs['gender'] == 'Other' else 0
+    return input_data
+
+
+def calculate_wellness_scores(inputs):
+    """Calculate comprehensive wellness scores"""
+    
+    # Support Infrastructure Score
+    support_components = {
+        'benefits': 4 if inputs['benefits'] == 'Yes' else 1 if inputs['benefits'] == "Don't know" else 0,
+        'anonymity': 3 if inputs['anonymity'] == 'Yes' else 1 if inputs['anonymity'] == "Don't know" else 0,
+        'leave_ease': 3 if inputs['leave'] in ['Very easy', 'Somewhat easy'] else 1 if inputs['leave'] == "Don't know" else 0,
+        'care_awareness': 2 if inputs['care_options'] == 'Yes' else 1 if inputs['care_options'] == 'Not sure' else 0
+    }
+    
+    # Cultural Openness Score  
+    culture_components = {
+        'no_consequences': 4 if inputs['mental_health_consequence'] == 'No' else 2 if inputs['mental_health_consequence'] == 'Maybe' else 0,
+        'supervisor_comfort': 3 if inputs['supervisor'] == 'Yes' else 2 if inputs['supervisor'] == 'Some of them' else 0,
+        'peer_comfort': 2 if inputs['coworkers'] == 'Yes' else 1 if inputs['coworkers'] == 'Some of them' else 0,
+        'equality': 2 if inputs['mental_vs_physical'] == 'Yes' else 1 if inputs['mental_vs_physical'] == "Don't know" else 0
+    }
+    
+    support_score = sum(support_components.values()) / 12 * 100
+    culture_score = sum(culture_components.values()) / 11 * 100
+    
+    return support_score, culture_score, support_components, culture_components
+
+
+def sample_input_grid(rows, seed=0):
+    """`rows` encoded feature rows, each a uniformly random combination of sidebar answers"""
+    rng = np.random.default_rng(seed)
+    grid = {'Age': rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, rows)}
+    grid.update({name: rng.choice(list(mapping.values()), rows) for name, mapping in ENCODING_MAPS.items()})
+    gender = rng.choice(GENDERS, rows)
+    grid['Gender_male'] = (gender == 'Male').astype(int)
+    grid['Gender_other'] = (gender == 'Other').astype(int)
+    return pd.DataFrame(grid)
+
+
+def survey_inputs(responses):
+    """Sidebar answers for survey-format rows (survey.csv columns), plus the positions of the rows kept
+
+    Rows with an age outside AGE_RANGE or an answer the sidebar does not offer are dropped.
+    """
+    age = pd.to_numeric(responses['Age'], errors='coerce')
+    gender = responses['Gender'].astype(str).str.strip().str.lower()
+    inputs, kept = [], []
+    for i in range(len(responses)):
+        if not AGE_RANGE[0] <= age.iloc[i] <= AGE_RANGE[1]:
+            continue
+        answers = {name: responses[name].iloc[i] for name in ENCODING_MAPS}
+        if any(answer not in ENCODING_MAPS[name] for name, answer in answers.items()):
+            continue
+        g = gender.iloc[i]
+        answers['gender'] = 'Male' if g in MALE_ANSWERS else 'Female' if g in FEMALE_ANSWERS else 'Other'
+        answers['age'] = int(age.iloc[i])
+        inputs.append(answers)
+        kept.append(i)
+    return inputs, kept
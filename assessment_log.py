@@ -0,0 +1,482 @@
+# =======================================================================================
+# ASSESSMENT LOG: APPEND-ONLY, ANONYMIZED ADVISOR RESULTS WITH COLUMNAR COMPACTION
+# =======================================================================================
+#
+# Usage:
+#   python assessment_log.py                                   # segment and row summary
+#   python assessment_log.py --compact                         # compact sealed segments now
+#   python assessment_log.py --where probability=70: --csv high_risk.csv
+#
+# Each record holds the encoded model features, the model probability and prediction, the
+# wellness scores and the assessment latency, with a timestamp truncated to the minute.
+# Nothing else from the session (names, free text, chat, IPs) is logged.
+# append() only puts the record on a queue, so the request thread never touches the disk.
+# A writer thread drains the queue in batches of up to BATCH_ROWS (or every FLUSH_SECONDS)
+# and appends them as JSON lines to its open segment, segment-N.open-PID.jsonl. A segment
+# is sealed (renamed to segment-N.jsonl) after SEGMENT_ROWS rows or ROLL_SECONDS. Every
+# COMPACT_SECONDS a compactor thread rewrites each sealed segment as columnar arrays
+# (segment-N.npz). It records the row count and the per-column min/max of the segment in
+# manifest.json, then deletes the JSON lines. Empty segments are dropped, and unreadable
+# ones are renamed to *.jsonl.bad without holding up the rest. scan() checks the manifest,
+# skips every segment whose ranges cannot match, and loads only the columns asked for.
+# Several processes (app servers, the CLI) may share the directory. Claiming a sequence
+# number, sealing and compaction hold an exclusive lock on the directory's .lock file, and
+# a starting writer only seals open segments whose process has exited (or that carry its own
+# PID, left by an earlier process with the same PID).
+# WELLNESS_ASSESSMENT_LOG sets the directory; WELLNESS_ASSESSMENT_LOG=0 turns logging off.
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from advisor_features import ENCODING_MAPS
+
+LOG_DIR_ENV = 'WELLNESS_ASSESSMENT_LOG'
+LOG_DIR = 'assessment_log'
+MANIFEST = 'manifest.json'
+BATCH_ROWS = 256
+FLUSH_SECONDS = 2.0
+SEGMENT_ROWS = 50_000
+ROLL_SECONDS = 3600.0
+COMPACT_SECONDS = 60.0
+QUEUE_ROWS = 10_000         # Records waiting for the writer; beyond this they are dropped, never waited on
+FEATURES = ['Age', *ENCODING_MAPS, 'Gender_male', 'Gender_other']
+COLUMN_TYPES = {
+    'timestamp': np.int64,              # Unix seconds, truncated to the minute
+    **{feature: np.int16 for feature in FEATURES},
+    'probability': np.float32,          # Model probability of treatment (%)
+    'prediction': np.int8,
+    'support_score': np.float32,
+    'culture_score': np.float32,
+    'latency_seconds': np.float32,
+}
+COLUMNS = list(COLUMN_TYPES)
+LOCK_FILE = '.lock'
+# segment-N.open-PID.jsonl (being written by process PID), segment-N.jsonl (sealed), segment-N.npz
+SEGMENT_PATTERN = re.compile(r'segment-(\d+)\.(?:(open)-(\d+)\.jsonl|(jsonl)|(npz))$')
+SEQUENCE_PATTERN = re.compile(r'segment-(\d+)\.')
+
+LOG_DROPPED = metrics.counter('assessment_log_dropped_total', "Assessment records dropped because the log writer fell behind")
+
+
+def assessment_record(result, latency_seconds, now=None):
+    """Anonymized log record for an advisor result"""
+    record = {'timestamp': int((time.time() if now is None else now) // 60 * 60)}
+    record.update({feature: int(result['feature_values'][feature]) for feature in FEATURES})
+    record.update({
+        'probability': round(float(result['prediction_proba'][1]) * 100, 3),
+        'prediction': int(result['prediction']),
+        'support_score': round(float(result['support_score']), 3),
+        'culture_score': round(float(result['culture_score']), 3),
+        'latency_seconds': round(float(latency_seconds), 4),
+    })
+    return record
+
+
+def _segments(directory):
+    """{sequence number: {'open' | 'jsonl' | 'npz': path}} for the segment files in `directory`"""
+    segments = {}
+    for path in glob.glob(os.path.join(directory, 'segment-*')):
+        match = SEGMENT_PATTERN.search(os.path.basename(path))
+        if match:
+            kind = match.group(2) or match.group(4) or match.group(5)
+            segments.setdefault(int(match.group(1)), {})[kind] = path
+    return segments
+
+
+def _segment_path(directory, sequence, kind):
+    name = f'segment-{sequence:06d}.open-{os.getpid()}.jsonl' if kind == 'open' else f'segment-{sequence:06d}.{kind}'
+    return os.path.join(directory, name)
+
+
+def _owner(path):
+    """PID of the process writing an open segment"""
+    return int(SEGMENT_PATTERN.search(os.path.basename(path)).group(3))
+
+
+def _process_alive(pid):
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Exists, owned by another user
+    return True
+
+
+@contextmanager
+def directory_lock(directory):
+    """Exclusive lock on the log directory, shared by every thread and process that seals or compacts"""
+    with open(os.path.join(directory, LOCK_FILE), 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _start_segment(directory):
+    """Claim the next sequence number by creating this process's open segment; call under directory_lock"""
+    used = [int(m.group(1)) for m in map(SEQUENCE_PATTERN.match, os.listdir(directory)) if m]
+    used += [int(m.group(1)) for m in map(SEQUENCE_PATTERN.match, load_manifest(directory)) if m]
+    sequence = max(used, default=0) + 1
+    open(_segment_path(directory, sequence, 'open'), 'a').close()
+    return sequence
+
+
+def _read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().split('\n')[:-1]     # A last line without its newline is still being written
+    records = [json.loads(line) for line in lines]
+    return pd.DataFrame({column: np.array([record[column] for record in records], dtype=dtype)
+                         for column, dtype in COLUMN_TYPES.items()})
+
+
+def _write_atomic(path, write):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# --- 1. WRITER ---
+class AssessmentLog:
+    """Buffered, append-only writer; one per process, with its writer and compactor threads"""
+
+    def __init__(self, directory=LOG_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.queue = queue.Queue(maxsize=QUEUE_ROWS)
+        self.lock = threading.Lock()        # Serializes writes and sealing within the process
+        self.closed = threading.Event()
+        with directory_lock(directory):
+            # Segments left open by processes that are gone are sealed; live writers keep theirs.
+            # This process has no segment yet, so one with its PID was left by an earlier process
+            # that had the same PID (containers restart the app with the same low PID).
+            for sequence, files in _segments(directory).items():
+                if 'open' not in files:
+                    continue
+                owner = _owner(files['open'])
+                if owner == os.getpid() or not _process_alive(owner):
+                    os.replace(files['open'], _segment_path(directory, sequence, 'jsonl'))
+            self.sequence = _start_segment(directory)
+        self.segment_rows = 0
+        self.segment_started = time.time()
+        self.writer = threading.Thread(target=self._write_loop, name='assessment-log-writer', daemon=True)
+        self.compactor = threading.Thread(target=self._compact_loop, name='assessment-log-compactor', daemon=True)
+        self.writer.start()
+        self.compactor.start()
+        atexit.register(self.close)
+
+    @property
+    def open_path(self):
+        return _segment_path(self.directory, self.sequence, 'open')
+
+    def append(self, record):
+        """Queue a record for the writer thread; never blocks"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+    def _next_batch(self):
+        """Block for the first record, then take what arrives within FLUSH_SECONDS, up to BATCH_ROWS"""
+        try:
+            batch = [self.queue.get(timeout=FLUSH_SECONDS)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + FLUSH_SECONDS
+        while len(batch) < BATCH_ROWS:
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        while not (self.closed.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            try:
+                if batch:
+                    self._write(batch)
+                if self.segment_rows and time.time() - self.segment_started >= ROLL_SECONDS:
+                    self.seal()
+            except OSError as e:
+                warnings.warn(f"Could not write {len(batch)} assessment records to {self.directory}: {e}")
+            for _ in batch:
+                self.queue.task_done()
+
+    def _write(self, batch):
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in batch)
+        with self.lock:
+            if not self.segment_rows:
+                self.segment_started = time.time()
+            with open(self.open_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self.segment_rows += len(batch)
+        if self.segment_rows >= SEGMENT_ROWS:
+            self.seal()
+
+    def seal(self, reopen=True):
+        """Close the open segment so the compactor picks it up; later records start a new one"""
+        with self.lock, directory_lock(self.directory):
+            if self.segment_rows:
+                os.replace(self.open_path, _segment_path(self.directory, self.sequence, 'jsonl'))
+            elif reopen:
+                return
+            else:
+                os.remove(self.open_path)
+            self.sequence = _start_segment(self.directory) if reopen else None
+            self.segment_rows = 0
+
+    def compact(self):
+        return compact(self.directory)
+
+    def _compact_loop(self):
+        while not self.closed.wait(COMPACT_SECONDS):
+            try:
+                self.compact()
+            except (OSError, ValueError) as e:
+                warnings.warn(f"Assessment log compaction failed in {self.directory}: {e}")
+
+    def flush(self, timeout=10.0):
+        """Wait until every queued record is on disk, for at most `timeout` seconds"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """Write what is queued, seal the open segment and compact; called at interpreter exit"""
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        self.writer.join(timeout=FLUSH_SECONDS * 2 + 5)
+        self.seal(reopen=False)
+        self.compact()
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_log():
+    """The process-wide log in the configured directory, or None when logging is turned off"""
+    global _log
+    directory = os.environ.get(LOG_DIR_ENV, LOG_DIR)
+    if directory == '0':
+        return None
+    with _log_lock:
+        if _log is None:
+            _log = AssessmentLog(directory)
+        return _log
+
+
+# --- 2. COMPACTION ---
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _manifest_entry(columns):
+    rows = len(next(iter(columns.values())))
+    if not rows:
+        return {'rows': 0}      # No min/max: scans skip the segment
+    return {
+        'rows': rows,
+        'min': {column: values.min().item() for column, values in columns.items()},
+        'max': {column: values.max().item() for column, values in columns.items()},
+    }
+
+
+def _compact_segment(directory, sequence, files, manifest):
+    """Columns and a manifest entry for one sealed segment; True if it was added to the manifest"""
+    name = f'segment-{sequence:06d}.npz'
+    added = False
+    if name not in manifest:
+        if 'jsonl' in files:
+            frame = _read_jsonl(files['jsonl'])
+            if frame.empty:
+                os.remove(files['jsonl'])   # E.g. a segment that only held a partial line when its writer died
+                return False
+            columns = {column: frame[column].to_numpy() for column in COLUMNS}
+            _write_atomic(os.path.join(directory, name), lambda f: np.savez(f, **columns))
+        else:
+            # Columns written by a compaction interrupted before its manifest write
+            with np.load(files['npz']) as data:
+                columns = {column: data[column] for column in COLUMNS}
+        manifest[name] = _manifest_entry(columns)
+        _write_atomic(os.path.join(directory, MANIFEST),
+                      lambda f: f.write(json.dumps(manifest, separators=(',', ':')).encode('utf-8')))
+        added = True
+    if 'jsonl' in files:
+        os.remove(files['jsonl'])   # Also the leftover of a compaction interrupted after the manifest write
+    return added
+
+
+def compact(directory=LOG_DIR):
+    """Rewrite every sealed JSON-lines segment as columns plus a manifest entry; returns segments compacted
+
+    A segment that cannot be read is renamed to *.jsonl.bad and left for inspection; the
+    others are still compacted. Runs under directory_lock, so the app's compactor and the
+    CLI never rewrite the manifest at the same time.
+    """
+    compacted = 0
+    with directory_lock(directory):
+        manifest = load_manifest(directory)
+        for sequence, files in sorted(_segments(directory).items()):
+            if 'jsonl' not in files and ('npz' not in files or f'segment-{sequence:06d}.npz' in manifest):
+                continue
+            try:
+                compacted += _compact_segment(directory, sequence, files, manifest)
+            except (ValueError, KeyError, TypeError, OSError) as e:
+                warnings.warn(f"Skipping unreadable assessment log segment {sequence} in {directory}: {e!r}")
+                if 'jsonl' in files and os.path.exists(files['jsonl']):
+                    os.replace(files['jsonl'], files['jsonl'] + '.bad')
+    return compacted
+
+
+# --- 3. SCANNING ---
+def plan(directory=LOG_DIR, where=None):
+    """(columnar segments that may match `where`, segments skipped, JSON-lines segments to read in full)"""
+    where = where or {}
+    selected, skipped = [], 0
+    for name, entry in sorted(load_manifest(directory).items()):
+        if not entry['rows']:
+            continue
+        if all((low is None or entry['max'][column] >= low) and (high is None or entry['min'][column] <= high)
+               for column, (low, high) in where.items()):
+            selected.append(os.path.join(directory, name))
+        else:
+            skipped += 1
+    pending = [path for _, files in sorted(_segments(directory).items())
+               for suffix, path in files.items() if suffix != 'npz']
+    return selected, skipped, pending
+
+
+def scan(directory=LOG_DIR, columns=None, where=None):
+    """Logged records as a frame; `where` maps column -> (low, high), inclusive, None for an open bound"""
+    columns = list(columns or COLUMNS)
+    where = where or {}
+    needed = list(dict.fromkeys(columns + list(where)))
+    segments, _, pending = plan(directory, where)
+    frames = []
+    for path in segments:
+        with np.load(path) as data:
+            frames.append(pd.DataFrame({column: data[column] for column in needed}))
+    for path in pending:
+        try:
+            frames.append(_read_jsonl(path)[needed])
+        except FileNotFoundError:
+            # Sealed or compacted since it was listed: read it in its new form
+            sequence = int(SEGMENT_PATTERN.search(os.path.basename(path)).group(1))
+            sealed, columnar = (_segment_path(directory, sequence, kind) for kind in ('jsonl', 'npz'))
+            if os.path.exists(sealed) and path != sealed:
+                frames.append(_read_jsonl(sealed)[needed])
+            elif os.path.exists(columnar):
+                with np.load(columnar) as data:
+                    frames.append(pd.DataFrame({column: data[column] for column in needed}))
+        except (ValueError, KeyError, TypeError) as e:
+            warnings.warn(f"Skipping unreadable assessment log segment {path}: {e!r}")
+    frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        {column: np.array([], dtype=COLUMN_TYPES[column]) for column in needed})
+    mask = np.ones(len(frame), dtype=bool)
+    for column, (low, high) in where.items():
+        if low is not None:
+            mask &= frame[column].to_numpy() >= low
+        if high is not None:
+            mask &= frame[column].to_numpy() <= high
+    return frame.loc[mask, columns].reset_index(drop=True)
+
+
+def parse_where(conditions):
+    """['probability=70:', 'Age=:30'] -> {'probability': (70.0, None), 'Age': (None, 30.0)}"""
+    where = {}
+    for condition in conditions:
+        column, _, bounds = condition.partition('=')
+        low, _, high = bounds.partition(':')
+        if column not in COLUMN_TYPES:
+            raise ValueError(f"Unknown column '{column}'; choose from {', '.join(COLUMNS)}")
+        where[column] = (float(low) if low else None, float(high) if high else None)
+    return where
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inspect, compact or query the advisor's assessment log.")
+    parser.add_argument('--dir', default=os.environ.get(LOG_DIR_ENV, LOG_DIR))
+    parser.add_argument('--compact', action='store_true', help='Compact sealed segments now')
+    parser.add_argument('--where', action='append', default=[], metavar='COLUMN=LOW:HIGH',
+                        help='Keep rows with LOW <= COLUMN <= HIGH; either bound may be left out')
+    parser.add_argument('--columns', nargs='+', choices=COLUMNS)
+    parser.add_argument('--csv', help='Write the matching rows to this CSV file')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if not os.path.isdir(args.dir):
+        print(f"ERROR: {args.dir} not found; the advisor creates it with the first assessment.", file=sys.stderr)
+        sys.exit(1)
+    try:
+        where = parse_where(args.where)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.compact:
+        print(f"🗜️ Compacted {compact(args.dir)} segments")
+    manifest = load_manifest(args.dir)
+    segments, skipped, pending = plan(args.dir, where)
+    print(f"📚 {sum(entry['rows'] for entry in manifest.values())} rows in {len(manifest)} columnar segments, "
+          f"{len(pending)} segments not compacted yet")
+    frame = scan(args.dir, args.columns, where)
+    if where:
+        print(f"🔎 {len(frame)} matching rows; read {len(segments)} columnar segments, skipped {skipped} by min/max")
+    if args.csv:
+        frame.to_csv(args.csv, index=False)
+        print(f"💾 Saved '{args.csv}'")
+    elif len(frame):
+        print(frame.describe().T.round(2).to_string())
@@ -0,0 +1,181 @@
+# =======================================================================================
+# BATCH PDF REPORT ENGINE: ONE REPORT PER TEAM, RENDERED ACROSS A PROCESS POOL
+# =======================================================================================
+#
+# Usage:
+#   python batch_reports.py teams.csv -o quarterly_reports.zip --workers 8
+#   python batch_reports.py --demo 300 -o demo_reports.zip
+#   python batch_reports.py teams.csv --dashboard teams_dashboard.html
+#
+# The input CSV needs the columns team, risk_level, confidence, support_score and
+# culture_score; an optional ai_insights column is used verbatim when present.
+# Use "-o -" to stream the ZIP archive to stdout. --dashboard also writes every team's
+# gauges into one HTML page as a single small-multiples figure.
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from dashboard_charts import team_gauges_figure
+from report_charts import risk_gauge_chart, wellness_gauges_chart
+from report_pdf import build_report_data, render_report
+
+REQUIRED_COLUMNS = ['team', 'risk_level', 'confidence', 'support_score', 'culture_score']
+
+
+def score_band(score):
+    return "strong" if score >= 80 else "developing" if score >= 50 else "in need of attention"
+
+
+def summarize_scores(support_score, culture_score):
+    """Deterministic stand-in for the AI insights section when none was supplied"""
+    weaker = "support infrastructure" if support_score < culture_score else "cultural openness"
+    return (
+        f"Support infrastructure is {score_band(support_score)} ({support_score:.1f}/100) and "
+        f"cultural openness is {score_band(culture_score)} ({culture_score:.1f}/100). "
+        f"Prioritize {weaker} in this quarter's action plan."
+    )
+
+
+def load_teams(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        missing = [col for col in REQUIRED_COLUMNS if col not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
+        return list(reader)
+
+
+def demo_teams(count, seed=42):
+    """Synthetic scored teams for benchmarking the engine"""
+    rng = random.Random(seed)
+    teams = []
+    for i in range(count):
+        probability = rng.random()
+        teams.append({
+            'team': f'Team {i + 1:04d}',
+            'risk_level': "High Possible" if probability >= 0.5 else "Low Possible",
+            'confidence': max(probability, 1 - probability) * 100,
+            'support_score': rng.uniform(0, 100),
+            'culture_score': rng.uniform(0, 100),
+        })
+    return teams
+
+
+# --- WORKER PROCESS ---
+def init_worker():
+    """Build the report template (fonts, header) once per worker and warm the renderer with a throwaway report"""
+    render_report(build_report_data("Low Possible", 50.0, 50.0, 50.0, "Warm-up")).output()
+
+
+def render_team(args):
+    """Render one team's report; returns (archive name, PDF bytes, page count)"""
+    team, generated_on = args
+    support_score = float(team['support_score'])
+    culture_score = float(team['culture_score'])
+    confidence = float(team['confidence'])
+    insights = team.get('ai_insights') or summarize_scores(support_score, culture_score)
+    charts = {
+        "Model Probability": risk_gauge_chart(confidence, team['risk_level'].startswith('High')),
+        "Wellness Infrastructure": wellness_gauges_chart(support_score, culture_score),
+    }
+    report_data = build_report_data(
+        team['risk_level'], confidence, support_score, culture_score, insights, generated_on, charts
+    )
+    pdf = render_report(report_data, generated_on)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', team['team']).strip('_') or 'team'
+    return f"{slug}.pdf", bytes(pdf.output()), pdf.pages_count
+
+
+# --- ENGINE ---
+def peak_memory_mb():
+    """Peak resident memory of this process and of its (finished) workers"""
+    if resource is None:
+        return None, None
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, KB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+
+def generate_reports(teams, output, workers=None, chunksize=8):
+    """Render every team's report in parallel and stream them into a ZIP archive"""
+    generated_on = datetime.now()
+    start = time.perf_counter()
+    reports = pages = total_bytes = 0
+    seen = set()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive, \
+            ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        jobs = ((team, generated_on) for team in teams)
+        for name, pdf_bytes, page_count in pool.map(render_team, jobs, chunksize=chunksize):
+            stem, suffix = name[:-4], 1
+            while name in seen:  # Another team's name may already end in the suffix tried
+                suffix += 1
+                name = f"{stem}_{suffix}.pdf"
+            seen.add(name)
+            archive.writestr(name, pdf_bytes)
+            reports += 1
+            pages += page_count
+            total_bytes += len(pdf_bytes)
+    elapsed = time.perf_counter() - start
+    parent_mb, worker_mb = peak_memory_mb()
+    return {
+        'reports': reports, 'pages': pages, 'seconds': elapsed, 'pdf_bytes': total_bytes,
+        'pages_per_second': pages / elapsed if elapsed else 0.0,
+        'peak_parent_mb': parent_mb, 'peak_worker_mb': worker_mb,
+    }
+
+
+def write_dashboard(teams, path):
+    """One standalone HTML page with a small-multiples figure of all teams (plotly.js from the CDN)"""
+    import plotly.io as pio
+    figure = team_gauges_figure([
+        (team['team'], float(team['support_score']), float(team['culture_score']),
+         float(team['confidence']), team['risk_level'].startswith('High'))
+        for team in teams
+    ])
+    pio.write_html(figure, path, include_plotlyjs='cdn', full_html=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render one wellness PDF report per team into a ZIP archive.")
+    parser.add_argument('teams_csv', nargs='?', help='CSV of scored team results')
+    parser.add_argument('-o', '--output', default='wellness_reports.zip', help='ZIP path, or - for stdout')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+    parser.add_argument('--chunksize', type=int, default=8, help='Teams sent to a worker per task')
+    parser.add_argument('--demo', type=int, metavar='N', help='Render N synthetic teams instead of a CSV')
+    parser.add_argument('--dashboard', metavar='HTML', help='Also write all teams as one small-multiples dashboard')
+    args = parser.parse_args()
+    if not args.teams_csv and not args.demo:
+        parser.error('provide a teams CSV or --demo N')
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    teams = demo_teams(args.demo) if args.demo else load_teams(args.teams_csv)
+    output = sys.stdout.buffer if args.output == '-' else args.output
+    stats = generate_reports(teams, output, workers=args.workers, chunksize=args.chunksize)
+
+    log = sys.stderr
+    print(f"✅ {stats['reports']} reports ({stats['pages']} pages, {stats['pdf_bytes'] / 1e6:.1f} MB of PDF) "
+          f"in {stats['seconds']:.2f}s with {args.workers} workers", file=log)
+    print(f"⚡ {stats['pages_per_second']:.1f} pages/sec", file=log)
+    if stats['peak_parent_mb'] is not None:
+        print(f"🧠 Peak memory: parent {stats['peak_parent_mb']:.0f} MB, largest worker {stats['peak_worker_mb']:.0f} MB", file=log)
+    if args.output != '-':
+        print(f"📦 Archive written to '{args.output}'", file=log)
+    if args.dashboard:
+        write_dashboard(teams, args.dashboard)
+        print(f"📊 Dashboard of {len(teams)} teams written to '{args.dashboard}'", file=log)
@@ -0,0 +1,180 @@
+# =======================================================================================
+# ADVISOR INTERACTION BENCHMARK: SERVER CPU AND LATENCY PER WIDGET INTERACTION
+# =======================================================================================
+#
+# Starts a headless Streamlit server on the offline stand-in LLM provider and drives the
+# advisor page over Streamlit's websocket protocol, the same way the browser does: it
+# clicks Generate, moves a sidebar slider and edits the generated email. For every
+# interaction it reports the server's CPU time, wall time and the number of elements
+# re-sent, so full-page reruns and fragment reruns can be compared. Linux only (/proc).
+#   python benchmarks/bench_advisor_interactions.py --rounds 5
+#   python benchmarks/bench_advisor_interactions.py --option runner.postScriptGC=true
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_NAME = 'Workplace_Wellness_Advisor'
+GENERATE_LABEL = 'Generate Comprehensive Analysis'
+SLIDER_LABEL = 'Average Employee Age'
+EMAIL_LABEL = 'Team Communication Email'
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure server CPU and latency per advisor widget interaction.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rounds', type=int, default=5, help='Repetitions of each interaction')
+    parser.add_argument('--median', type=float, default=0.2, help='Stand-in LLM latency in seconds')
+    parser.add_argument('--option', action='append', default=[], metavar='NAME=VALUE',
+                        help='Streamlit config override passed to the server (repeatable)')
+    return parser.parse_args()
+
+
+def server_cpu_seconds(pid):
+    """User + system CPU time of the server process"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def start_server(args):
+    env = dict(os.environ, WELLNESS_LLM_PROVIDER='standin', STANDIN_LATENCY='fixed',
+               STANDIN_MEDIAN_S=str(args.median))
+    options = [arg for option in args.option for arg in ('--' + option.split('=', 1)[0], option.split('=', 1)[1])]
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'Home.py', '--server.headless', 'true',
+         '--server.port', str(args.port), '--browser.gatherUsageStats', 'false',
+         '--server.enableXsrfProtection', 'false', '--server.enableCORS', 'false', *options],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'http://localhost:{args.port}/_stcore/health', timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Streamlit server did not start")
+
+
+class Session:
+    """Minimal browser stand-in: tracks widget ids/values and the fragment each widget belongs to"""
+
+    def __init__(self, ws, page_name=PAGE_NAME):
+        self.ws = ws
+        self.page_name = page_name  # '' is the main page (Home.py)
+        self.page_hash = ''
+        self.widgets = {}   # label -> (widget id, fragment id)
+        self.states = {}    # widget id -> WidgetState to resend on every rerun
+
+    async def rerun(self, changes=(), fragment_id=''):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_hash
+        state.page_name = '' if self.page_hash else self.page_name
+        state.fragment_id = fragment_id
+        for widget_id, widget_state in self.states.items():
+            state.widget_states.widgets.add().CopyFrom(widget_state)
+        for widget_state in changes:
+            state.widget_states.widgets.add().CopyFrom(widget_state)
+        await self.ws.send(msg.SerializeToString())
+        return await self.read_until_finished()
+
+    async def read_until_finished(self):
+        elements = 0
+        while True:
+            raw = await self.ws.recv()
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                for page in msg.new_session.app_pages:
+                    if self.page_name and page.page_name == self.page_name:
+                        self.page_hash = page.page_script_hash
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                elements += 1
+                self.track(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == 'script_finished':
+                return elements
+
+    def track(self, element, fragment_id):
+        widget = getattr(element, element.WhichOneof('type'))
+        if hasattr(widget, 'id') and hasattr(widget, 'label') and widget.id:
+            self.widgets[widget.label] = (widget.id, fragment_id)
+
+    def find(self, label):
+        return next(value for key, value in self.widgets.items() if label in key)
+
+
+def widget_state(widget_id, **value):
+    state = BackMsg().rerun_script.widget_states.widgets.add()
+    state.id = widget_id
+    for field, v in value.items():
+        if isinstance(v, list):
+            getattr(state, field).data.extend(v)
+        else:
+            setattr(state, field, v)
+    return state
+
+
+async def measure(pid, label, results, coro):
+    cpu, wall = server_cpu_seconds(pid), time.perf_counter()
+    elements = await coro
+    results.setdefault(label, []).append(
+        (server_cpu_seconds(pid) - cpu, time.perf_counter() - wall, elements)
+    )
+
+
+async def run(args, pid):
+    ws = await websockets.connect(f'ws://localhost:{args.port}/_stcore/stream', max_size=None)
+    session = Session(ws)
+    await session.rerun()
+    await session.rerun()  # The first run only resolves the page hash
+    results = {}
+    for i in range(args.rounds):
+        button_id, fragment_id = session.find(GENERATE_LABEL)
+        await measure(pid, 'Generate analysis', results,
+                      session.rerun([widget_state(button_id, trigger_value=True)], fragment_id))
+
+        slider_id, fragment_id = session.find(SLIDER_LABEL)
+        session.states[slider_id] = widget_state(slider_id, double_array_value=[30.0 + i])
+        await measure(pid, 'Move sidebar slider', results, session.rerun(fragment_id=fragment_id))
+
+        try:
+            email_id, fragment_id = session.find(EMAIL_LABEL)
+        except StopIteration:
+            continue  # Results were cleared by the previous rerun
+        session.states[email_id] = widget_state(email_id, string_value=f"Edited draft {i}")
+        await measure(pid, 'Edit email draft', results, session.rerun(fragment_id=fragment_id))
+
+        await measure(pid, 'Full-page rerun', results, session.rerun())
+    await ws.close()
+    return results
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    server = start_server(args)
+    try:
+        results = asyncio.run(run(args, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"⚙️ {args.rounds} rounds per interaction, stand-in LLM latency {args.median}s")
+    for label, samples in results.items():
+        cpu = sorted(s[0] for s in samples)
+        wall = sorted(s[1] for s in samples)
+        elements = sorted(s[2] for s in samples)
+        print(f"   {label:<20} server CPU p50 {cpu[len(cpu) // 2] * 1000:7.1f} ms | "
+              f"wall p50 {wall[len(wall) // 2] * 1000:7.1f} ms | elements sent {elements[len(elements) // 2]}")
@@ -0,0 +1,127 @@
+# =======================================================================================
+# CRISIS PRE-FILTER BENCHMARK: CROSS-VALIDATED ACCURACY AND THROUGHPUT ON THE CORPUS
+# =======================================================================================
+#
+# The naive Bayes stage is fitted on crisis_corpus.csv, so scoring it on that same corpus
+# would only measure memorization. Accuracy is therefore estimated with stratified k-fold
+# cross-validation: each message is classified by a model fitted without it. False
+# positives are also broken down by corpus category, e.g. informational questions about
+# suicide and negated statements ("I would never hurt myself"). Messages the filter only
+# classifies as a 'mention' are answered by the LLM, so they count as negatives. The corpus
+# includes crisis messages with an unrelated negation or question ("I'm not okay and I want
+# to die"), which the guards must not explain away. Exits non-zero when the pipeline falls
+# below MIN_PRECISION or misses any labelled crisis message (MIN_RECALL). Example:
+#   python benchmarks/bench_crisis_filter.py --folds 5
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crisis_filter import CORPUS_PATH, CRISIS_STAGES, CrisisFilter, CrisisModel, keyword_stage, load_corpus
+
+ROUNDS = 200
+MIN_PRECISION = 0.9  # Crisis responses to messages that are not a crisis
+MIN_RECALL = 1.0     # Every labelled crisis message must get the fixed response
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cross-validate and time the crisis pre-filter.")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def load_categories(path=CORPUS_PATH):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row['category'] for row in csv.DictReader(f)]
+
+
+def stratified_folds(labels, k, seed):
+    """Fold index per message; each label is spread evenly over the folds"""
+    rng = random.Random(seed)
+    folds = [0] * len(labels)
+    for label in set(labels):
+        members = [i for i, y in enumerate(labels) if y == label]
+        rng.shuffle(members)
+        for position, i in enumerate(members):
+            folds[i] = position % k
+    return folds
+
+
+def cross_validated_stages(texts, labels, k, seed):
+    """classify() of each message ('keyword', 'model', 'mention' or None), with the model fitted on the other folds"""
+    folds = stratified_folds(labels, k, seed)
+    stages = [None] * len(texts)
+    for fold in range(k):
+        train = [i for i in range(len(texts)) if folds[i] != fold]
+        crisis_filter = CrisisFilter(CrisisModel.fit([texts[i] for i in train], [labels[i] for i in train]))
+        for i in range(len(texts)):
+            if folds[i] == fold:
+                stages[i] = crisis_filter.classify(texts[i])
+    return stages
+
+
+def confusion(predictions, labels):
+    tp = sum(1 for p, y in zip(predictions, labels) if p and y)
+    fp = sum(1 for p, y in zip(predictions, labels) if p and not y)
+    fn = sum(1 for p, y in zip(predictions, labels) if not p and y)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return precision, recall
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    texts, labels = load_corpus()
+    categories = load_categories()
+
+    keyword_preds = [keyword_stage(t) == 'keyword' for t in texts]
+    stages = cross_validated_stages(texts, labels, args.folds, args.seed)
+    pipeline_preds = [stage in CRISIS_STAGES for stage in stages]
+    print(f"📚 {len(texts)} messages ({sum(labels)} crisis), {args.folds}-fold cross-validation")
+    for name, preds in [('Keyword stage', keyword_preds), ('Full pipeline', pipeline_preds)]:
+        precision, recall = confusion(preds, labels)
+        print(f"✅ {name}: precision {precision * 100:.1f}%, recall {recall * 100:.1f}%")
+    precision, recall = confusion(pipeline_preds, labels)
+
+    # False positives per category of non-crisis message, and which stage raised them
+    totals = Counter(c for c, y in zip(categories, labels) if not y)
+    for category in sorted(totals):
+        flagged = [(t, s) for t, s, c, y in zip(texts, stages, categories, labels)
+                   if c == category and not y and s in CRISIS_STAGES]
+        by_stage = Counter(s for _, s in flagged)
+        mentions = sum(1 for s, c, y in zip(stages, categories, labels) if c == category and not y and s == 'mention')
+        print(f"{'⚠️' if flagged else '✅'} False positives, {category}: {len(flagged)}/{totals[category]} "
+              f"(keyword {by_stage['keyword']}, model {by_stage['model']}; answered with resources {mentions})")
+        for text, stage in flagged:
+            print(f"     [{stage}] {text}")
+
+    missed = [t for t, p, y in zip(texts, pipeline_preds, labels) if y and not p]
+    if missed:
+        print(f"⚠️ Missed crisis messages: {missed}")
+
+    crisis_filter = CrisisFilter()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in texts:
+            t0 = time.perf_counter()
+            crisis_filter.classify(text)
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"⚡ Throughput: {len(latencies) / elapsed:,.0f} messages/sec over {len(latencies):,} classifications")
+    print(f"⚡ Latency: p50 {latencies[len(latencies) // 2] * 1e6:.1f} µs, p99 {p99:.1f} µs, max {latencies[-1] * 1e6:.1f} µs")
+
+    if precision < MIN_PRECISION or recall < MIN_RECALL:
+        print(f"ERROR: pipeline precision {precision * 100:.1f}% / recall {recall * 100:.1f}% is below "
+              f"{MIN_PRECISION * 100:.0f}% / {MIN_RECALL * 100:.0f}%", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,92 @@
+# =======================================================================================
+# KERNEL SVM BENCHMARK: EXACT SVC(probability=True) VS THE NYSTROEM APPROXIMATION
+# =======================================================================================
+#
+# Both models are trained on the survey training split grown to each requested size, by
+# resampling rows with a little Gaussian jitter. They are scored on the original held-out
+# test split, with the same split, scaler and seed as train_models.py. The exact SVC is
+# skipped above --svc-max-rows, where its fit time explodes. Example:
+#   python benchmarks/bench_kernel_svm.py --sizes 1000 5000 20000 50000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kernel_svm import make_kernel_svm
+
+DATA_PATH = os.path.join(ROOT, 'cleaned_data.csv')
+TARGET_COL = 'treatment'
+JITTER = 0.05      # Standard deviations of noise added to resampled (standardized) rows
+SINGLE_ROUNDS = 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the exact and the approximate kernel SVM.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000],
+                        help='Training-set sizes (1000 is the real split, larger ones are resampled)')
+    parser.add_argument('--svc-max-rows', type=int, default=20000, help='Largest training set given to the exact SVC')
+    return parser.parse_args()
+
+
+def grow(X, y, rows, rng):
+    """The training split itself if `rows` fits, otherwise a jittered resample of it"""
+    if rows <= len(X):
+        return X[:rows], y[:rows]
+    picks = rng.integers(0, len(X), rows)
+    return X[picks] + rng.normal(0, JITTER, (rows, X.shape[1])), y[picks]
+
+
+def measure(model, X_train, y_train, X_test, y_test):
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)
+    batch_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(SINGLE_ROUNDS):
+        model.predict_proba(X_test[i:i + 1])
+    single_ms = (time.perf_counter() - start) / SINGLE_ROUNDS * 1000
+    return {
+        'accuracy': accuracy_score(y_test, model.classes_[proba.argmax(axis=1)]),
+        'log_loss': log_loss(y_test, proba),
+        'fit_s': fit_seconds,
+        'rows_per_s': len(X_test) / batch_seconds,
+        'single_ms': single_ms,
+    }
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    data = pd.read_csv(DATA_PATH)
+    X, y = data.drop(TARGET_COL, axis=1), data[TARGET_COL]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+    y_train, y_test = y_train.to_numpy(), y_test.to_numpy()
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>7} {'model':<14} {'accuracy':>8} {'log loss':>8} {'fit s':>8} {'rows/s':>10} {'1 row ms':>8}")
+    for size in args.sizes:
+        X_size, y_size = grow(X_train, y_train, size, rng)
+        candidates = {'Nystroem SVM': make_kernel_svm(random_state=42)}
+        if size <= args.svc_max_rows:
+            candidates['SVC (exact)'] = SVC(probability=True, random_state=42)
+        for name, model in candidates.items():
+            r = measure(model, X_size, y_size, X_test, y_test)
+            print(f"{len(X_size):>7} {name:<14} {r['accuracy']:>8.4f} {r['log_loss']:>8.4f} {r['fit_s']:>8.2f} "
+                  f"{r['rows_per_s']:>10,.0f} {r['single_ms']:>8.2f}")
+        if size > args.svc_max_rows:
+            print(f"{len(X_size):>7} {'SVC (exact)':<14} ⏭️ skipped (above --svc-max-rows)")
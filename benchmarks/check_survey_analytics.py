@@ -0,0 +1,53 @@
+# =======================================================================================
+# SURVEY ANALYTICS PAGE CHECK: FILTERS THAT MATCH SOMEONE, AND FILTERS THAT MATCH NO ONE
+# =======================================================================================
+#
+# Runs pages/4_Survey_Analytics.py headlessly with Streamlit's AppTest (as load_test.py
+# does) and checks that it renders without exceptions both for a selection with
+# respondents and for one without, which must show the "No respondents" message instead
+# of the chart. Exits non-zero on any failure. Example:
+#   python benchmarks/check_survey_analytics.py
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # The page loads survey_cube.npz / survey.csv relative to the app root
+
+from streamlit.testing.v1 import AppTest
+
+PAGE = os.path.join(ROOT, 'pages', '4_Survey_Analytics.py')
+EMPTY_SELECTION = {'Country': 'Bahamas, The', 'no_employees': 'More than 1000'}
+NO_RESPONDENTS = "No respondents match these filters."
+
+
+def sidebar_filter(app, dimension):
+    return next(widget for widget in app.sidebar.multiselect if widget.key == f'filter_{dimension}')
+
+
+def main():
+    failures = []
+    app = AppTest.from_file(PAGE, default_timeout=60)
+    app.run()
+    if app.exception:
+        failures.append(f"unfiltered page raised: {app.exception[0].value}")
+
+    for dimension, label in EMPTY_SELECTION.items():
+        sidebar_filter(app, dimension).select(label).run()
+    if app.exception:
+        failures.append(f"empty selection raised: {app.exception[0].value}")
+    elif not any(info.value == NO_RESPONDENTS for info in app.info):
+        failures.append("empty selection did not show the 'No respondents' message")
+    elif app.metric[0].value != '0':
+        failures.append(f"empty selection reported {app.metric[0].value} respondents")
+
+    for failure in failures:
+        print(f"ERROR: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("✅ Survey Analytics renders with and without matching respondents")
+
+
+if __name__ == '__main__':
+    main()
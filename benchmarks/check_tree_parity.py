@@ -0,0 +1,74 @@
+# =======================================================================================
+# TREE COMPILER PARITY CHECK: RANDOM FOREST AND XGBOOST, AS TRAINED BY train_models.py
+# =======================================================================================
+#
+# Trains each tree model train_models.py can serve (the Random Forest and XGBoost
+# candidates, and the distilled student's configuration) on the same split and scaler,
+# compiles it and checks parity_ok() on the training data plus resampled rows and
+# sampled advisor inputs. SHAP values are compared against the explainer each model is
+# served with. Exits non-zero if any model fails. Example:
+#   python benchmarks/check_tree_parity.py --rows 200000
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+import shap
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from advisor_features import sample_input_grid
+from distill import SHAP_BACKGROUND_ROWS, STUDENT_PARAMS
+from tree_compiler import compile_ensemble, parity_inputs, parity_ok, verify_parity
+
+DATA_PATH = os.path.join(ROOT, 'cleaned_data.csv')
+TARGET_COL = 'treatment'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check compiled-model parity for every servable tree model.")
+    parser.add_argument('--rows', type=int, default=100_000, help='Resampled rows and sampled advisor inputs, each')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    data = pd.read_csv(DATA_PATH)
+    X, y = data.drop(TARGET_COL, axis=1), data[TARGET_COL]
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    columns = list(X.columns)
+    X_check = pd.concat([parity_inputs(DATA_PATH, columns, args.rows), sample_input_grid(args.rows)[columns]],
+                        ignore_index=True)
+
+    X_train_scaled = scaler.transform(X_train)
+    background = shap.sample(X_train_scaled, SHAP_BACKGROUND_ROWS, random_state=0)
+
+    # Each model with the explainer train_models.py or distill.py pairs it with
+    models = {
+        'Random Forest': (RandomForestClassifier(random_state=42), shap.Explainer),
+        'XGBoost': (XGBClassifier(random_state=42, eval_metric='logloss'), shap.Explainer),
+        'Student (XGBoost)': (XGBClassifier(**STUDENT_PARAMS, random_state=42, eval_metric='logloss'),
+                              lambda model: shap.TreeExplainer(model, background, model_output='probability')),
+    }
+    failed = []
+    for name, (model, make_explainer) in models.items():
+        model.fit(X_train_scaled, y_train)
+        report = verify_parity(model, compile_ensemble(model, scaler), X_check, scaler, make_explainer(model))
+        passed = parity_ok(report) and report['shap_supported']
+        print(f"{'✅' if passed else '❌'} {name} on {len(X_check)} rows: {report}")
+        if not passed:
+            failed.append(name)
+    if failed:
+        print(f"ERROR: parity failed for {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
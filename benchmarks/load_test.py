@@ -0,0 +1,161 @@
+# =======================================================================================
+# LOAD TEST: SIMULATED CONCURRENT SESSIONS THROUGH THE CHATBOT AND ADVISOR PAGES
+# =======================================================================================
+#
+# Runs each page script headlessly with Streamlit's AppTest against the offline stand-in
+# LLM provider, so no Gemini key or network is needed. AppTest keeps a process-global
+# runtime, so concurrent sessions run in separate worker processes; each worker plays the
+# role of one app server with its own caches and LLM gateway. Example:
+#   python benchmarks/load_test.py --sessions 40 --concurrency 8 --median 0.5 --failure-rate 0.05
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # The advisor loads its model files relative to the app root
+
+CHATBOT_PAGE = os.path.join(ROOT, 'pages', '1_Mental_Healthcare_Chatbot.py')
+ADVISOR_PAGE = os.path.join(ROOT, 'pages', '2_Workplace_Wellness_Advisor.py')
+QUESTIONS = [
+    "What is cognitive behavioral therapy?",
+    "How do I find a therapist?",
+    "Does insurance cover therapy?",
+    "What should I expect in my first therapy session?",
+    "What is an employee assistance program?",
+]
+ADVISOR_CHOICES = {
+    'Mental Health Benefits?': ["Yes", "No", "Don't know"],
+    'Anonymity Protected?': ["Yes", "No", "Don't know"],
+    'Would Discuss with Supervisor?': ['Yes', 'Some of them', 'No'],
+    'Negative Consequences for MH Discussion?': ['No', 'Maybe', 'Yes'],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the chatbot and advisor pages with concurrent simulated sessions.")
+    parser.add_argument('--page', choices=['chatbot', 'advisor', 'both'], default='both')
+    parser.add_argument('--sessions', type=int, default=20, help='Simulated user sessions per page')
+    parser.add_argument('--concurrency', type=int, default=8, help='Sessions running at the same time (worker processes)')
+    parser.add_argument('--questions', type=int, default=3, help='Chat questions per chatbot session')
+    parser.add_argument('--latency', choices=['lognormal', 'uniform', 'fixed'], default='lognormal')
+    parser.add_argument('--median', type=float, default=0.5, help='Median stand-in latency in seconds')
+    parser.add_argument('--spread', type=float, default=0.5)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--unique-prompts', action='store_true',
+                        help='Make every prompt distinct so the response cache never hits')
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def configure_standin(args):
+    """Point every page at the offline stand-in provider before anything imports it"""
+    os.environ['WELLNESS_LLM_PROVIDER'] = 'standin'
+    os.environ['STANDIN_LATENCY'] = args.latency
+    os.environ['STANDIN_MEDIAN_S'] = str(args.median)
+    os.environ['STANDIN_SPREAD'] = str(args.spread)
+    os.environ['STANDIN_FAILURE_RATE'] = str(args.failure_rate)
+    os.environ['STANDIN_SEED'] = str(args.seed)
+
+
+def chatbot_session(session_id, args):
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(args.seed + session_id)
+    at = AppTest.from_file(CHATBOT_PAGE, default_timeout=120)
+    at.run()
+    latencies, errors = [], 0
+    for _ in range(args.questions):
+        question = rng.choice(QUESTIONS)
+        if args.unique_prompts:
+            question = f"{question} (session {session_id}, {rng.random():.6f})"
+        t0 = time.perf_counter()
+        at.chat_input[0].set_value(question).run()
+        latencies.append(time.perf_counter() - t0)
+        errors += bool(at.exception) or 'technical difficulties' in at.session_state.messages[-1]['content']
+    return latencies, errors
+
+
+def advisor_session(session_id, args):
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(args.seed + session_id)
+    at = AppTest.from_file(ADVISOR_PAGE, default_timeout=120)
+    at.run()
+    for box in at.selectbox:
+        if box.label in ADVISOR_CHOICES:
+            box.set_value(rng.choice(ADVISOR_CHOICES[box.label]))
+    if args.unique_prompts:
+        at.slider[0].set_value(rng.randint(18, 80))
+    button = next(b for b in at.button if 'Generate Comprehensive Analysis' in b.label)
+    t0 = time.perf_counter()
+    button.click().run()
+    latency = time.perf_counter() - t0
+    outputs = at.session_state.ai_outputs if 'ai_outputs' in at.session_state else {}
+    errors = bool(at.exception) + sum('Unable to generate' in text for text in outputs.values())
+    return [latency], errors
+
+
+def run_session(session_id, session_fn, args):
+    """AppTest swaps sys.modules['__main__'] for the page; restore it so the worker can unpickle its next task"""
+    main_module = sys.modules['__main__']
+    try:
+        return session_fn(session_id, args)
+    finally:
+        sys.modules['__main__'] = main_module
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def run_page(name, session_fn, args):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(partial(run_session, session_fn=session_fn, args=args), range(args.sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for session_latencies, _ in results for l in session_latencies)
+    errors = sum(e for _, e in results)
+    print(f"\n📊 {name}: {args.sessions} sessions, {len(latencies)} interactions, concurrency {args.concurrency}")
+    print(f"   Latency p50 {percentile(latencies, 50):.3f}s | p95 {percentile(latencies, 95):.3f}s | "
+          f"p99 {percentile(latencies, 99):.3f}s | max {latencies[-1]:.3f}s")
+    print(f"   Throughput {len(latencies) / elapsed:.2f} interactions/s over {elapsed:.1f}s, errors shown to users: {errors}")
+
+
+def stream_ttft(args, prompts=20):
+    """Time to first chunk vs full response through the gateway's streaming path"""
+    from llm_gateway import get_gateway
+    gateway = get_gateway()
+    first_chunks, totals = [], []
+    for i in range(prompts):
+        t0 = time.perf_counter()
+        chunks = gateway.stream('gemini-2.0-flash', f"stream probe {i}")
+        next(chunks)
+        first_chunks.append(time.perf_counter() - t0)
+        for _ in chunks:
+            pass
+        totals.append(time.perf_counter() - t0)
+    first_chunks.sort()
+    totals.sort()
+    print(f"\n📡 Streaming: first chunk p50 {percentile(first_chunks, 50):.3f}s, "
+          f"full response p50 {percentile(totals, 50):.3f}s over {prompts} prompts")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    configure_standin(args)
+    print(f"⚙️ Stand-in provider: {args.latency} latency, median {args.median}s, "
+          f"failure rate {args.failure_rate:.0%}, unique prompts: {args.unique_prompts}")
+
+    if args.page in ('chatbot', 'both'):
+        run_page('Mental Healthcare Chatbot', chatbot_session, args)
+    if args.page in ('advisor', 'both'):
+        if not os.path.exists('best_model.pkl'):
+            print("\n⚠️ Skipping advisor: run train_models.py first to create the model files.")
+        else:
+            run_page('Workplace Wellness Advisor', advisor_session, args)
+    stream_ttft(args)
@@ -0,0 +1,127 @@
+# =======================================================================================
+# STARTUP PROFILER: PER-PAGE IMPORT COST AND TIME-TO-INTERACTIVE
+# =======================================================================================
+#
+# Part 1 runs every page once under `python -X importtime` (headless AppTest, stand-in LLM
+# provider) and lists the modules its first render imports, heaviest first. Streamlit's
+# own imports are loaded before the page runs, so only the page's cost is counted, and
+# background prefetching is switched off so the numbers show what blocks the first render.
+# Part 2 starts a fresh server per page and measures time-to-interactive over the
+# websocket protocol: the first (cold) visit, which pays the page's imports, and later
+# (warm) visits from new sessions. Linux only (/proc).
+#   python benchmarks/profile_startup.py --top 15
+#   python benchmarks/profile_startup.py --skip-server
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'Home': ('Home.py', ''),
+    'Chatbot': (os.path.join('pages', '1_Mental_Healthcare_Chatbot.py'), 'Mental_Healthcare_Chatbot'),
+    'Advisor': (os.path.join('pages', '2_Workplace_Wellness_Advisor.py'), 'Workplace_Wellness_Advisor'),
+    'Resources': (os.path.join('pages', '3_Resources_and_Contribute.py'), 'Resources_and_Contribute'),
+    'Analytics': (os.path.join('pages', '4_Survey_Analytics.py'), 'Survey_Analytics'),
+}
+START_MARKER = b'### page run start\n'
+END_MARKER = b'### page run end\n'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Profile per-page import cost and time-to-interactive.")
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports listed per page')
+    parser.add_argument('--visits', type=int, default=5, help='Warm visits measured per page')
+    parser.add_argument('--settle', type=float, default=10.0,
+                        help='Seconds between the cold visit and the warm visits (lets prefetching finish)')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--option', action='append', default=[], metavar='NAME=VALUE',
+                        help='Streamlit config override passed to the server (repeatable)')
+    parser.add_argument('--skip-server', action='store_true', help='Only profile imports')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.set_defaults(median=0.0)  # Read by start_server; no LLM calls happen on page load
+    return parser.parse_args()
+
+
+# --- PART 1: IMPORT PROFILE ---
+def run_page_child(page):
+    """Runs inside `python -X importtime`; brackets the page's first render with markers on stderr"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from streamlit.testing.v1 import AppTest
+    AppTest.from_string("import streamlit as st\nst.write('warm-up')").run()
+    os.write(2, START_MARKER)
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120).run()
+    os.write(2, END_MARKER)
+    if at.exception:
+        sys.exit(f"Page raised: {at.exception[0].value}")
+
+
+def profile_imports(page):
+    """[(cumulative seconds, module)] for the top-level imports of the page's first render"""
+    env = dict(os.environ, WELLNESS_LLM_PROVIDER='standin', WELLNESS_PREFETCH_IMPORTS='0')
+    child = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.abspath(__file__), '--child', page],
+        cwd=ROOT, env=env, capture_output=True,
+    )
+    stderr = child.stderr
+    if child.returncode or START_MARKER not in stderr:
+        raise RuntimeError(f"{page} failed: {stderr.decode(errors='replace')[-500:]}")
+    section = stderr.split(START_MARKER, 1)[1].split(END_MARKER, 1)[0].decode(errors='replace')
+    imports = []
+    for line in section.splitlines():
+        if not line.startswith('import time:') or line.count('|') != 2:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  ') and cumulative.strip().isdigit():  # Top level of the import tree
+            imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)
+
+
+# --- PART 2: TIME-TO-INTERACTIVE ---
+async def visit(session_cls, port, page_name):
+    """Wall time from the page request until the script finished (every widget delivered)"""
+    import websockets
+    start = time.perf_counter()
+    async with websockets.connect(f'ws://localhost:{port}/_stcore/stream', max_size=None) as ws:
+        elements = await session_cls(ws, page_name).rerun()
+    return time.perf_counter() - start, elements
+
+
+def time_to_interactive(args, page_name):
+    from bench_advisor_interactions import Session, server_cpu_seconds, start_server
+    server = start_server(args)
+    try:
+        cpu = server_cpu_seconds(server.pid)
+        cold, elements = asyncio.run(visit(Session, args.port, page_name))
+        cold_cpu = server_cpu_seconds(server.pid) - cpu
+        time.sleep(args.settle)
+        warm = sorted(asyncio.run(visit(Session, args.port, page_name))[0] for _ in range(args.visits))
+    finally:
+        server.terminate()
+        server.wait()
+    return cold, cold_cpu, warm[len(warm) // 2], elements
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.child:
+        run_page_child(args.child)
+        sys.exit(0)
+
+    print("📦 Imports on each page's first render (Streamlit itself excluded)")
+    for label, (page, _) in PAGES.items():
+        imports = profile_imports(page)
+        print(f"\n   {label}: {sum(seconds for seconds, _ in imports) * 1000:.0f} ms in {len(imports)} top-level imports")
+        for seconds, name in imports[:args.top]:
+            print(f"      {seconds * 1000:8.1f} ms  {name}")
+
+    if not args.skip_server:
+        print(f"\n⏱️ Time-to-interactive (fresh server per page, warm p50 over {args.visits} visits)")
+        for label, (_, page_name) in PAGES.items():
+            cold, cold_cpu, warm, elements = time_to_interactive(args, page_name)
+            print(f"   {label:<10} cold {cold * 1000:7.0f} ms (server CPU {cold_cpu * 1000:6.0f} ms) | "
+                  f"warm {warm * 1000:6.0f} ms | elements {elements}")
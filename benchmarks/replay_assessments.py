@@ -0,0 +1,73 @@
+# =======================================================================================
+# REPLAY BENCHMARK: LOGGED ADVISOR ASSESSMENTS THROUGH THE CURRENTLY SERVED MODEL
+# =======================================================================================
+#
+# Reads the encoded inputs of logged assessments (assessment_log.py), scanning only the
+# segments inside the requested time range, and scores them with the served model one row
+# at a time (as the advisor does) and in one batch. Reports latency against what was
+# logged, and how many predictions and probabilities changed since they were logged, e.g.
+# after a retrain. Example:
+#   python benchmarks/replay_assessments.py --hours 24 --limit 5000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # The served model files are loaded relative to the app root
+
+from assessment_log import FEATURES, LOG_DIR, LOG_DIR_ENV, plan, scan
+from peer_index import load_served_model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay logged advisor assessments through the served model.")
+    parser.add_argument('--dir', default=os.environ.get(LOG_DIR_ENV, LOG_DIR))
+    parser.add_argument('--hours', type=float, help='Only assessments logged in the last HOURS hours')
+    parser.add_argument('--limit', type=int, default=2000, help='Most recent assessments replayed one at a time')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    where = {'timestamp': (time.time() - args.hours * 3600, None)} if args.hours else None
+    segments, skipped, pending = plan(args.dir, where)
+    started = time.perf_counter()
+    logged = scan(args.dir, FEATURES + ['probability', 'prediction', 'latency_seconds'], where)
+    print(f"📚 {len(logged)} assessments from {len(segments)} columnar and {len(pending)} open segments "
+          f"({skipped} skipped by min/max) in {(time.perf_counter() - started) * 1000:.1f} ms")
+    if logged.empty:
+        print("ERROR: no logged assessments to replay.", file=sys.stderr)
+        sys.exit(1)
+
+    model, scaler = load_served_model()
+    features = logged[list(scaler.feature_names_in_)]
+
+    started = time.perf_counter()
+    probability = model.predict_proba(scaler.transform(features))[:, 1] * 100
+    batch_seconds = time.perf_counter() - started
+
+    single = features.tail(args.limit)
+    timings = []
+    for i in range(len(single)):
+        started = time.perf_counter()
+        model.predict_proba(scaler.transform(single.iloc[[i]]))
+        timings.append(time.perf_counter() - started)
+    timings = np.array(timings) * 1000
+
+    changed = int(np.sum((probability >= 50) != logged['prediction'].to_numpy().astype(bool)))
+    drift = np.abs(probability - logged['probability'].to_numpy())
+    print(f"⏱️ Batch: {len(features)} rows in {batch_seconds * 1000:.1f} ms")
+    print(f"⏱️ One row: p50 {np.percentile(timings, 50):.2f} ms, p95 {np.percentile(timings, 95):.2f} ms "
+          f"over {len(single)} rows (logged full assessments: p50 "
+          f"{logged['latency_seconds'].median() * 1000:.1f} ms)")
+    print(f"🔁 {changed} predictions changed; probability moved {drift.mean():.2f} points on average "
+          f"(max {drift.max():.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# =======================================================================================
+# BOUNDED CHAT CONTEXT WITH ROLLING SUMMARIZATION
+# =======================================================================================
+
+CONTEXT_TOKEN_BUDGET = 1500   # Tokens of verbatim history sent with each question
+SUMMARY_TOKEN_BUDGET = 300    # Tokens allowed for the running summary of older turns
+MAX_STORED_MESSAGES = 200     # Summarized messages beyond this are dropped from session state
+RENDER_WINDOW = 20            # Messages rendered per page of chat history
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def turn_tokens(turns):
+    return sum(estimate_tokens(turn['content']) for turn in turns)
+
+
+def clip(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    text = ' '.join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + '…'
+
+
+def extractive_summary(summary, turns, budget=SUMMARY_TOKEN_BUDGET):
+    """Fold turns into the summary as one clipped line each, dropping the oldest lines past the budget"""
+    lines = [line for line in summary.splitlines() if line]
+    for turn in turns:
+        speaker = 'User asked' if turn['role'] == 'user' else 'Assistant answered'
+        lines.append(f"- {speaker}: {clip(turn['content'], 30)}")
+    while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > budget:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+def compact_history(messages, summary, summarized_upto, summarize=extractive_summary, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Fold the oldest unsummarized turns into the running summary once they exceed `budget`.
+    Compaction frees down to half the budget so it runs every few turns, not on every message.
+    Returns the updated (summary, summarized_upto).
+    """
+    pending = messages[summarized_upto:]
+    if turn_tokens(pending) <= budget:
+        return summary, summarized_upto
+
+    folded, remaining = 0, turn_tokens(pending)
+    while folded < len(pending) - 1 and remaining > budget // 2:
+        remaining -= estimate_tokens(pending[folded]['content'])
+        folded += 1
+    return summarize(summary, pending[:folded]), summarized_upto + folded
+
+
+def trim_history(messages, summarized_upto, max_messages=MAX_STORED_MESSAGES):
+    """Drop already-summarized messages (keeping the welcome message) so session state stays bounded"""
+    excess = min(len(messages) - max_messages, summarized_upto - 1)
+    if excess <= 0:
+        return messages, summarized_upto
+    return messages[:1] + messages[1 + excess:], summarized_upto - excess
+
+
+def format_context(summary, turns):
+    """Render the summary and verbatim recent turns as a prompt section"""
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier conversation:\n{summary}")
+    if turns:
+        parts.append('\n'.join(
+            f"{'User' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}" for turn in turns
+        ))
+    return '\n\n'.join(parts)
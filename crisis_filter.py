@@ -0,0 +1,220 @@
+# =======================================================================================
+# LOCAL CRISIS PRE-FILTER (RUNS BEFORE ANY LLM CALL)
+# =======================================================================================
+
+import csv
+import math
+import os
+import re
+from collections import Counter
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crisis_corpus.csv')
+
+CRISIS_RESOURCES = """🚨 **Crisis Text Line:** Text HOME to 741741
+📞 **National Suicide Prevention Lifeline:** Call or text 988
+🌈 **The Trevor Project (LGBTQ+):** 1-866-488-7386"""
+
+# Fixed response returned for crisis messages; also quoted in the chatbot system prompt
+CRISIS_RESPONSE = f"""I'm concerned about what you're sharing. Please know that immediate help is available:
+
+{CRISIS_RESOURCES}
+
+These services have trained professionals ready to help you right now. Please reach out to them immediately."""
+
+# Appended to answers to messages that mention crisis topics without being a crisis
+CRISIS_RESOURCES_FOOTER = f"""---
+If you or someone you know is struggling, confidential help is available any time:
+
+{CRISIS_RESOURCES}"""
+
+# --- 1. KEYWORD AUTOMATON ---
+# High-precision phrases, compiled once into a single alternation so a message is scanned in one pass.
+# A match only counts as a crisis when the guards below do not explain it away.
+CRISIS_PATTERNS = [
+    r"\bkill(?:ing)?\s+(?:my\s*self|myself|themselves|himself|herself)\b",
+    r"\b(?:kms|unalive\s+(?:my\s*self|myself))\b",
+    r"\bsuicid(?:al|e\s+note|e\s+plan)\b",
+    r"\b(?:thinking|thought|think)\s+(?:about|of)\s+(?:suicide|ending\s+(?:it|my\s+life|things))\b",
+    r"\b(?:end|ending|take|taking)\s+(?:my|my\s+own)\s+life\b",
+    r"\bend(?:ing)?\s+(?:it\s+all|things|everything)\b",
+    r"\b(?:want|wanna|going|gonna)\s+(?:to\s+)?die\b",
+    r"\bwish\s+(?:i\s+(?:was|were)\s+)?dead\b",
+    r"\b(?:don'?t|do\s+not|no\s+longer)\s+want\s+to\s+(?:live|be\s+alive|wake\s+up)\b",
+    r"\bnever\s+wake\s+up\b",
+    r"\b(?:hurt|hurting|harm|harming|cut|cutting)\s+(?:my\s*self|myself)\b",
+    r"\bself[\s-]?harm(?:ing|ed)?\b",
+    r"\boverdos(?:e|ing)\b",
+    r"\b(?:take|taking|swallow(?:ing)?)\s+all\s+(?:of\s+)?(?:my|the)\s+(?:pills|meds|medication)\b",
+    r"\b(?:bought|got)\s+(?:a\s+)?(?:rope|noose)\b",
+    r"\bjump(?:ing)?\s+off\s+(?:a|the)\s+(?:bridge|building|roof)\b",
+    r"\b(?:not|isn'?t)\s+worth\s+living\b",
+    r"\bbetter\s+off\s+without\s+me\b",
+    r"\b(?:nobody|no\s+one)\s+would\s+(?:miss|care\s+about)\s+me\b",
+    r"\bcan'?t\s+go\s+on\b",
+    r"\bdone\s+with\s+(?:life|living)\b",
+    r"\b(?:pain|it|everything)\s+to\s+(?:stop|end)\s+(?:forever|for\s+good)\b",
+    r"\bsay(?:ing)?\s+goodbye\s+to\s+everyone\b",
+    r"\bgiv(?:e|ing)\s+up\s+on\s+(?:life|living|everything)\b",
+    r"\bno\s+reason\s+(?:for\s+me\s+)?to\s+(?:keep\s+)?liv(?:e|ing)\b",
+]
+CRISIS_RE = re.compile('|'.join(f'(?:{p})' for p in CRISIS_PATTERNS), re.IGNORECASE)
+
+# Questions about lethal means and rhetorical despair count even though they read as questions
+URGENT_RE = re.compile(
+    r"\bhow\s+(?:many|much)\b[^.!?]*\b(?:overdose|to\s+die|kill\s+(?:me|myself)|lethal)\b"
+    r"|\blethal\s+dose\b"
+    r"|\bwhat'?s\s+the\s+point\s+(?:of|in)\s+(?:living|life|going\s+on)\b",
+    re.IGNORECASE,
+)
+
+# Guards: a negation or a past-tense cue governing the phrase ("I would never hurt myself",
+# "I used to feel suicidal"), or a question that is not about the writer ("What is self-harm?").
+# A negation only governs a phrase when it is among the few words just before it in the same
+# clause, so "I'm not okay and I want to die" is still a crisis.
+CLAUSE_BREAK_RE = re.compile(r"[,.;:!?]|\b(?:and|but|so)\b", re.IGNORECASE)
+SUBJECT_RE = re.compile(r"\b(?:i|i'm|im|i've|i'd|i'll|you|he|she|we|they|nobody|no\s+one|everyone)\b", re.IGNORECASE)
+SENTENCE_BREAK_RE = re.compile(r"[.!?]")
+NEGATION_RE = re.compile(r"\b(?:not|never|no|no\s+longer|don'?t|do\s+not|doesn'?t|won'?t|wouldn'?t|used\s+to)\b", re.IGNORECASE)
+NEGATION_WINDOW = 4  # Words before a match a governing negation may be in ("I'm not going to hurt myself")
+QUESTION_RE = re.compile(r"^\s*(?:what|why|how|when|where|who|which|is|are|can|could|does|do|should|would)\b|\?\s*$", re.IGNORECASE)
+FIRST_PERSON_RE = re.compile(r"\b(?:i|i'm|im|i've|i'd|i'll|me|my|myself)\b", re.IGNORECASE)
+FIRST_PERSON_WINDOW = 3  # Words before a match that may carry its subject ("should I kill myself")
+
+
+def _clause_prefix(text, start):
+    """Text of the clause before `start`: from the last break, or from the last new subject"""
+    prefix = text[:start]
+    begin = max([m.end() for m in CLAUSE_BREAK_RE.finditer(prefix)], default=0)
+    subjects = [m.start() for m in SUBJECT_RE.finditer(prefix, begin)]
+    return prefix[subjects[-1] if subjects else begin:]
+
+
+def _last_words(text, n):
+    return ' '.join(text.split()[-n:])
+
+
+def _negated(text, match):
+    return NEGATION_RE.search(_last_words(_clause_prefix(text, match.start()), NEGATION_WINDOW)) is not None
+
+
+def _in_question(text, match):
+    """Whether the sentence holding the match is a question"""
+    begin = max([m.end() for m in SENTENCE_BREAK_RE.finditer(text, 0, match.start())], default=0)
+    end = SENTENCE_BREAK_RE.search(text, match.end())
+    return QUESTION_RE.search(text[begin:end.end() if end else len(text)]) is not None
+
+
+def _about_writer(text, match):
+    """Whether the match or the few words before it refer to the writer"""
+    window = _last_words(_clause_prefix(text, match.start()), FIRST_PERSON_WINDOW)
+    return FIRST_PERSON_RE.search(f'{window} {match.group()}') is not None
+
+
+def keyword_stage(text):
+    """'keyword' for a crisis phrase, 'mention' when every phrase found is guarded, else None"""
+    if URGENT_RE.search(text):
+        return 'keyword'
+    mentioned = False
+    for match in CRISIS_RE.finditer(text):
+        if _negated(text, match) or (_in_question(text, match) and not _about_writer(text, match)):
+            mentioned = True
+        else:
+            return 'keyword'
+    return 'mention' if mentioned else None
+
+
+# --- 2. ON-CPU MODEL ---
+TOKEN_RE = re.compile(r"[a-z']+")
+MODEL_THRESHOLD = 1.5  # Log-odds above which a message is treated as a crisis
+
+
+def tokenize(text):
+    """Lower-cased word unigrams plus bigrams"""
+    words = TOKEN_RE.findall(text.lower())
+    return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+
+class CrisisModel:
+    """Multinomial naive Bayes over unigrams/bigrams, scored as crisis log-odds"""
+
+    def __init__(self, weights, bias):
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, texts, labels, alpha=1.0):
+        counts = {0: Counter(), 1: Counter()}
+        for text, label in zip(texts, labels):
+            counts[label].update(tokenize(text))
+        vocab = set(counts[0]) | set(counts[1])
+        totals = {c: sum(counts[c].values()) + alpha * (len(vocab) + 1) for c in counts}
+
+        weights = {
+            token: math.log((counts[1][token] + alpha) / totals[1]) - math.log((counts[0][token] + alpha) / totals[0])
+            for token in vocab
+        }
+        n_pos = sum(1 for label in labels if label == 1)
+        bias = math.log((n_pos + alpha) / (len(labels) - n_pos + alpha))
+        return cls(weights, bias)
+
+    def score(self, text):
+        weights = self.weights
+        # Unseen tokens carry no evidence either way, so only known tokens contribute
+        return self.bias + sum(weights[token] for token in tokenize(text) if token in weights)
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Read the labelled (text, label) crisis corpus"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return [row['text'] for row in rows], [int(row['label']) for row in rows]
+
+
+def load_crisis_model(path=CORPUS_PATH):
+    """Fit the naive Bayes stage from the labelled corpus"""
+    texts, labels = load_corpus(path)
+    return CrisisModel.fit(texts, labels)
+
+
+# --- 3. CLASSIFIER PIPELINE ---
+CRISIS_STAGES = ('keyword', 'model')  # Stages answered with CRISIS_RESPONSE instead of the LLM
+
+
+class CrisisFilter:
+    """Keyword automaton first, then the on-CPU model; no network involved
+
+    Messages that only mention a crisis topic (negated, or asked about in general) are
+    classified 'mention': the chatbot answers them and appends the crisis resources.
+    """
+
+    def __init__(self, model=None, threshold=MODEL_THRESHOLD):
+        self.model = model if model is not None else load_crisis_model()
+        self.threshold = threshold
+
+    def classify(self, text):
+        """Return the stage that flagged the message ('keyword' or 'model'), 'mention', or None"""
+        stage = keyword_stage(text)
+        if stage == 'keyword':
+            return stage
+        if self.model.score(text) > self.threshold:
+            # The model sees words, not clauses: it only confirms what the keyword guards explained away
+            return 'mention' if stage == 'mention' else 'model'
+        return stage
+
+    def is_crisis(self, text):
+        return self.classify(text) in CRISIS_STAGES
+
+
+_default_filter = None
+
+
+def get_filter():
+    """Lazily build the process-wide filter"""
+    global _default_filter
+    if _default_filter is None:
+        _default_filter = CrisisFilter()
+    return _default_filter
+
+
+def is_crisis(text):
+    return get_filter().is_crisis(text)
@@ -0,0 +1,155 @@
+# =======================================================================================
+# DISTILLATION: A SMALL BOOSTED-TREE STUDENT OF THE TRAINED MODEL
+# =======================================================================================
+#
+# Usage:
+#   python distill.py                          # report agreement, size and latency only
+#   python distill.py --ship --min-agreement 0.98
+#
+# The advisor scores one row at a time and does not need the full winning model for it.
+# The student is a shallow XGBoost ensemble fitted to the teacher's predict_proba (soft
+# labels) on two kinds of rows:
+#   - the training rows
+#   - rows sampled uniformly from the advisor's input space (advisor_features.py), so the
+#     student also matches answer combinations the survey never contained
+# Agreement is the share of held-out test-split rows on which both models predict the
+# same class. Agreement on a fresh sample of advisor inputs is reported as a diagnostic
+# only: those rows are synthetic and far outnumber the real ones, so they must not decide
+# whether the student ships. When test agreement reaches MIN_AGREEMENT, the student replaces
+# best_model.pkl: it is compiled to NumPy (tree_compiler.py) and gets its own SHAP
+# explainer. The teacher is kept as teacher_model.pkl.
+# train_models.py runs this stage after picking the best model.
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from advisor_features import sample_input_grid
+from tree_compiler import compile_ensemble, ship_compiled
+
+MIN_AGREEMENT = 0.98
+GRID_ROWS = 50_000          # Sampled advisor inputs added to the training rows
+EVAL_GRID_ROWS = 20_000     # Fresh sampled inputs for the diagnostic grid agreement
+STUDENT_PARAMS = {'n_estimators': 200, 'max_depth': 4, 'learning_rate': 0.2}
+SHAP_BACKGROUND_ROWS = 100
+TEACHER_PATH = 'teacher_model.pkl'
+LATENCY_ROUNDS = 200
+
+
+def fit_student(X, teacher_proba, random_state=42):
+    """XGBClassifier trained on the teacher's probabilities instead of hard labels"""
+    from xgboost import XGBClassifier
+    # Each row appears once per class, weighted by the teacher's probability of that class:
+    # the weighted log loss then equals the cross-entropy against the soft label
+    X_twice = np.vstack([X, X])
+    labels = np.r_[np.ones(len(X)), np.zeros(len(X))]
+    weights = np.r_[teacher_proba, 1 - teacher_proba]
+    student = XGBClassifier(**STUDENT_PARAMS, random_state=random_state, eval_metric='logloss')
+    student.fit(X_twice, labels, sample_weight=weights)
+    return student
+
+
+def _single_row_ms(predict_proba, row):
+    predict_proba(row)
+    start = time.perf_counter()
+    for _ in range(LATENCY_ROUNDS):
+        predict_proba(row)
+    return (time.perf_counter() - start) / LATENCY_ROUNDS * 1000
+
+
+def _artifact_bytes(compiled):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'student.npz')
+        compiled.save(path)
+        return os.path.getsize(path)
+
+
+def distill(teacher, scaler, X_train, X_test, seed=0):
+    """Fit and evaluate a student of `teacher`; returns (student, compiled student, report)"""
+    columns = list(scaler.feature_names_in_)
+    fit_X = scaler.transform(pd.concat([X_train[columns], sample_input_grid(GRID_ROWS, seed)[columns]]))
+    eval_X = scaler.transform(pd.concat([X_test[columns], sample_input_grid(EVAL_GRID_ROWS, seed + 1)[columns]]))
+
+    student = fit_student(fit_X, teacher.predict_proba(fit_X)[:, 1])
+    compiled = compile_ensemble(student, scaler)
+
+    teacher_proba = teacher.predict_proba(eval_X)[:, 1]
+    student_proba = compiled.predict_proba(eval_X)[:, 1]
+    same_class = (teacher_proba >= 0.5) == (student_proba >= 0.5)
+    report = {
+        'agreement_test_rows': float(same_class[:len(X_test)].mean()),     # Decides shipping
+        'agreement_grid': float(same_class[len(X_test):].mean()),          # Diagnostic only
+        'proba_mean_abs_diff': float(np.abs(teacher_proba - student_proba).mean()),
+        'teacher_bytes': len(pickle.dumps(teacher)),
+        'student_bytes': _artifact_bytes(compiled),
+        'teacher_ms': _single_row_ms(teacher.predict_proba, eval_X[:1]),
+        'student_ms': _single_row_ms(compiled.predict_proba, eval_X[:1]),
+    }
+    return student, compiled, report
+
+
+def format_report(report):
+    return (f"agreement on test rows {report['agreement_test_rows'] * 100:.2f}% "
+            f"(sampled inputs {report['agreement_grid'] * 100:.2f}%), "
+            f"mean |Δp| {report['proba_mean_abs_diff']:.4f} | size {report['teacher_bytes'] / 1e6:.2f} MB -> "
+            f"{report['student_bytes'] / 1e6:.2f} MB | 1 row {report['teacher_ms']:.2f} ms -> {report['student_ms']:.2f} ms")
+
+
+def ship_student(teacher, student, compiled, X_train_scaled):
+    """Make the student the served model and return its explainer; the teacher moves to TEACHER_PATH
+
+    The compiled student is only served when it passes the parity check (tree_compiler.py),
+    SHAP values included; otherwise the advisor scores and explains with the pickles.
+    """
+    import shap
+    with open(TEACHER_PATH, 'wb') as f:
+        pickle.dump(teacher, f)
+    with open('best_model.pkl', 'wb') as f:
+        pickle.dump(student, f)
+    # Explain probabilities (not log-odds) so the advisor's waterfall keeps its units
+    background = shap.sample(X_train_scaled, SHAP_BACKGROUND_ROWS, random_state=0)
+    explainer = shap.TreeExplainer(student, background, model_output='probability')
+    with open('shap_explainer.pkl', 'wb') as f:
+        pickle.dump(explainer, f)
+    ship_compiled(student, compiled, X_train_scaled, explainer=explainer)
+    return explainer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distill the trained model into a compact boosted-tree student.")
+    parser.add_argument('--teacher', default=None,
+                        help=f"Teacher pickle (default: {TEACHER_PATH} if present, else best_model.pkl)")
+    parser.add_argument('--scaler', default='scaler.pkl')
+    parser.add_argument('--data', default='cleaned_data.csv')
+    parser.add_argument('--min-agreement', type=float, default=MIN_AGREEMENT)
+    parser.add_argument('--ship', action='store_true', help='Replace the served model when agreement is high enough')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    from sklearn.model_selection import train_test_split
+    args = parse_args()
+    teacher_path = args.teacher or (TEACHER_PATH if os.path.exists(TEACHER_PATH) else 'best_model.pkl')
+    with open(teacher_path, 'rb') as f:
+        teacher = pickle.load(f)
+    with open(args.scaler, 'rb') as f:
+        scaler = pickle.load(f)
+    data = pd.read_csv(args.data)
+    X, y = data.drop('treatment', axis=1), data['treatment']
+    # Same split as train_models.py, so the test rows were never seen by the teacher
+    X_train, X_test, _, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+    student, compiled, report = distill(teacher, scaler, X_train, X_test)
+    print(f"🎓 {type(teacher).__name__} ({teacher_path}) -> student: {format_report(report)}")
+    if report['agreement_test_rows'] < args.min_agreement:
+        print(f"⚠️ Agreement below {args.min_agreement * 100:.1f}%: keeping the teacher")
+    elif args.ship:
+        ship_student(teacher, student, compiled, scaler.transform(X_train))
+        print(f"✅ Student shipped as 'best_model.pkl' (compiled when it passes parity); teacher saved to '{TEACHER_PATH}'")
+    else:
+        print("✅ Agreement high enough; rerun with --ship to serve the student")
@@ -0,0 +1,239 @@
+# =======================================================================================
+# DRIFT MONITOR: LIVE ADVISOR INPUTS AGAINST THE DISTRIBUTION THE MODEL WAS TRAINED ON
+# =======================================================================================
+#
+# Usage:
+#   python drift_monitor.py                          # report; exit code 2 = drifted
+#   python drift_monitor.py --add contributions.csv  # feed contributed surveys, then report
+#   python drift_monitor.py --rebuild                # new reference from survey.csv
+#   python drift_monitor.py || [ $? -ne 2 ] || python train_models.py
+#
+# Every model feature gets a fixed set of bins: one per encoded answer, age in ranges. The
+# reference holds the bin counts of the surveyed workplaces the model was trained on; the
+# live side holds the same counts for advisor assessments and contributed surveys. Live
+# counts decay with a half-life of HALF_LIFE rows, so they describe recent inputs and
+# memory stays constant however many assessments arrive. An update adds one row's (or one
+# batch's) bins. Each feature is compared with two statistics:
+#   - PSI (population stability index); 0.1-0.25 is a moderate shift, above 0.25 a major one
+#   - KS, the largest gap between the cumulative bin shares, against the two-sample
+#     critical value at KS_ALPHA for the effective live sample size
+# Drift is flagged once at least MIN_LIVE rows (effective) have been seen and a feature
+# crosses PSI_THRESHOLD or its KS critical value. Flags are only worth acting on in
+# aggregate, so retraining is left to whoever reads them: the CLI exit code, the
+# advisor_drift_alerts_total counter, or the report in drift_monitor.json.
+# train_models.py rebuilds the reference and clears the live counts.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from advisor_features import AGE_RANGE, ENCODING_MAPS, encode_inputs, survey_inputs
+
+MONITOR_PATH = 'drift_monitor.json'
+SURVEY_PATH = 'survey.csv'
+AGE_EDGES = (AGE_RANGE[0], 25, 30, 35, 40, 45, 50, 60)
+HALF_LIFE = 1000            # Live rows after which an observation weighs half
+MIN_LIVE = 100              # Effective live rows before any flag is raised
+PSI_THRESHOLD = 0.25
+KS_ALPHA_COEFFICIENT = 1.628    # c(alpha) of the two-sample KS test at alpha = 0.01
+SAVE_EVERY = 20             # Advisor assessments between writes of the monitor file
+EPSILON = 1e-4              # Floor for empty bin shares in PSI
+
+
+def feature_bins():
+    """Lower bin edges per model feature, in encode_inputs order"""
+    bins = {'Age': AGE_EDGES}
+    bins.update({name: tuple(sorted(mapping.values())) for name, mapping in ENCODING_MAPS.items()})
+    bins['Gender_male'] = bins['Gender_other'] = (0, 1)
+    return bins
+
+
+def bin_counts(values, edges):
+    """Counts per bin; values below the first edge fall into the first bin"""
+    positions = np.searchsorted(np.asarray(edges, dtype=float), np.asarray(values, dtype=float), side='right') - 1
+    return np.bincount(np.clip(positions, 0, len(edges) - 1), minlength=len(edges)).astype(float)
+
+
+def psi(reference, live):
+    expected = np.maximum(reference / reference.sum(), EPSILON)
+    actual = np.maximum(live / live.sum(), EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks(reference, live):
+    return float(np.max(np.abs(np.cumsum(reference / reference.sum()) - np.cumsum(live / live.sum()))))
+
+
+class DriftMonitor:
+    """Reference and decayed live bin counts per feature; updates are thread-safe"""
+
+    def __init__(self, bins, reference, live=None, live_weight=0.0, live_weight_sq=0.0, pending=0, drifted=False):
+        self.bins = bins
+        self.reference = reference
+        self.live = live or {feature: np.zeros(len(edges)) for feature, edges in bins.items()}
+        self.live_weight = live_weight          # Sum of the decayed weights
+        self.live_weight_sq = live_weight_sq    # Sum of their squares, for the effective sample size
+        self.pending = pending
+        self.drifted = drifted
+        self.decay = 0.5 ** (1 / HALF_LIFE)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_reference(cls, features):
+        """A monitor with `features` (one column per model feature) as the reference and no live rows"""
+        bins = feature_bins()
+        return cls(bins, {feature: bin_counts(features[feature], edges) for feature, edges in bins.items()})
+
+    @property
+    def reference_rows(self):
+        return int(next(iter(self.reference.values())).sum())
+
+    @property
+    def live_rows(self):
+        """Effective number of live rows, (sum w)^2 / sum w^2"""
+        return self.live_weight ** 2 / self.live_weight_sq if self.live_weight_sq else 0.0
+
+    def update(self, features):
+        """Fold rows of a frame with one column per model feature into the live counts"""
+        n = len(features)
+        batch = {feature: bin_counts(features[feature], edges) for feature, edges in self.bins.items()}
+        with self.lock:
+            factor = self.decay ** n
+            for feature, counts in batch.items():
+                self.live[feature] = self.live[feature] * factor + counts
+            self.live_weight = self.live_weight * factor + n
+            self.live_weight_sq = self.live_weight_sq * factor ** 2 + n
+            self.pending += n
+        return self
+
+    def report(self):
+        """Per-feature PSI and KS, and whether drift crosses the thresholds"""
+        with self.lock:
+            live = {feature: counts.copy() for feature, counts in self.live.items()}
+            live_rows = self.live_rows
+        reference_rows = self.reference_rows
+        features = []
+        if live_rows:
+            ks_critical = KS_ALPHA_COEFFICIENT * np.sqrt((reference_rows + live_rows) / (reference_rows * live_rows))
+            for feature, reference in self.reference.items():
+                feature_psi, feature_ks = psi(reference, live[feature]), ks(reference, live[feature])
+                features.append({
+                    'feature': feature, 'psi': round(feature_psi, 4), 'ks': round(feature_ks, 4),
+                    'drifted': bool(live_rows >= MIN_LIVE and (feature_psi >= PSI_THRESHOLD or feature_ks > ks_critical)),
+                })
+            features.sort(key=lambda row: row['psi'], reverse=True)
+        drifted = [row['feature'] for row in features if row['drifted']]
+        return {'reference_rows': reference_rows, 'live_rows': round(live_rows, 1),
+                'drifted': bool(drifted), 'drifted_features': drifted, 'features': features}
+
+    def record(self, features, path=MONITOR_PATH):
+        """Update from the advisor; every SAVE_EVERY rows, re-check and save. True when drift is newly flagged"""
+        self.update(features)
+        # The monitor is shared by every session: one caller claims the check, and only the
+        # first to see the drift reports it
+        with self.lock:
+            if self.pending < SAVE_EVERY:
+                return False
+            self.pending = 0
+        report = self.report()
+        with self.lock:
+            newly_drifted = report['drifted'] and not self.drifted
+            self.drifted = report['drifted']
+        if newly_drifted:
+            warnings.warn(f"Advisor inputs drifted from the training data: {', '.join(report['drifted_features'])}")
+        try:
+            self.save(path, report)
+        except OSError as e:
+            warnings.warn(f"Could not write the drift monitor to {path}: {e}")
+        return newly_drifted
+
+    # --- PERSISTENCE ---
+    def save(self, path=MONITOR_PATH, report=None):
+        """Atomically replace `path`; the latest report is stored alongside for readers without numpy"""
+        report = report or self.report()
+        with self.lock:
+            data = {
+                'bins': {feature: list(edges) for feature, edges in self.bins.items()},
+                'reference': {feature: counts.tolist() for feature, counts in self.reference.items()},
+                'live': {feature: counts.tolist() for feature, counts in self.live.items()},
+                'live_weight': self.live_weight, 'live_weight_sq': self.live_weight_sq,
+                'report': report,
+            }
+            self.pending = 0
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MONITOR_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data['bins'] != {feature: list(edges) for feature, edges in feature_bins().items()}:
+            raise ValueError(f"{path} was built with different feature bins; rebuild it with drift_monitor.py --rebuild")
+        return cls(
+            {feature: tuple(edges) for feature, edges in data['bins'].items()},
+            {feature: np.array(counts) for feature, counts in data['reference'].items()},
+            {feature: np.array(counts) for feature, counts in data['live'].items()},
+            data['live_weight'], data['live_weight_sq'], drifted=data['report']['drifted'],
+        )
+
+
+def survey_features(responses):
+    """Model feature rows for survey-format responses, encoded as the advisor encodes its answers"""
+    inputs, _ = survey_inputs(responses)
+    return pd.DataFrame([encode_inputs(answers) for answers in inputs], columns=list(feature_bins()))
+
+
+def build_monitor(responses):
+    return DriftMonitor.from_reference(survey_features(responses))
+
+
+def load_monitor(path=MONITOR_PATH):
+    """The saved monitor, or None when training has not produced one"""
+    return DriftMonitor.load(path) if os.path.exists(path) else None
+
+
+def format_report(report, top_k=5):
+    lines = [f"{'🚨 Drift detected' if report['drifted'] else '✅ No drift'}: "
+             f"{report['live_rows']:.0f} effective live rows vs {report['reference_rows']} reference rows"]
+    if report['live_rows'] < MIN_LIVE:
+        lines.append(f"   (flags start after {MIN_LIVE} live rows)")
+    for row in report['features'][:top_k]:
+        lines.append(f"   {'⚠️' if row['drifted'] else '  '} {row['feature']:<28} PSI {row['psi']:.3f}  KS {row['ks']:.3f}")
+    return '\n'.join(lines)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check advisor inputs and contributed surveys for drift from the training data.")
+    parser.add_argument('--survey', default=SURVEY_PATH)
+    parser.add_argument('--add', metavar='CSV', help='Survey-format responses to add to the live counts')
+    parser.add_argument('--rebuild', action='store_true', help='Replace the reference with --survey and clear the live counts')
+    parser.add_argument('-o', '--output', default=MONITOR_PATH)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.rebuild:
+        monitor = build_monitor(pd.read_csv(args.survey))
+        print(f"✅ Reference built from {monitor.reference_rows} surveyed workplaces")
+    elif not os.path.exists(args.output):
+        print(f"ERROR: {args.output} not found; build it first with `python drift_monitor.py --rebuild`.", file=sys.stderr)
+        sys.exit(1)
+    else:
+        monitor = DriftMonitor.load(args.output)
+    if args.add:
+        features = survey_features(pd.read_csv(args.add))
+        monitor.update(features)
+        print(f"➕ Added {len(features)} contributed responses")
+    report = monitor.report()
+    monitor.save(args.output, report)
+    print(format_report(report))
+    sys.exit(2 if report['drifted'] else 0)
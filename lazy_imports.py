@@ -0,0 +1,62 @@
+# =======================================================================================
+# LAZY IMPORTS: HEAVY MODULES LOAD IN THE SECTION THAT USES THEM
+# =======================================================================================
+#
+# Pages load shap, plotly and fpdf through load() inside the functions that need them,
+# so the first render only pays for Streamlit and pandas. prefetch() then warms those
+# modules on a background thread once per process, which keeps the first click on a
+# heavy section from paying the full import cost.
+# Two threads initializing the same package can see it half-imported (shap's circular
+# imports fail that way), so every lazy import, including the implicit ones done by
+# unpickling, runs under one lock shared with the prefetch thread.
+# Measure the effect with benchmarks/profile_startup.py; WELLNESS_PREFETCH_IMPORTS=0 turns
+# prefetching off (e.g. on memory-constrained hosts).
+
+import importlib
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+PREFETCH_ENV = 'WELLNESS_PREFETCH_IMPORTS'
+
+_requested = set()
+_requested_lock = threading.Lock()
+_import_lock = threading.RLock()
+
+
+@contextmanager
+def imports_settled():
+    """Run a block that imports modules itself (e.g. pickle.load) without racing the prefetch thread"""
+    with _import_lock:
+        yield
+
+
+def load(module_name):
+    """Import and return `module_name`, waiting for a prefetch of it that is in progress"""
+    module = sys.modules.get(module_name)
+    if module is not None and not getattr(getattr(module, '__spec__', None), '_initializing', False):
+        return module
+    with _import_lock:
+        return importlib.import_module(module_name)
+
+
+def _import_all(module_names):
+    for name in module_names:
+        # One module per lock hold, so a waiting script run can slip in between modules
+        with _import_lock:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass  # The section that needs the module reports the error when it loads it
+
+
+def prefetch(*module_names):
+    """Import `module_names` on a daemon thread; each module is requested at most once per process"""
+    if os.environ.get(PREFETCH_ENV, '1') == '0':
+        return
+    with _requested_lock:
+        pending = [name for name in module_names if name not in _requested and name not in sys.modules]
+        _requested.update(pending)
+    if pending:
+        threading.Thread(target=_import_all, args=(pending,), name='prefetch-imports', daemon=True).start()
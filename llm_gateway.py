@@ -0,0 +1,218 @@
+# =======================================================================================
+# SHARED LLM GATEWAY: RATE LIMITING, RETRIES AND REQUEST COALESCING FOR GEMINI CALLS
+# =======================================================================================
+
+import hashlib
+import random
+import threading
+import time
+
+import streamlit as st
+
+import metrics
+from llm_providers import get_provider
+
+# --- 1. CONFIGURATION ---
+RATE_PER_SECOND = 4.0      # Sustained Gemini requests per second for the whole process
+BURST_CAPACITY = 8         # Requests allowed back-to-back before the limiter kicks in
+ACQUIRE_TIMEOUT = 30.0     # Seconds a caller waits for a token before giving up
+MAX_RETRIES = 4
+BASE_BACKOFF = 0.5         # Seconds; doubled on every attempt
+MAX_BACKOFF = 8.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# --- METRICS ---
+LLM_REQUEST_SECONDS = metrics.histogram('llm_request_seconds', "Provider call time per attempt (to the first chunk when streaming)")
+LLM_RATE_LIMIT_WAIT_SECONDS = metrics.histogram('llm_rate_limit_wait_seconds', "Time spent waiting for a rate-limit token")
+LLM_RETRIES = metrics.counter('llm_retries_total', "Provider attempts retried after a transient error")
+LLM_COALESCED = metrics.counter('llm_coalesced_total', "Requests answered by an identical in-flight call")
+LLM_ERRORS = metrics.counter('llm_errors_total', "Generations that failed after all retries")
+# Lookups are recorded by the pages, misses by cached_generate below
+LLM_CACHE_LOOKUPS = metrics.counter('llm_cache_lookups_total', "Cached generation lookups")
+LLM_CACHE_MISSES = metrics.counter('llm_cache_misses_total', "Cached generation lookups that reached the gateway")
+
+
+class LLMError(Exception):
+    """Raised when a generation fails; never cached by callers"""
+
+
+class RateLimitExceeded(LLMError):
+    """Raised when no request token became available within the acquire timeout"""
+
+
+# --- 2. TOKEN BUCKET ---
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate=RATE_PER_SECOND, capacity=BURST_CAPACITY):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        """Block until a token is available; returns False if `timeout` expires first"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# --- 3. SINGLE-FLIGHT COALESCING ---
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Identical concurrent requests share one in-flight call and its outcome"""
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            LLM_COALESCED.inc()
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+# --- 4. RETRY WITH JITTERED EXPONENTIAL BACKOFF ---
+def is_retryable(error):
+    """Quota, overload and transient server errors are worth retrying"""
+    if isinstance(error, RateLimitExceeded):
+        return False
+    code = getattr(error, 'code', None)
+    code = getattr(code, 'value', code)
+    if code in RETRYABLE_STATUS_CODES:
+        return True
+    return type(error).__name__ in {
+        'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+        'InternalServerError', 'DeadlineExceeded', 'TimeoutError', 'ConnectionError'
+    }
+
+
+def backoff_delay(attempt, base=BASE_BACKOFF, cap=MAX_BACKOFF):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_retries(fn, max_retries=MAX_RETRIES, sleep=time.sleep):
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            LLM_RETRIES.inc()
+            sleep(backoff_delay(attempt))
+
+
+# --- 5. GATEWAY ---
+class LLMGateway:
+    """Entry point for every LLM call in the app; the backend is a pluggable provider"""
+
+    def __init__(self, provider=None, limiter=None, max_retries=MAX_RETRIES):
+        self.provider = provider if provider is not None else get_provider()
+        self.limiter = limiter if limiter is not None else TokenBucket()
+        self.max_retries = max_retries
+        self.flights = SingleFlight()
+
+    def _acquire(self):
+        with LLM_RATE_LIMIT_WAIT_SECONDS.time():
+            acquired = self.limiter.acquire()
+        if not acquired:
+            raise RateLimitExceeded("Too many AI requests right now. Please try again shortly.")
+
+    def _attempt(self, model_name, prompt):
+        self._acquire()
+        with LLM_REQUEST_SECONDS.labels(model=model_name).time():
+            return self.provider.generate(model_name, prompt)
+
+    def _open_stream(self, model_name, prompt):
+        self._acquire()
+        with LLM_REQUEST_SECONDS.labels(model=model_name).time():
+            chunks = iter(self.provider.stream(model_name, prompt))
+            return next(chunks, ''), chunks
+
+    def generate(self, model_name, prompt):
+        """Rate-limited, retried and coalesced generation; raises LLMError on failure"""
+        key = hashlib.sha256(f'{model_name}\0{prompt}'.encode('utf-8')).hexdigest()
+        try:
+            return self.flights.do(
+                key, lambda: call_with_retries(lambda: self._attempt(model_name, prompt), self.max_retries)
+            )
+        except LLMError as e:
+            LLM_ERRORS.labels(error=type(e).__name__).inc()
+            raise
+        except Exception as e:
+            LLM_ERRORS.labels(error=type(e).__name__).inc()
+            raise LLMError(str(e)) from e
+
+    def stream(self, model_name, prompt):
+        """Rate-limited streaming generation; retries only apply until the first chunk arrives"""
+        try:
+            first, chunks = call_with_retries(lambda: self._open_stream(model_name, prompt), self.max_retries)
+            yield first
+            yield from chunks
+        except LLMError as e:
+            LLM_ERRORS.labels(error=type(e).__name__).inc()
+            raise
+        except Exception as e:
+            LLM_ERRORS.labels(error=type(e).__name__).inc()
+            raise LLMError(str(e)) from e
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide gateway shared by every page and session"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour, shared by every page
+def cached_generate(model_name, prompt, _page):
+    """Successful generations only: gateway errors propagate, and st.cache_data never caches exceptions.
+    `_page` only labels the miss counter; the leading underscore keeps it out of the cache key"""
+    LLM_CACHE_MISSES.labels(page=_page).inc()
+    return get_gateway().generate(model_name, prompt)
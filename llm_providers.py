@@ -0,0 +1,131 @@
+# =======================================================================================
+# PLUGGABLE LLM PROVIDERS: GEMINI AND AN OFFLINE STAND-IN FOR LOAD TESTING
+# =======================================================================================
+#
+# Select the provider with the WELLNESS_LLM_PROVIDER environment variable:
+#   gemini  (default) - live Google Gemini API
+#   standin           - local stand-in with simulated latency, streaming and failures
+#
+# Stand-in behaviour is tuned with STANDIN_LATENCY ('lognormal', 'uniform' or 'fixed'),
+# STANDIN_MEDIAN_S, STANDIN_SPREAD, STANDIN_TOKENS_PER_S, STANDIN_FAILURE_RATE and STANDIN_SEED.
+
+import hashlib
+import os
+import random
+import threading
+import time
+
+PROVIDER_ENV = 'WELLNESS_LLM_PROVIDER'
+
+
+class GeminiProvider:
+    """Live Google Gemini backend"""
+
+    name = 'gemini'
+    requires_api_key = True
+
+    def generate(self, model_name, prompt):
+        import google.generativeai as genai
+        return genai.GenerativeModel(model_name).generate_content(prompt).text
+
+    def stream(self, model_name, prompt):
+        import google.generativeai as genai
+        for chunk in genai.GenerativeModel(model_name).generate_content(prompt, stream=True):
+            yield chunk.text
+
+
+class InjectedFailure(Exception):
+    """Simulated quota error; carries an HTTP-style code so the gateway treats it as retryable"""
+
+    code = 429
+
+
+class StandInProvider:
+    """Offline provider with configurable latency distribution, token streaming and failure injection"""
+
+    name = 'standin'
+    requires_api_key = False
+
+    def __init__(self, latency='lognormal', median_s=0.8, spread=0.5, tokens_per_s=80.0,
+                 failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.median_s = median_s
+        self.spread = spread
+        self.tokens_per_s = tokens_per_s
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        seed = os.environ.get('STANDIN_SEED')
+        return cls(
+            latency=os.environ.get('STANDIN_LATENCY', 'lognormal'),
+            median_s=float(os.environ.get('STANDIN_MEDIAN_S', 0.8)),
+            spread=float(os.environ.get('STANDIN_SPREAD', 0.5)),
+            tokens_per_s=float(os.environ.get('STANDIN_TOKENS_PER_S', 80.0)),
+            failure_rate=float(os.environ.get('STANDIN_FAILURE_RATE', 0.0)),
+            seed=int(seed) if seed is not None else None,
+        )
+
+    def sample_latency(self):
+        """Time to first token, drawn from the configured distribution"""
+        with self.lock:
+            if self.latency == 'fixed':
+                return self.median_s
+            if self.latency == 'uniform':
+                return self.rng.uniform(self.median_s * (1 - self.spread), self.median_s * (1 + self.spread))
+            return self.rng.lognormvariate(0, self.spread) * self.median_s
+
+    def maybe_fail(self):
+        with self.lock:
+            failed = self.rng.random() < self.failure_rate
+        if failed:
+            raise InjectedFailure("Stand-in provider: injected quota error (429)")
+
+    def compose(self, model_name, prompt):
+        """Deterministic markdown reply derived from the prompt"""
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        return (
+            f"**Executive Summary**\n\nStand-in response {digest} from `{model_name}` "
+            f"for a {len(prompt)}-character prompt.\n\n"
+            "**Key Points**\n"
+            "- Encourage open conversations about mental health.\n"
+            "- Make support resources easy to find and use.\n"
+            "- Review progress regularly with your team.\n"
+        )
+
+    def generate(self, model_name, prompt):
+        time.sleep(self.sample_latency())
+        self.maybe_fail()
+        text = self.compose(model_name, prompt)
+        time.sleep(len(text.split()) / self.tokens_per_s)
+        return text
+
+    def stream(self, model_name, prompt):
+        time.sleep(self.sample_latency())
+        self.maybe_fail()
+        for word in self.compose(model_name, prompt).split(' '):
+            time.sleep(1 / self.tokens_per_s)
+            yield word + ' '
+
+
+PROVIDERS = {
+    'gemini': GeminiProvider,
+    'standin': StandInProvider.from_env,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Process-wide provider chosen by WELLNESS_LLM_PROVIDER"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            name = os.environ.get(PROVIDER_ENV, 'gemini').lower()
+            if name not in PROVIDERS:
+                raise ValueError(f"Unknown LLM provider '{name}'. Choose one of: {', '.join(PROVIDERS)}")
+            _provider = PROVIDERS[name]()
+        return _provider
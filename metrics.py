@@ -0,0 +1,240 @@
+# =======================================================================================
+# IN-PROCESS METRICS: COUNTERS, LATENCY HISTOGRAMS AND PROMETHEUS TEXT EXPORT
+# =======================================================================================
+#
+# A dependency-free subset of prometheus_client, cheap enough to leave on in production:
+# recording is a dict lookup, a bisect and a few additions under a per-series lock. All
+# sessions and worker threads of the server record into one process-wide registry.
+# Metrics are exported in the Prometheus text format:
+#   - WELLNESS_METRICS_PORT=9464 serves them at http://127.0.0.1:9464/metrics
+#   - WELLNESS_METRICS_FILE=/var/lib/node_exporter/wellness.prom rewrites that file every
+#     15 seconds (node_exporter textfile collector)
+#   - the System Metrics view on the chatbot page offers them as a download
+
+import bisect
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PORT_ENV = 'WELLNESS_METRICS_PORT'
+FILE_ENV = 'WELLNESS_METRICS_FILE'
+FILE_INTERVAL = 15.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# --- 1. METRIC TYPES ---
+class Counter:
+    """Monotonically increasing value"""
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+
+class Histogram:
+    """Bucketed observations; counts[i] holds values <= buckets[i], the last slot is +Inf"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the block; also usable as a decorator"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def state(self):
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q):
+        """Interpolated estimate from the buckets, as Prometheus' histogram_quantile computes it"""
+        counts, _, total = self.state()
+        if not total:
+            return None
+        rank, cumulative = q * total, 0
+        for i, n in enumerate(counts):
+            if n and cumulative + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # Beyond the largest bucket: its bound is the best estimate
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+
+class Family:
+    """A named metric with one child series per label set"""
+
+    def __init__(self, name, kind, help_text, buckets=None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.buckets = buckets
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def labels(self, **labels):
+        key = tuple(sorted(labels.items()))
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.get(key)
+                if child is None:
+                    child = self.children[key] = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+        return child
+
+    # Shortcuts for metrics without labels
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+
+# --- 2. REGISTRY ---
+_families = {}
+_registry_lock = threading.Lock()
+
+
+def _family(name, kind, help_text, buckets=None):
+    family = _families.get(name)
+    if family is None:
+        with _registry_lock:
+            family = _families.setdefault(name, Family(name, kind, help_text, buckets))
+    if family.kind != kind:
+        raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+    return family
+
+
+def counter(name, help_text):
+    """Get or create a counter family; safe to call on every script rerun"""
+    return _family(name, 'counter', help_text)
+
+
+def histogram(name, help_text, buckets=LATENCY_BUCKETS):
+    """Get or create a histogram family; safe to call on every script rerun"""
+    return _family(name, 'histogram', help_text, buckets)
+
+
+def families():
+    with _registry_lock:
+        return sorted(_families.values(), key=lambda family: family.name)
+
+
+# --- 3. PROMETHEUS TEXT FORMAT ---
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def render_prometheus():
+    """Every registered metric in the Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for family in families():
+        lines.append(f'# HELP {family.name} {family.help}')
+        lines.append(f'# TYPE {family.name} {family.kind}')
+        for key, child in sorted(family.children.items()):
+            if family.kind == 'counter':
+                lines.append(f'{family.name}{_format_labels(key)} {_format_value(child.value)}')
+                continue
+            counts, total_sum, count = child.state()
+            cumulative = 0
+            for bound, n in zip(child.buckets + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{family.name}_bucket{_format_labels(key + (("le", le),))} {cumulative}')
+            lines.append(f'{family.name}_sum{_format_labels(key)} {_format_value(total_sum)}')
+            lines.append(f'{family.name}_count{_format_labels(key)} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Atomically replace `path` with the current metrics"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+# --- 4. EXPORTERS ---
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # Scrapes every few seconds would flood the server log
+
+
+def _write_periodically(path):
+    while True:
+        try:
+            write_prometheus(path)
+        except OSError as e:
+            warnings.warn(f"Could not write metrics to {path}: {e}")
+        time.sleep(FILE_INTERVAL)
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    """Start the HTTP endpoint and/or file writer configured in the environment, once per process"""
+    global _exporters_started
+    with _registry_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    port = os.environ.get(PORT_ENV)
+    if port:
+        try:
+            server = ThreadingHTTPServer(('127.0.0.1', int(port)), MetricsHandler)
+        except OSError as e:
+            warnings.warn(f"Metrics endpoint not started on port {port}: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    path = os.environ.get(FILE_ENV)
+    if path:
+        threading.Thread(target=_write_periodically, args=(path,), name='metrics-file', daemon=True).start()
+
+
+start_exporters()
@@ -0,0 +1,80 @@
+# =======================================================================================
+# ADMIN VIEW: LIVE METRICS FROM THE IN-PROCESS REGISTRY
+# =======================================================================================
+
+import streamlit as st
+
+import dashboard_charts
+import metrics
+import report_charts
+from llm_gateway import LLM_CACHE_LOOKUPS, LLM_CACHE_MISSES
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_text(key):
+    return ', '.join(f'{k}={v}' for k, v in key) or '—'
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _figure_cache_rows():
+    """Hits, misses and size of the memoized Plotly figures and PDF report charts"""
+    rows = []
+    for source, caches in (('Plotly', dashboard_charts.cache_info()), ('PDF', report_charts.cache_info())):
+        for name, info in caches.items():
+            lookups = info.hits + info.misses
+            rows.append({'Charts': source, 'Cache': name, 'Hits': info.hits, 'Misses': info.misses,
+                         'Hit rate': f"{info.hits / lookups:.0%}" if lookups else '—',
+                         'Size': f"{info.currsize}/{info.maxsize}"})
+    return rows
+
+
+@st.fragment
+def render_metrics_view():
+    """Cache hit rates, counters, latency percentiles and chart caches; Refresh reruns only this view"""
+    st.button("🔄 Refresh metrics")
+
+    # --- LLM CACHE HIT RATES ---
+    lookups = {dict(key).get('page'): child.value for key, child in LLM_CACHE_LOOKUPS.children.items()}
+    misses = {dict(key).get('page'): child.value for key, child in LLM_CACHE_MISSES.children.items()}
+    if lookups:
+        columns = st.columns(len(lookups))
+        for column, (page, count) in zip(columns, sorted(lookups.items())):
+            hit_rate = 1 - misses.get(page, 0) / count if count else 0
+            column.metric(f"LLM cache hit rate ({page})", f"{hit_rate:.0%}", f"{int(count)} lookups", delta_color="off")
+
+    # --- COUNTERS AND LATENCY HISTOGRAMS ---
+    counter_rows, latency_rows = [], []
+    for family in metrics.families():
+        for key, child in sorted(family.children.items()):
+            if family.kind == 'counter':
+                counter_rows.append({'Metric': family.name, 'Labels': _label_text(key), 'Value': child.value})
+                continue
+            _, total, count = child.state()
+            row = {'Metric': family.name, 'Labels': _label_text(key), 'Count': count,
+                   'Mean (ms)': _ms(total / count) if count else None}
+            row.update({f'p{int(q * 100)} (ms)': _ms(child.quantile(q)) for q in QUANTILES})
+            latency_rows.append(row)
+
+    st.markdown("**⏱️ Latency**")
+    if latency_rows:
+        st.dataframe(latency_rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No timings recorded yet.")
+    st.markdown("**🔢 Counters**")
+    if counter_rows:
+        st.dataframe(counter_rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No counters recorded yet.")
+    st.markdown("**🗂️ Chart caches**")
+    st.dataframe(_figure_cache_rows(), hide_index=True, use_container_width=True)
+
+    st.download_button(
+        "⬇️ Download Prometheus metrics", metrics.render_prometheus(),
+        file_name="wellness_metrics.prom", mime="text/plain"
+    )
+    st.caption(f"Percentiles are estimated from histogram buckets. Set {metrics.PORT_ENV} to serve "
+               f"/metrics or {metrics.FILE_ENV} to write a textfile-collector file.")
@@ -3,9 +3,17 @@
 # =======================================================================================
 
 import streamlit as st
-import google.generativeai as genai
 import time
 from datetime import datetime
+import metrics
+from crisis_filter import CRISIS_RESOURCES_FOOTER, CRISIS_RESPONSE, CRISIS_STAGES, CrisisFilter
+from llm_gateway import LLM_CACHE_LOOKUPS, LLMError, cached_generate
+from llm_providers import get_provider
+from metrics_view import render_metrics_view
+from theme import apply_theme
+from conversation import (
+    RENDER_WINDOW, compact_history, extractive_summary, format_context, trim_history
+)
 
 # Enhanced page configuration
 st.set_page_config(
@@ -15,208 +23,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Custom CSS for professional chatbot styling
-def load_chatbot_css():
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Global Styling */
-    html, body, [class*="css"] {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .main > div {
-        padding-top: 1rem;
-        max-width: 1200px;
-        margin: 0 auto;
-    }
-    
-    /* Header Section */
-    .chatbot-header {
-        background: linear-gradient(135deg, #4f46e5, #7c3aed);
-        padding: 2.5rem 2rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-        box-shadow: 0 10px 30px rgba(79, 70, 229, 0.3);
-    }
-    
-    .chatbot-title {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-    }
-    
-    .chatbot-subtitle {
-        font-size: 1.2rem;
-        opacity: 0.9;
-        margin-bottom: 1rem;
-    }
-    
-    .disclaimer-badge {
-        background: rgba(255,255,255,0.2);
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-size: 0.9rem;
-        display: inline-block;
-        backdrop-filter: blur(10px);
-    }
-    
-    /* Chat Interface Styling */
-    .chat-container {
-        background: white;
-        border-radius: 15px;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        border: 1px solid #e5e7eb;
-        margin-bottom: 2rem;
-        overflow: hidden;
-    }
-    
-    /* Enhanced message styling */
-    .stChatMessage {
-        padding: 1rem 1.5rem;
-        margin: 0.5rem 0;
-    }
-    
-    .stChatMessage[data-testid="chat-message-user"] {
-        background: linear-gradient(135deg, #eff6ff, #dbeafe);
-        border-left: 4px solid #3b82f6;
-    }
-    
-    .stChatMessage[data-testid="chat-message-assistant"] {
-        background: linear-gradient(135deg, #f0fdf4, #dcfce7);
-        border-left: 4px solid #10b981;
-    }
-    
-    /* Info Cards */
-    .info-card {
-        background: linear-gradient(145deg, #f8fafc, #e2e8f0);
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        border-left: 4px solid #4f46e5;
-    }
-    
-    .feature-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 1rem;
-        margin: 2rem 0;
-    }
-    
-    .feature-item {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.08);
-        border: 1px solid #e5e7eb;
-    }
-    
-    .feature-icon {
-        font-size: 2rem;
-        margin-bottom: 0.5rem;
-    }
-    
-    .feature-title {
-        font-weight: 600;
-        color: #374151;
-        margin-bottom: 0.5rem;
-    }
-    
-    .feature-description {
-        font-size: 0.9rem;
-        color: #6b7280;
-        line-height: 1.5;
-    }
-    
-    /* Crisis Resources */
-    .crisis-alert {
-        background: linear-gradient(135deg, #fef2f2, #fee2e2);
-        border: 2px solid #f87171;
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-    }
-    
-    .crisis-title {
-        color: #dc2626;
-        font-weight: 600;
-        margin-bottom: 1rem;
-    }
-    
-    .crisis-resource {
-        background: white;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 8px;
-        border-left: 3px solid #dc2626;
-    }
-    
-    /* Usage Statistics */
-    .stats-container {
-        background: linear-gradient(135deg, #1f2937, #374151);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 2rem 0;
-        text-align: center;
-    }
-    
-    .stat-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
-        gap: 1rem;
-        margin-top: 1rem;
-    }
-    
-    .stat-item {
-        text-align: center;
-    }
-    
-    .stat-number {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #60a5fa;
-    }
-    
-    .stat-label {
-        font-size: 0.8rem;
-        opacity: 0.8;
-        margin-top: 0.25rem;
-    }
-    
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        .chatbot-title {
-            font-size: 2rem;
-        }
-        .feature-grid {
-            grid-template-columns: 1fr;
-        }
-    }
-    
-    /* Custom Streamlit overrides */
-    .stChatInput > div {
-        border-radius: 25px !important;
-        border: 2px solid #e5e7eb !important;
-    }
-    
-    .stChatInput > div:focus-within {
-        border-color: #4f46e5 !important;
-        box-shadow: 0 0 0 3px rgba(79, 70, 229, 0.1) !important;
-    }
-    
-    .stSpinner {
-        text-align: center;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
 # Load custom styling
-load_chatbot_css()
+apply_theme('chatbot')
 
 # --- ENHANCED HEADER SECTION ---
 st.markdown("""
@@ -271,9 +79,11 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Configure the Gemini API Key from secrets
+# Configure the Gemini API Key from secrets (the offline stand-in provider needs none)
 try:
-    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
+    if get_provider().requires_api_key:
+        import google.generativeai as genai
+        genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
     api_configured = True
 except Exception:
     st.error("🔑 **API Configuration Error:** Gemini API Key not found. Please check your .streamlit/secrets.toml file.")
@@ -281,11 +91,19 @@ except Exception:
     api_configured = False
     st.stop()
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def get_chatbot_response(user_query):
+STAGE_SECONDS = metrics.histogram('chatbot_stage_seconds', "Time per stage of a chatbot answer")
+CRISIS_RESPONSES = metrics.counter('chatbot_crisis_responses_total', "Questions answered with the fixed crisis response")
+CRISIS_MENTIONS = metrics.counter('chatbot_crisis_mentions_total', "Questions that mention a crisis topic, answered with the resources appended")
+
+# Added to the prompt for messages the crisis filter classifies as a 'mention'
+CRISIS_MENTION_NOTE = """NOTE: The crisis pre-filter found that this message mentions suicide or self-harm, apparently
+    as a general question or a negated statement. The crisis intervention protocol still applies: if the
+    user may be in crisis, respond with the crisis response. Crisis resources are appended to your answer."""
+
+def get_chatbot_response(user_query, conversation_context="", crisis_mention=False):
     """Enhanced chatbot response function with better error handling and formatting"""
     
-    system_prompt = """
+    system_prompt = f"""
     You are a professional Mental Healthcare Information Assistant designed to provide clear, evidence-based information about mental healthcare topics. You maintain a warm, empathetic, and professional tone while strictly adhering to safety guidelines.
 
     **YOUR CORE RESPONSIBILITIES:**
@@ -309,13 +127,7 @@ def get_chatbot_response(user_query):
     3. **CRISIS INTERVENTION PROTOCOL:**
        If the user mentions self-harm, suicide, severe distress, or appears to be in crisis, respond ONLY with:
        
-       "I'm concerned about what you're sharing. Please know that immediate help is available:
-       
-       🚨 **Crisis Text Line:** Text HOME to 741741
-       📞 **National Suicide Prevention Lifeline:** Call or text 988
-       🌈 **The Trevor Project (LGBTQ+):** 1-866-488-7386
-       
-       These services have trained professionals ready to help you right now. Please reach out to them immediately."
+       "{CRISIS_RESPONSE}"
 
     4. **RESPONSE GUIDELINES:**
        - Use clear, accessible language
@@ -328,26 +140,88 @@ def get_chatbot_response(user_query):
        For non-mental health questions, politely redirect: "I specialize in mental healthcare information. For that topic, I'd recommend consulting other appropriate resources. Is there anything about mental health I can help you with?"
     """
     
+    # Enhanced prompt with context
+    full_prompt = f"""
+    {system_prompt}
+    
+    CURRENT CONTEXT: This is a mental healthcare information chatbot in a professional wellness platform.
+    
+    CONVERSATION SO FAR:
+    {conversation_context or "(This is the first question.)"}
+    
+    USER QUESTION: {user_query}
+    {CRISIS_MENTION_NOTE if crisis_mention else ""}
+    Please provide a helpful, informative response following all guidelines above.
+    """
+    
+    LLM_CACHE_LOOKUPS.labels(page='chatbot').inc()
     try:
-        gemini_model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Enhanced prompt with context
-        full_prompt = f"""
-        {system_prompt}
-        
-        CURRENT CONTEXT: This is a mental healthcare information chatbot in a professional wellness platform.
-        
-        USER QUESTION: {user_query}
-        
-        Please provide a helpful, informative response following all guidelines above.
-        """
-        
-        response = gemini_model.generate_content(full_prompt)
-        return response.text
-        
-    except Exception as e:
+        return cached_generate('gemini-2.0-flash', full_prompt, _page='chatbot')
+    except LLMError as e:
         return f"⚠️ I apologize, but I'm experiencing technical difficulties right now. Please try again in a moment, or contact the crisis resources above if you need immediate help. Error details: {str(e)}"
 
+@st.cache_resource
+def load_crisis_filter():
+    """Build the local keyword + naive Bayes crisis classifier once per process"""
+    return CrisisFilter()
+
+def summarize_turns(summary, turns):
+    """Fold older turns into the running summary with Gemini, falling back to a local extractive summary"""
+    transcript = format_context("", turns)
+    prompt = f"""
+    Update this running summary of a mental healthcare information chat. Keep it under 150 words,
+    as short bullet points capturing the topics asked about and key facts already given.
+    
+    CURRENT SUMMARY:
+    {summary or "(empty)"}
+    
+    NEW TURNS:
+    {transcript}
+    """
+    LLM_CACHE_LOOKUPS.labels(page='chatbot').inc()
+    try:
+        return cached_generate('gemini-2.0-flash', prompt, _page='chatbot').strip()
+    except LLMError:
+        return extractive_summary(summary, turns)
+
+def build_conversation_context():
+    """Compact older turns into the session's running summary and return the context for the next question"""
+    history = st.session_state.messages[:-1]  # Everything before the question being answered
+    summary, summarized_upto = compact_history(
+        history, st.session_state.chat_summary, st.session_state.summarized_upto, summarize_turns
+    )
+    st.session_state.chat_summary = summary
+    st.session_state.summarized_upto = summarized_upto
+    return format_context(summary, history[summarized_upto:])
+
+def respond(user_query):
+    """Answer crisis messages locally with the fixed resources response; everything else goes to Gemini
+
+    Messages that only mention a crisis topic are answered by Gemini with the resources appended.
+    """
+    with STAGE_SECONDS.labels(stage='crisis_check').time():
+        stage = load_crisis_filter().classify(user_query)
+    if stage in CRISIS_STAGES:
+        CRISIS_RESPONSES.inc()
+        return CRISIS_RESPONSE
+    with STAGE_SECONDS.labels(stage='context').time():
+        context = build_conversation_context()
+    with STAGE_SECONDS.labels(stage='answer').time():
+        response = get_chatbot_response(user_query, context, crisis_mention=stage == 'mention')
+    if stage == 'mention':
+        CRISIS_MENTIONS.inc()
+        if CRISIS_RESPONSE not in response:  # Gemini may have applied the crisis protocol itself
+            response = f"{response}\n\n{CRISIS_RESOURCES_FOOTER}"
+    return response
+
+def record_response(response):
+    """Append the assistant reply and keep the stored history bounded"""
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    st.session_state.messages, st.session_state.summarized_upto = trim_history(
+        st.session_state.messages, st.session_state.summarized_upto
+    )
+    st.session_state.chat_count += 1
+
 # Initialize enhanced chat history
 if "messages" not in st.session_state:
     st.session_state.messages = [
@@ -360,11 +234,25 @@ if "messages" not in st.session_state:
 if "chat_count" not in st.session_state:
     st.session_state.chat_count = 0
 
+if "chat_summary" not in st.session_state:
+    st.session_state.chat_summary = ""  # Running summary of turns compacted out of the prompt context
+    st.session_state.summarized_upto = 1  # Index of the first message not yet folded into the summary
+
+if "render_window" not in st.session_state:
+    st.session_state.render_window = RENDER_WINDOW
+
 # --- CHAT INTERFACE ---
 st.markdown('<div class="chat-container">', unsafe_allow_html=True)
 
+# Display only the most recent window of messages; older ones are paged in on demand
+hidden_count = max(0, len(st.session_state.messages) - st.session_state.render_window)
+if hidden_count:
+    if st.button(f"⬆️ Show {min(hidden_count, RENDER_WINDOW)} earlier messages", key="show_earlier"):
+        st.session_state.render_window += RENDER_WINDOW
+        st.rerun()
+
 # Display chat messages with enhanced styling
-for i, message in enumerate(st.session_state.messages):
+for message in st.session_state.messages[hidden_count:]:
     with st.chat_message(message["role"], avatar="🤖" if message["role"] == "assistant" else "👤"):
         st.markdown(message["content"])
 
@@ -395,11 +283,10 @@ if len(st.session_state.messages) <= 1:
             # Get and display response
             with st.chat_message("assistant", avatar="🤖"):
                 with st.spinner("🔍 Searching for information..."):
-                    response = get_chatbot_response(question)
+                    response = respond(question)
                     st.markdown(response)
             
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.session_state.chat_count += 1
+            record_response(response)
             st.rerun()
 
 # Main chat input
@@ -412,12 +299,11 @@ if prompt := st.chat_input("💬 Ask me about mental healthcare topics...", key=
     # Generate and display assistant response
     with st.chat_message("assistant", avatar="🤖"):
         with st.spinner("🔍 Finding information..."):
-            response = get_chatbot_response(prompt)
+            response = respond(prompt)
             st.markdown(response)
     
     # Add assistant response to history
-    st.session_state.messages.append({"role": "assistant", "content": response})
-    st.session_state.chat_count += 1
+    record_response(response)
 
 # --- USAGE STATISTICS ---
 if st.session_state.chat_count > 0:
@@ -446,6 +332,9 @@ if len(st.session_state.messages) > 1:
     if st.button("🗑️ Clear Chat History", type="secondary"):
         st.session_state.messages = st.session_state.messages[:1]  # Keep welcome message
         st.session_state.chat_count = 0
+        st.session_state.chat_summary = ""
+        st.session_state.summarized_upto = 1
+        st.session_state.render_window = RENDER_WINDOW
         st.rerun()
 
 # --- FOOTER INFORMATION ---
@@ -469,11 +358,8 @@ with st.expander("ℹ️ Important Information & Disclaimers"):
     - Insurance and coverage questions
     """)
 
-# --- TECHNICAL INFO (FOR DEVELOPERS) ---
-if st.checkbox("🔧 Show Technical Information", value=False):
-    st.markdown("**System Status:**")
-    st.write(f"- API Status: {'✅ Connected' if api_configured else '❌ Not Connected'}")
-    st.write(f"- Session Messages: {len(st.session_state.messages)}")
-    st.write(f"- Questions Asked: {st.session_state.chat_count}")
-    st.write(f"- Model: Gemini-2.0-Flash")
-    st.write(f"- Cache TTL: 1 hour")
\ No newline at end of file
+# --- SYSTEM METRICS (FOR DEVELOPERS) ---
+if st.toggle("🔧 Show System Metrics", value=False):
+    st.markdown(f"**System Status:** API {'✅ Connected' if api_configured else '❌ Not Connected'} • "
+                f"Model Gemini-2.0-Flash • LLM Provider {get_provider().name} • Cache TTL 1 hour")
+    render_metrics_view()
\ No newline at end of file
@@ -0,0 +1,128 @@
+# =======================================================================================
+# SURVEY ANALYTICS: SLICE THE RAW SURVEY BY COUNTRY, STATE, COMPANY SIZE AND MORE
+# =======================================================================================
+
+import streamlit as st
+
+from dashboard_charts import segment_rates_figure, trend_figure
+from survey_cube import DIMENSIONS, load_cube
+from survey_trends import WINDOWS, load_trends
+from theme import apply_theme
+
+# --- PAGE CONFIGURATION ---
+st.set_page_config(
+    page_title="Survey Analytics | AI Wellness Hub",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+apply_theme('advisor')
+
+# --- HEADER SECTION ---
+st.markdown("""
+<div class="main-header">
+    <h1>📊 Survey Analytics</h1>
+    <p style="font-size: 1.2em; margin-top: 1rem; opacity: 0.9;">
+        How treatment-seeking varies across the surveyed tech workplaces
+    </p>
+</div>
+""", unsafe_allow_html=True)
+
+@st.cache_resource
+def load_survey_cube():
+    """Precomputed aggregate cube (survey_cube.py); widget changes query it instead of the CSV"""
+    return load_cube()
+
+@st.cache_resource
+def load_survey_trends():
+    """Per-week and per-month running aggregates (survey_trends.py); charts read these, never the CSV"""
+    return load_trends()
+
+def filter_sidebar(cube):
+    """One multiselect per dimension; an empty selection means no filter"""
+    st.markdown("### 🔎 Filters")
+    filters = {}
+    for dimension, label in DIMENSIONS.items():
+        counts = dict(cube.options(dimension))
+        filters[dimension] = st.multiselect(
+            label, list(counts), key=f'filter_{dimension}', format_func=lambda value, c=counts: f"{value} ({c[value]})"
+        )
+    return {dimension: values for dimension, values in filters.items() if values}
+
+def render_segments(cube, filters):
+    dimension_names = list(DIMENSIONS)
+    col1, col2 = st.columns(2)
+    with col1:
+        group_by = st.selectbox("Group by", dimension_names, index=dimension_names.index('no_employees'),
+                                format_func=DIMENSIONS.get)
+    with col2:
+        then_by = st.selectbox("Then by (optional)", [None] + [d for d in dimension_names if d != group_by],
+                               format_func=lambda d: "—" if d is None else DIMENSIONS[d])
+    
+    # Headline numbers for the selection, against everyone surveyed
+    overall = cube.slice()
+    selected = cube.slice(filters)
+    respondents, rate = int(selected['Respondents'][0]), float(selected['Treatment Rate'][0])
+    overall_rate = float(overall['Treatment Rate'][0])
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Respondents in selection", f"{respondents:,}", f"of {cube.respondents:,}", delta_color="off")
+    col2.metric("Sought treatment", f"{rate:.0%}" if respondents else "—",
+                f"{(rate - overall_rate) * 100:+.1f} pts vs all" if respondents else None, delta_color="inverse")
+    col3.metric("Cells in cube", f"{len(cube.count):,}")
+    if not respondents:
+        st.info("No respondents match these filters.")
+        return
+    
+    # Treatment rate per group
+    groups = cube.slice(filters, [group_by])
+    st.plotly_chart(segment_rates_figure(groups, DIMENSIONS[group_by], overall_rate), use_container_width=True)
+    
+    if then_by is None:
+        table = groups
+    else:
+        st.markdown(f"#### {DIMENSIONS[group_by]} × {DIMENSIONS[then_by]}: treatment rate (%)")
+        table = cube.slice(filters, [group_by, then_by])
+        pivot = table.pivot(index=DIMENSIONS[group_by], columns=DIMENSIONS[then_by], values='Treatment Rate') * 100
+        st.dataframe(pivot.reindex(groups[DIMENSIONS[group_by]]).round(0), use_container_width=True)
+    
+    table = table.assign(**{'Treatment Rate': (table['Treatment Rate'] * 100).round(1)})
+    st.dataframe(table, hide_index=True, use_container_width=True, column_config={
+        'Treatment Rate': st.column_config.NumberColumn(format="%.1f%%")
+    })
+    st.download_button("⬇️ Download this slice (CSV)", table.to_csv(index=False),
+                       file_name="survey_slice.csv", mime="text/csv")
+    st.caption("Small groups are noisy: check the respondent count before comparing rates.")
+
+def render_trends(store):
+    """Treatment rate, scores and answer shares per time window, from the precomputed aggregates"""
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        window = st.radio("Window", list(WINDOWS), index=1, format_func=str.title, horizontal=True)
+        trailing = st.slider("Pool with previous windows", 1, 6, 1,
+                             help="Each point pools its window with this many windows in total, smoothing small ones")
+    frame = store.series(window, trailing)
+    choices = [column for column in frame.columns if column not in ('Window', 'Respondents')]
+    with col2:
+        columns = st.multiselect("Show", choices, default=['Treatment Rate', 'Support Score', 'Culture Score'])
+    
+    st.plotly_chart(trend_figure(frame, columns), use_container_width=True)
+    st.dataframe(frame, hide_index=True, use_container_width=True, column_config={
+        column: st.column_config.NumberColumn(format="%.2f") for column in choices
+    })
+    st.caption("Trends cover all respondents; the sidebar filters apply to the Segments tab. "
+               "Windows without responses are skipped.")
+
+def main():
+    cube = load_survey_cube()
+    with st.sidebar:
+        filters = filter_sidebar(cube)
+    
+    segments_tab, trends_tab = st.tabs(["🧩 Segments", "📈 Trends"])
+    with segments_tab:
+        render_segments(cube, filters)
+    with trends_tab:
+        render_trends(load_survey_trends())
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,204 @@
+# =======================================================================================
+# PEER INDEX: PERCENTILE RANK AGAINST THE SURVEYED WORKPLACES, FROM MERGEABLE SKETCHES
+# =======================================================================================
+#
+# Usage:
+#   python peer_index.py                              # rebuild from survey.csv
+#   python peer_index.py --add contributions.csv      # merge new responses, no rescan
+#   python peer_index.py --merge other_index.json     # merge an index built elsewhere
+#
+# Each metric (support score, culture score, model probability, all on a 0-100 scale) is
+# kept as a fixed-resolution histogram over [0, 100] with SKETCH_BINS bins. A lookup
+# binary-searches the bin edges and reads the precomputed cumulative counts, so its cost
+# does not depend on how many workplaces have been indexed. Two sketches merge by adding
+# their counts, so new responses are indexed on their own and folded in without touching
+# the survey again. Ranks are exact up to one bin (0.1 points). Both scores take only a
+# dozen distinct values, and each value falls in its own bin, so ties are counted exactly.
+# Rows are scored exactly as the advisor scores its sidebar answers.
+# train_models.py rebuilds the index with the served model.
+
+import argparse
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+from advisor_features import calculate_wellness_scores, encode_inputs, survey_inputs
+
+INDEX_PATH = 'peer_index.json'
+SURVEY_PATH = 'survey.csv'
+SKETCH_BINS = 1000
+METRICS = ('support_score', 'culture_score', 'probability')
+
+
+class QuantileSketch:
+    """Fixed-bin histogram over [low, high]; mergeable by adding counts"""
+
+    def __init__(self, low=0.0, high=100.0, bins=SKETCH_BINS, counts=None):
+        self.low, self.high, self.bins = float(low), float(high), int(bins)
+        self.edges = np.linspace(self.low, self.high, self.bins + 1)
+        self.counts = np.zeros(self.bins, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self._cumulative = None
+
+    def _bin(self, values):
+        # The last edge closes the top bin, so `high` itself lands in it
+        return np.clip(np.searchsorted(self.edges, values, side='right') - 1, 0, self.bins - 1)
+
+    def add(self, values):
+        np.add.at(self.counts, self._bin(np.asarray(values, dtype=float)), 1)
+        self._cumulative = None
+        return self
+
+    def merge(self, other):
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Only sketches with identical bins can be merged")
+        self.counts += other.counts
+        self._cumulative = None
+        return self
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def percentile(self, value):
+        """Mid-rank percentile (0-100): share of values below, plus half of those in the same bin"""
+        if self._cumulative is None:
+            self._cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        total = self._cumulative[-1]
+        if not total:
+            return None
+        i = int(self._bin(value))
+        below, same = self._cumulative[i], self.counts[i]
+        return float((below + same / 2) / total * 100)
+
+    def quantile(self, q):
+        """Lower edge of the bin holding the q-th quantile"""
+        if self._cumulative is None:
+            self._cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        i = int(np.searchsorted(self._cumulative[1:], q * self._cumulative[-1], side='left'))
+        return float(self.edges[min(i, self.bins - 1)])
+
+    def to_dict(self):
+        nonzero = np.flatnonzero(self.counts)
+        return {'low': self.low, 'high': self.high, 'bins': self.bins,
+                'counts': {int(i): int(self.counts[i]) for i in nonzero}}   # Sparse: scores use a dozen bins
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = np.zeros(data['bins'], dtype=np.int64)
+        for i, n in data['counts'].items():
+            counts[int(i)] = n
+        return cls(data['low'], data['high'], data['bins'], counts)
+
+
+class PeerIndex:
+    """One sketch per metric"""
+
+    def __init__(self, sketches=None):
+        self.sketches = sketches or {metric: QuantileSketch() for metric in METRICS}
+
+    @property
+    def count(self):
+        return self.sketches[METRICS[0]].count
+
+    def add(self, scored):
+        """Index rows of a frame with one column per metric"""
+        for metric in METRICS:
+            self.sketches[metric].add(scored[metric].to_numpy())
+        return self
+
+    def merge(self, other):
+        for metric in METRICS:
+            self.sketches[metric].merge(other.sketches[metric])
+        return self
+
+    def percentiles(self, **values):
+        """Percentile rank of each given metric, e.g. percentiles(support_score=75.0)"""
+        return {metric: self.sketches[metric].percentile(value) for metric, value in values.items()}
+
+    def save(self, path=INDEX_PATH):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({metric: sketch.to_dict() for metric, sketch in self.sketches.items()}, f,
+                      separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls({metric: QuantileSketch.from_dict(data[metric]) for metric in METRICS})
+
+
+def load_index(path=INDEX_PATH):
+    """The saved index, or None when training has not produced one"""
+    return PeerIndex.load(path) if os.path.exists(path) else None
+
+
+# --- SCORING SURVEY-FORMAT RESPONSES ---
+def score_inputs(inputs, model, scaler):
+    """Support score, culture score and model probability (%) per advisor input dict"""
+    scores = [calculate_wellness_scores(answers)[:2] for answers in inputs]
+    features = pd.DataFrame([encode_inputs(answers) for answers in inputs])[list(scaler.feature_names_in_)]
+    probability = model.predict_proba(scaler.transform(features))[:, 1] * 100
+    return pd.DataFrame({
+        'support_score': [support for support, _ in scores],
+        'culture_score': [culture for _, culture in scores],
+        'probability': probability,
+    })
+
+
+def build_index(model, scaler, responses):
+    """A fresh index over survey-format responses; returns (index, rows indexed)"""
+    inputs, _ = survey_inputs(responses)
+    return PeerIndex().add(score_inputs(inputs, model, scaler)), len(inputs)
+
+
+def load_served_model():
+    """The model and scaler the advisor serves: compiled_model.npz if present, else the pickles"""
+    if os.path.exists('compiled_model.npz'):
+        from tree_compiler import CompiledEnsemble
+        model = CompiledEnsemble.load('compiled_model.npz')
+        return model, model.scaler
+    with open('best_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open('scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    return model, scaler
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or extend the peer percentile index used by the advisor.")
+    parser.add_argument('--survey', default=SURVEY_PATH)
+    parser.add_argument('--add', metavar='CSV', help='Survey-format responses to merge into the existing index')
+    parser.add_argument('--merge', metavar='JSON', help='Another peer index to merge into the existing one')
+    parser.add_argument('-o', '--output', default=INDEX_PATH)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.add or args.merge:
+        if not os.path.exists(args.output):
+            print(f"ERROR: {args.output} not found; build it first with `python peer_index.py`.", file=sys.stderr)
+            sys.exit(1)
+        index = PeerIndex.load(args.output)
+        before = index.count
+        if args.merge:
+            index.merge(PeerIndex.load(args.merge))
+        if args.add:
+            model, scaler = load_served_model()
+            responses = pd.read_csv(args.add)
+            new_index, used = build_index(model, scaler, responses)
+            index.merge(new_index)
+            print(f"➕ Scored {used} of {len(responses)} responses in '{args.add}'")
+        print(f"✅ Index grew from {before} to {index.count} workplaces -> '{args.output}'")
+    else:
+        model, scaler = load_served_model()
+        index, used = build_index(model, scaler, pd.read_csv(args.survey))
+        print(f"✅ Indexed {used} surveyed workplaces -> '{args.output}'")
+    index.save(args.output)
+    for metric, sketch in index.sketches.items():
+        print(f"   {metric:<14} p25 {sketch.quantile(0.25):5.1f} | p50 {sketch.quantile(0.5):5.1f} | "
+              f"p75 {sketch.quantile(0.75):5.1f}")
@@ -0,0 +1,119 @@
+# =======================================================================================
+# VECTOR CHARTS FOR PDF REPORTS (CACHED SVG RENDERING)
+# =======================================================================================
+#
+# The advisor's gauges and SHAP chart are redrawn here as small SVG documents that FPDF
+# embeds as vector graphics. Rendering is memoized on the (rounded) input values, so
+# repeated and batch reports reuse the same SVG bytes instead of drawing them again.
+
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+Chart = namedtuple('Chart', ['svg', 'width_mm', 'height_mm'])
+
+MM_PER_PX = 0.3
+SCORE_BANDS = ((0, 50, '#d3d3d3'), (50, 80, '#ffff00'), (80, 100, '#008000'))
+RISK_BANDS = ((0, 30, '#2ed573'), (30, 70, '#ffa502'), (70, 100, '#ff4757'))
+SHAP_POSITIVE = '#ff0051'
+SHAP_NEGATIVE = '#008bfb'
+
+
+def _point(cx, cy, r, value):
+    """Position of `value` (0-100) on a semicircle opening downward"""
+    angle = math.pi * (1 - value / 100)
+    return cx + r * math.cos(angle), cy - r * math.sin(angle)
+
+
+def _arc(cx, cy, r, start, end, color, width):
+    # Drawn as two segments: a single near-180 degree arc is numerically unstable once rounded
+    x1, y1 = _point(cx, cy, r, start)
+    xm, ym = _point(cx, cy, r, (start + end) / 2)
+    x2, y2 = _point(cx, cy, r, end)
+    return (f'<path d="M {x1:.2f} {y1:.2f} A {r} {r} 0 0 1 {xm:.2f} {ym:.2f} A {r} {r} 0 0 1 {x2:.2f} {y2:.2f}" '
+            f'fill="none" stroke="{color}" stroke-width="{width}"/>')
+
+
+def _gauge(cx, value, title, bar_color, bands, threshold, threshold_color):
+    cy, r = 170, 100
+    parts = [_arc(cx, cy, r, lo, hi, color, 36) for lo, hi, color in bands]
+    if value > 0:
+        parts.append(_arc(cx, cy, r, 0, min(value, 100), bar_color, 14))
+    (tx1, ty1), (tx2, ty2) = _point(cx, cy, r - 18, threshold), _point(cx, cy, r + 18, threshold)
+    parts.append(f'<line x1="{tx1:.2f}" y1="{ty1:.2f}" x2="{tx2:.2f}" y2="{ty2:.2f}" '
+                 f'stroke="{threshold_color}" stroke-width="4"/>')
+    parts.append(f'<text x="{cx}" y="30" font-size="16" text-anchor="middle" '
+                 f'font-family="Helvetica" fill="#333333">{title}</text>')
+    parts.append(f'<text x="{cx}" y="{cy - 10}" font-size="34" text-anchor="middle" '
+                 f'font-family="Helvetica" fill="#222222">{value:.1f}</text>')
+    return ''.join(parts)
+
+
+def _svg(width, height, body):
+    svg = (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+           f'viewBox="0 0 {width} {height}">{body}</svg>').encode('utf-8')
+    return Chart(svg, width * MM_PER_PX, height * MM_PER_PX)
+
+
+@lru_cache(maxsize=2048)
+def _wellness_gauges_svg(support_score, culture_score):
+    body = (_gauge(150, support_score, "Support Score", '#00008b', SCORE_BANDS, 90, '#ff0000')
+            + _gauge(450, culture_score, "Culture Score", '#006400', SCORE_BANDS, 90, '#ff0000'))
+    return _svg(600, 190, body)
+
+
+@lru_cache(maxsize=2048)
+def _risk_gauge_svg(confidence, high_risk):
+    title = f"Risk Assessment: {'High Risk' if high_risk else 'Low Risk'}"
+    bar_color = '#ff4757' if high_risk else '#2ed573'
+    return _svg(300, 190, _gauge(150, confidence, title, bar_color, RISK_BANDS, 85, '#000000'))
+
+
+@lru_cache(maxsize=4096)
+def _shap_bars_svg(contributions):
+    row, label_w, bar_w = 24, 190, 280
+    width, height = label_w + bar_w + 70, row * len(contributions) + 40
+    scale = bar_w / 2 / (max(abs(v) for _, v in contributions) or 1)
+    zero = label_w + bar_w / 2
+    parts = [f'<line x1="{zero}" y1="10" x2="{zero}" y2="{height - 20}" stroke="#999999" stroke-width="1"/>']
+    for i, (feature, value) in enumerate(contributions):
+        y = 14 + i * row
+        x, w = (zero, value * scale) if value >= 0 else (zero + value * scale, -value * scale)
+        color = SHAP_POSITIVE if value >= 0 else SHAP_NEGATIVE
+        parts.append(f'<text x="{label_w - 8}" y="{y + 14}" font-size="12" text-anchor="end" '
+                     f'font-family="Helvetica" fill="#333333">{feature}</text>')
+        parts.append(f'<rect x="{x:.2f}" y="{y}" width="{max(w, 0.5):.2f}" height="{row - 8}" fill="{color}"/>')
+        # Value label sits on the opposite side of the zero line so it never collides with feature names
+        text_x, anchor = (zero - 6, 'end') if value >= 0 else (zero + 6, 'start')
+        parts.append(f'<text x="{text_x:.2f}" y="{y + 13}" font-size="11" text-anchor="{anchor}" '
+                     f'font-family="Helvetica" fill="#333333">{value:+.3f}</text>')
+    parts.append(f'<text x="{zero}" y="{height - 4}" font-size="11" text-anchor="middle" font-family="Helvetica" '
+                 f'fill="#666666">SHAP contribution (red raises, blue lowers treatment likelihood)</text>')
+    return _svg(width, height, ''.join(parts))
+
+
+# --- PUBLIC API ---
+# Inputs are rounded to the precision shown on the chart so near-identical values share a cache entry
+def wellness_gauges_chart(support_score, culture_score):
+    """Support and culture gauges, matching create_wellness_dashboard"""
+    return _wellness_gauges_svg(round(support_score, 1), round(culture_score, 1))
+
+
+def risk_gauge_chart(confidence, high_risk):
+    """Model probability gauge, matching create_risk_assessment_viz"""
+    return _risk_gauge_svg(round(confidence, 1), bool(high_risk))
+
+
+def shap_bar_chart(contributions, top_k=8):
+    """Horizontal bars for the `top_k` largest SHAP contributions ({feature: value})"""
+    top = sorted(contributions.items(), key=lambda item: abs(item[1]), reverse=True)[:top_k]
+    return _shap_bars_svg(tuple((feature, round(float(value), 3)) for feature, value in top))
+
+
+def cache_info():
+    """Hit/miss counters for each chart cache"""
+    return {
+        'wellness_gauges': _wellness_gauges_svg.cache_info(),
+        'risk_gauge': _risk_gauge_svg.cache_info(),
+        'shap_bars': _shap_bars_svg.cache_info(),
+    }
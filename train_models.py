@@ -1,11 +1,12 @@
+import os
 import pandas as pd
 import pickle
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
 from xgboost import XGBClassifier
-from sklearn.svm import SVC
 from sklearn.ensemble import RandomForestClassifier
+from kernel_svm import make_kernel_svm
 import shap
 
 CLEAN_DATA_PATH = 'cleaned_data.csv'
@@ -20,7 +21,7 @@ X_test_scaled = scaler.transform(X_test)
 
 models = {
     'XGBoost': XGBClassifier(random_state=42, eval_metric='logloss'),
-    'SVM': SVC(probability=True, random_state=42),
+    'SVM': make_kernel_svm(random_state=42),
     'Random Forest': RandomForestClassifier(random_state=42)
 }
 
@@ -40,6 +41,59 @@ with open('best_model.pkl', 'wb') as f: pickle.dump(best_model_object, f)
 print("✅ Model saved to 'best_model.pkl'")
 with open('scaler.pkl', 'wb') as f: pickle.dump(scaler, f)
 print("✅ Scaler saved to 'scaler.pkl'")
-explainer = shap.Explainer(best_model_object)
+is_tree_model = best_model_name != 'SVM'
+if is_tree_model:
+    explainer = shap.Explainer(best_model_object)
+else:
+    # Kernel models have no tree structure to walk: explain predict_proba against a background sample
+    background = shap.maskers.Independent(X_train_scaled, max_samples=100)
+    explainer = shap.Explainer(best_model_object.predict_proba, background, feature_names=list(X.columns))
 with open('shap_explainer.pkl', 'wb') as f: pickle.dump(explainer, f)
-print("✅ SHAP explainer saved to 'shap_explainer.pkl'")
\ No newline at end of file
+print("✅ SHAP explainer saved to 'shap_explainer.pkl'")
+if is_tree_model:
+    from tree_compiler import compile_ensemble, parity_inputs, ship_compiled
+    compiled = compile_ensemble(best_model_object, scaler)
+    shipped, parity = ship_compiled(best_model_object, compiled, parity_inputs(CLEAN_DATA_PATH, list(X.columns), 20_000),
+                                    scaler, explainer)
+    if shipped:
+        print(f"✅ Compiled model saved to 'compiled_model.npz' (parity: {parity})")
+    else:
+        print(f"⚠️ Compiled model failed parity or was not faster; serving the pickle (parity: {parity})")
+elif os.path.exists('compiled_model.npz'):
+    os.remove('compiled_model.npz')  # The advisor would otherwise keep serving the previous tree model
+    print("🗑️ Removed stale 'compiled_model.npz'")
+
+print("\n--- Distilling a Compact Student ---")
+from distill import MIN_AGREEMENT, TEACHER_PATH, distill, format_report, ship_student
+student, compiled_student, report = distill(best_model_object, scaler, X_train, X_test)
+print(f"🎓 {format_report(report)}")
+served_model, served_explainer = best_model_object, explainer
+if report['agreement_test_rows'] >= MIN_AGREEMENT:
+    served_model, served_explainer = student, ship_student(best_model_object, student, compiled_student, X_train_scaled)
+    print(f"✅ Student now served from 'best_model.pkl' (compiled when it passes parity); teacher saved to '{TEACHER_PATH}'")
+else:
+    if os.path.exists(TEACHER_PATH):
+        os.remove(TEACHER_PATH)  # Belongs to an earlier training run
+    print(f"⚠️ Agreement below {MIN_AGREEMENT * 100:.1f}%: serving the teacher")
+
+print("\n--- Global SHAP Summary ---")
+from shap_summary import SUMMARY_PATH, build_summary, save_summary
+summary = build_summary(served_model, served_explainer, scaler, X)
+save_summary(summary)
+print(f"✅ Summary of {summary['rows']} explained rows saved to '{SUMMARY_PATH}'")
+
+print("\n--- Peer Indexes ---")
+from peer_index import INDEX_PATH, SURVEY_PATH, build_index
+peer_index, indexed = build_index(served_model, scaler, pd.read_csv(SURVEY_PATH))
+peer_index.save()
+print(f"✅ {indexed} surveyed workplaces indexed in '{INDEX_PATH}'")
+from similar_workplaces import INDEX_PATH as SIMILAR_PATH, build_index as build_similar_index
+similar_index = build_similar_index(pd.read_csv(SURVEY_PATH), list(scaler.feature_names_in_))
+similar_index.save()
+print(f"✅ {len(similar_index)} profiles saved for similar-workplace lookups in '{SIMILAR_PATH}'")
+
+print("\n--- Drift Reference ---")
+from drift_monitor import MONITOR_PATH, build_monitor
+drift_monitor = build_monitor(pd.read_csv(SURVEY_PATH))
+drift_monitor.save()
+print(f"✅ Input histograms of {drift_monitor.reference_rows} surveyed workplaces saved to '{MONITOR_PATH}'; live counts cleared")
\ No newline at end of file
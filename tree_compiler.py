@@ -0,0 +1,570 @@
+# =======================================================================================
+# TREE-ENSEMBLE COMPILER: SKLEARN FORESTS / XGBOOST -> FLAT NUMPY ARRAYS
+# =======================================================================================
+#
+# Usage:
+#   python tree_compiler.py                                 # best_model.pkl + scaler.pkl
+#   python tree_compiler.py --model best_model.pkl -o compiled_model.npz --rows 1000000
+#
+# Every tree of the trained ensemble is flattened into shared node arrays (feature,
+# threshold, left, right) plus a table of leaf outputs, and saved together with the
+# scaler's parameters as a plain .npz file. Prediction is a level-synchronous traversal:
+# all rows advance through all trees one level per step, so a single row and a million
+# rows go through the same handful of vectorized NumPy operations. Leaves point to
+# themselves, which lets finished paths idle while deeper ones catch up.
+# Serving from the .npz needs only NumPy; sklearn and xgboost are needed to compile.
+#
+# Random forests reproduce sklearn's arithmetic step by step (float32 features, `<=`
+# against float64 thresholds, per-tree class fractions summed in estimator order, then
+# divided by the tree count), so their probabilities are bit-identical. XGBoost margins are
+# bit-identical too: leaf values are added in float32 in tree order onto the base margin,
+# which is derived from base_score in float32 as the booster does. XGBoost probabilities
+# then go through the C library's expf, which NumPy does not expose; they match to within
+# XGB_PROBA_TOLERANCE (one float32 ulp at 1.0) and predicted classes are identical.
+# parity_ok() applies these criteria; train_models.py serves the compiled model only when
+# it passes them and answers one row faster than the original model.
+# The compiled model is built for serving single rows and small batches. For bulk scoring
+# where xgboost is installed, its multithreaded C++ predictor remains faster.
+#
+# The advisor also explains every prediction, and unpickling shap's TreeExplainer would pull
+# shap and the training library back into the request. The compiled model therefore keeps
+# each node's training cover and reproduces the explainers train_models.py and distill.py
+# build (use_explainer() copies their settings):
+#   - tree_path_dependent: each leaf's value is shared among the distinct features on its
+#     path, weighted by the cover of the branches x does not take. Per leaf this is a
+#     polynomial in the coalition size, so all leaves with the same number of path features
+#     are explained together in a few vectorized passes.
+#   - interventional: exact Shapley values against each background row, rescaled per row to
+#     probabilities for model_output='probability', as shap does.
+# shap keeps leaf values and weights in float32, so results agree to within SHAP_TOLERANCE.
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+CHUNK_PATHS = 400_000      # (row, tree) paths advanced together; small enough for the working set to stay in cache
+LEAF_CHECK_EVERY = 4       # Levels between compactions of the finished paths
+XGB_PROBA_TOLERANCE = float(np.finfo(np.float32).eps)
+SHAP_TOLERANCE = 1e-5      # The advisor shows contributions to 3 decimals
+SHAP_PARITY_ROWS = 500     # Rows explained by both implementations in verify_parity()
+
+
+class StandardScaling:
+    """NumPy copy of a fitted StandardScaler (same operations, same bits)"""
+
+    def __init__(self, mean, scale, feature_names):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.feature_names_in_ = feature_names
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+class CompiledEnsemble:
+    """Flat-array tree ensemble with the predict/predict_proba interface of the original model"""
+
+    def __init__(self, kind, feature, threshold, left, right, leaf_value, roots, max_depth, classes,
+                 base_margin=0.0, scaler=None, cover=None):
+        self.kind = kind                  # 'forest' (averaged class fractions) or 'xgboost' (summed margins)
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value      # forest: (nodes, classes) fractions; xgboost: (nodes,) margins
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.base_margin = base_margin
+        self.scaler = scaler
+        self.cover = cover                # Training weight reaching each node; needed for SHAP values
+        self.feature_perturbation = None  # Set by use_explainer(); None means no SHAP values
+        self.model_output = 'raw'
+        self.background = None
+        self._paths = None
+        # Traversal layout: node i is addressed as 2i, so the right child's slot is 2i + 1 and
+        # `slot + (x > t)` picks the branch without a multiply; per-node arrays are repeated to match
+        self._slot_child = np.column_stack([left, right]).ravel().astype(np.intp) * 2
+        self._slot_feature = np.repeat(feature.astype(np.intp), 2)
+        self._slot_threshold = np.repeat(threshold, 2)
+        self._slot_is_leaf = np.repeat(left == np.arange(len(left)), 2)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (rows, trees)"""
+        X = np.asarray(X, dtype=np.float32)  # Both libraries compare float32 feature values
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if np.isnan(X).any():
+            raise ValueError("Compiled ensembles do not support missing values")
+        X = X.astype(self.threshold.dtype)  # Exact widening, so the comparison below is unmixed
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.intp)
+        step = max(1, CHUNK_PATHS // self.n_trees)
+        for start in range(0, X.shape[0], step):
+            self._apply_chunk(X[start:start + step], leaves[start:start + step].reshape(-1))
+        return leaves
+
+    def _apply_chunk(self, rows, out):
+        n_rows, n_features = rows.shape
+        values = rows.ravel()
+        slots = np.tile(self.roots.astype(np.intp) * 2, n_rows)                  # Flattened (row, tree) paths
+        row_base = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        position = np.arange(slots.size, dtype=np.intp)
+        level = 0
+        while slots.size:                                                        # One tree level per step
+            go_right = values.take(self._slot_feature.take(slots) + row_base) > self._slot_threshold.take(slots)
+            slots = self._slot_child.take(slots + go_right)
+            level += 1
+            if level % LEAF_CHECK_EVERY == 0 or level >= self.max_depth:
+                done = self._slot_is_leaf.take(slots)                            # Leaves loop onto themselves,
+                out[position[done]] = slots[done] // 2                           # so checking every few levels
+                keep = ~done                                                     # is enough
+                slots, row_base, position = slots[keep], row_base[keep], position[keep]
+
+    def _tree_sum(self, leaves, start):
+        """`start` plus the leaf values of every tree, added one tree at a time in tree order
+
+        np.cumsum accumulates strictly left to right (unlike np.sum's pairwise reduction), so
+        it rounds exactly like the libraries' per-tree `+=` loops, in one call per chunk.
+        """
+        total = np.empty((leaves.shape[0],) + self.leaf_value.shape[1:], dtype=self.leaf_value.dtype)
+        step = max(1, CHUNK_PATHS // self.n_trees)
+        for begin in range(0, leaves.shape[0], step):
+            values = self.leaf_value[leaves[begin:begin + step]]                # (rows, trees[, classes])
+            first = np.broadcast_to(np.asarray(start, dtype=values.dtype), values[:, :1].shape)
+            total[begin:begin + step] = np.cumsum(np.concatenate([first, values], axis=1), axis=1)[:, -1]
+        return total
+
+    def decision_margin(self, X):
+        """XGBoost only: raw margin (log-odds), accumulated in float32 in tree order like the booster"""
+        return self._tree_sum(self.apply(X), self.base_margin)
+
+    def predict_proba(self, X):
+        if self.kind == 'xgboost':
+            # The booster's sigmoid uses the C library's expf; a float64 exp rounded to float32
+            # matches it except in rare last-bit cases (see XGB_PROBA_TOLERANCE)
+            one = np.float32(1)
+            positive = one / (one + np.exp(-self.decision_margin(X).astype(np.float64)).astype(np.float32))
+            return np.column_stack([one - positive, positive])
+        proba = self._tree_sum(self.apply(X), 0.0)  # Summed in estimator order, as sklearn accumulates it
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    # --- SHAP VALUES ---
+    def use_explainer(self, explainer):
+        """Copy a shap TreeExplainer's settings; returns False when they cannot be reproduced"""
+        perturbation = getattr(explainer, 'feature_perturbation', None)
+        output = getattr(explainer, 'model_output', None)
+        outputs = ('raw', 'probability') if self.kind == 'xgboost' and perturbation == 'interventional' else ('raw',)
+        if self.cover is None or perturbation not in ('tree_path_dependent', 'interventional') or output not in outputs:
+            return False
+        self.feature_perturbation = perturbation
+        self.model_output = output
+        self.background = np.asarray(explainer.data, dtype=np.float64) if perturbation == 'interventional' else None
+        return True
+
+    @property
+    def explains(self):
+        return self.feature_perturbation is not None
+
+    def shap_values(self, X):
+        """Positive-class SHAP values and base values, shaped (rows, features) and (rows,)
+
+        Same layout as shap_summary.positive_class() applied to the adopted explainer's output.
+        """
+        if not self.explains:
+            raise ValueError("No explainer settings; call use_explainer() before compiling")
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)  # Compared like apply() compares
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if self._paths is None:
+            self._paths = self._leaf_paths()
+        # Forests explain the averaged positive-class fraction, XGBoost the margin
+        leaf_value = (self.leaf_value[:, 1] / self.n_trees if self.kind == 'forest'
+                      else self.leaf_value.astype(np.float64))
+        explain = self._path_dependent if self.feature_perturbation == 'tree_path_dependent' else self._interventional
+        values, base_values = zip(*(explain(x, leaf_value) for x in X))
+        return np.array(values), np.array(base_values)
+
+    def _leaf_paths(self):
+        """Leaves grouped by their number d of distinct path features
+
+        For each d: the leaf nodes and (d, leaves) arrays of path feature, bounds and cover
+        fraction. x follows a leaf's path on feature j iff lo < x_j <= hi, and the cover
+        fraction is the share of training weight that kept to the path at splits on j.
+        """
+        n_features = int(self.feature.max()) + 1
+        nodes = self.roots.astype(np.intp)
+        lo = np.full((len(nodes), n_features), -np.inf)
+        hi = np.full((len(nodes), n_features), np.inf)
+        zero = np.ones((len(nodes), n_features))
+        on_path = np.zeros((len(nodes), n_features), dtype=bool)
+        leaves = []
+        while nodes.size:                                                         # One tree level per step
+            is_leaf = self.left[nodes] == nodes
+            leaves.append((nodes[is_leaf], lo[is_leaf], hi[is_leaf], zero[is_leaf], on_path[is_leaf]))
+            nodes, lo, hi, zero, on_path = (a[~is_leaf] for a in (nodes, lo, hi, zero, on_path))
+            rows, feature, threshold = np.arange(nodes.size), self.feature[nodes], self.threshold[nodes]
+            children = []
+            for child, bound in ((self.left[nodes], hi), (self.right[nodes], lo)):
+                child_bound, child_zero, child_on = bound.copy(), zero.copy(), on_path.copy()
+                clip = np.minimum if bound is hi else np.maximum
+                child_bound[rows, feature] = clip(bound[rows, feature], threshold)
+                child_zero[rows, feature] *= self.cover[child] / self.cover[nodes]
+                child_on[rows, feature] = True
+                children.append((child, child_bound, child_zero, child_on))
+            (left, hi_left, zero_left, on_left), (right, lo_right, zero_right, on_right) = children
+            nodes = np.concatenate([left, right]).astype(np.intp)
+            lo, hi = np.concatenate([lo, lo_right]), np.concatenate([hi_left, hi])
+            zero, on_path = np.concatenate([zero_left, zero_right]), np.concatenate([on_left, on_right])
+        nodes, lo, hi, zero, on_path = (np.concatenate(a) for a in zip(*leaves))
+        depth = on_path.sum(axis=1)
+        groups = {}
+        for d in np.unique(depth):
+            rows = depth == d
+            on, d = on_path[rows], int(d)
+            feature = np.nonzero(on)[1].reshape(len(on), d)                     # Not -1: d is 0 for single-leaf trees
+            groups[d] = (nodes[rows], feature.T.copy(),
+                         *(a[rows][on].reshape(len(on), d).T.copy() for a in (lo, hi, zero)))
+        return groups
+
+    def _path_dependent(self, x, leaf_value):
+        values, base_value = np.zeros(len(x)), 0.0
+        for d, (nodes, feature, lo, hi, zero) in self._paths.items():
+            value = leaf_value[nodes]
+            base_value += (value * zero.prod(axis=0)).sum()
+            if d == 0:
+                continue
+            follows = (x[feature] > lo) & (x[feature] <= hi)                      # (d, leaves)
+            # Coefficient s of prod_j (zero_j + follows_j * t) sums the coalitions of size s
+            poly = np.zeros((d + 1, nodes.size))
+            poly[0] = 1.0
+            for j in range(d):
+                poly[1:j + 2] = poly[1:j + 2] * zero[j] + poly[:j + 1] * follows[j]
+                poly[0] *= zero[j]
+            weights = _shapley_weights(d)
+            # Leave feature i out by dividing its factor back out: a constant when x does not
+            # follow the path on i, else (zero_i + t), by synthetic division from the top
+            strays = (weights @ poly[:d]) / zero
+            quotient = np.broadcast_to(poly[d], (d, nodes.size)).copy()
+            keeps = quotient * weights[d - 1]
+            for k in range(d - 1, 0, -1):
+                quotient = poly[k] - zero * quotient
+                keeps += quotient * weights[k - 1]
+            contribution = value * (follows - zero) * np.where(follows, keeps, strays)
+            values += np.bincount(feature.ravel(), weights=contribution.ravel(), minlength=len(x))
+        return values, base_value + float(self.base_margin)
+
+    def _interventional(self, x, leaf_value):
+        background = self.background.astype(np.float32).astype(np.float64)
+        n_refs, n_features = background.shape
+        values, reference_out = np.zeros((n_refs, n_features)), np.zeros(n_refs)
+        for d, (nodes, feature, lo, hi, _) in self._paths.items():
+            value = leaf_value[nodes]
+            x_follows = (x[feature] > lo) & (x[feature] <= hi)                    # (d, leaves)
+            r_values = background[:, feature]
+            r_follows = (r_values > lo) & (r_values <= hi)                        # (refs, d, leaves)
+            reference_out += (r_follows.all(axis=1) * value).sum(axis=1)
+            if d == 0:
+                continue
+            # The leaf is reached iff every feature only x follows is taken from x and every
+            # feature only r follows is taken from r: a unanimity game on those features
+            from_x, from_r = x_follows & ~r_follows, ~x_follows & r_follows
+            reached = (x_follows | r_follows).all(axis=1) * value
+            a, b = from_x.sum(axis=1), from_r.sum(axis=1)
+            factorial = _factorials(d)
+            gain = np.where(a > 0, factorial[np.maximum(a - 1, 0)] * factorial[b] / factorial[a + b], 0.0) * reached
+            loss = np.where(b > 0, factorial[a] * factorial[np.maximum(b - 1, 0)] / factorial[a + b], 0.0) * reached
+            contribution = from_x * gain[:, np.newaxis] - from_r * loss[:, np.newaxis]
+            index = np.arange(n_refs)[:, np.newaxis, np.newaxis] * n_features + feature
+            values += np.bincount(index.ravel(), weights=contribution.ravel(),
+                                  minlength=n_refs * n_features).reshape(n_refs, n_features)
+        reference_out += float(self.base_margin)
+        if self.model_output != 'probability':
+            return values.mean(axis=0), reference_out.mean()
+        x_out = float(self.decision_margin(x)[0])
+        x_proba, reference_proba = _sigmoid(x_out), _sigmoid(reference_out)
+        delta = x_out - reference_out
+        rescale = np.divide(x_proba - reference_proba, delta, out=np.ones(n_refs), where=delta != 0)
+        return (values * rescale[:, np.newaxis]).mean(axis=0), reference_proba.mean()
+
+    # --- PERSISTENCE ---
+    def save(self, path):
+        scaler = self.scaler
+        arrays = dict(
+            kind=np.array(self.kind), feature=self.feature, threshold=self.threshold, left=self.left,
+            right=self.right, leaf_value=self.leaf_value, roots=self.roots, max_depth=np.array(self.max_depth),
+            classes=self.classes_, base_margin=np.array(self.base_margin, dtype=np.float32),
+        )
+        if self.cover is not None:
+            arrays['cover'] = self.cover
+        if self.explains:
+            arrays['feature_perturbation'] = np.array(self.feature_perturbation)
+            arrays['model_output'] = np.array(self.model_output)
+            if self.background is not None:
+                arrays['background'] = self.background
+        if scaler is not None:
+            arrays['feature_names'] = np.asarray(scaler.feature_names_in_, dtype=str)
+            for name in ('mean_', 'scale_'):
+                if getattr(scaler, name) is not None:
+                    arrays[f'scaler_{name.rstrip("_")}'] = getattr(scaler, name)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            scaler = None
+            if 'feature_names' in data:
+                scaler = StandardScaling(
+                    data['scaler_mean'] if 'scaler_mean' in data else None,
+                    data['scaler_scale'] if 'scaler_scale' in data else None,
+                    data['feature_names'].astype(object),
+                )
+            compiled = cls(
+                str(data['kind']), data['feature'], data['threshold'], data['left'], data['right'],
+                data['leaf_value'], data['roots'], int(data['max_depth']), data['classes'],
+                np.float32(data['base_margin']), scaler, data['cover'] if 'cover' in data else None,
+            )
+            if 'feature_perturbation' in data:
+                compiled.feature_perturbation = str(data['feature_perturbation'])
+                compiled.model_output = str(data['model_output'])
+                compiled.background = data['background'] if 'background' in data else None
+            return compiled
+
+
+def _factorials(n):
+    return np.array([math.factorial(k) for k in range(n + 1)], dtype=np.float64)
+
+
+def _shapley_weights(d):
+    """s! (d - s - 1)! / d! for coalitions of s = 0 .. d - 1 of the other players"""
+    factorial = _factorials(d)
+    return factorial[:d] * factorial[d - 1::-1] / factorial[d]
+
+
+def _sigmoid(margin):
+    return 1.0 / (1.0 + np.exp(-margin))
+
+
+# --- COMPILERS ---
+def _link(trees):
+    """Concatenate per-tree node arrays, offsetting child indices; leaves (child -1) point to themselves"""
+    feature, threshold, left, right, leaf_value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree_feature, tree_threshold, tree_left, tree_right, tree_value in trees:
+        n = len(tree_feature)
+        own = np.arange(offset, offset + n)
+        is_leaf = tree_left < 0
+        feature.append(np.where(is_leaf, 0, tree_feature))
+        threshold.append(tree_threshold)
+        left.append(np.where(is_leaf, own, tree_left + offset))
+        right.append(np.where(is_leaf, own, tree_right + offset))
+        leaf_value.append(tree_value)
+        roots.append(offset)
+        offset += n
+    return (np.concatenate(feature).astype(np.intp), np.concatenate(threshold), np.concatenate(left).astype(np.int32),
+            np.concatenate(right).astype(np.int32), np.concatenate(leaf_value), np.array(roots, dtype=np.int32))
+
+
+def _compile_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :len(model.classes_)]
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        trees.append((tree.feature, tree.threshold, tree.children_left, tree.children_right, value / normalizer))
+    depth = max(estimator.tree_.max_depth for estimator in model.estimators_)
+    cover = np.concatenate([estimator.tree_.weighted_n_node_samples for estimator in model.estimators_])
+    return CompiledEnsemble('forest', *_link(trees), depth, np.asarray(model.classes_), cover=cover)
+
+
+def _compile_xgboost(model):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    if learner['objective']['name'] != 'binary:logistic':
+        raise TypeError(f"Unsupported XGBoost objective {learner['objective']['name']}")
+    base_score = np.float32(learner['learner_model_param']['base_score'].strip('[]'))
+    trees, cover, depth = [], [], 0
+    for tree in learner['gradient_booster']['model']['trees']:
+        left = np.array(tree['left_children'])
+        right = np.array(tree['right_children'])
+        conditions = np.array(tree['split_conditions'], dtype=np.float32)
+        is_leaf = left < 0
+        # XGBoost splits on x < t; for float32 that is x <= the next float32 below t
+        threshold = np.where(is_leaf, np.inf, np.nextafter(conditions, np.float32(-np.inf))).astype(np.float32)
+        trees.append((np.array(tree['split_indices']), threshold, left, right, np.where(is_leaf, conditions, 0)))
+        cover.append(np.array(tree['sum_hessian'], dtype=np.float64))
+        depth = max(depth, _tree_depth(left, right))
+    # ProbToMargin in float32 arithmetic, as the booster computes it: -log(1/p - 1)
+    base_margin = -np.log(np.float32(1) / base_score - np.float32(1))
+    linked = _link(trees)
+    return CompiledEnsemble('xgboost', *linked[:4], linked[4].astype(np.float32), linked[5], depth,
+                            np.asarray(model.classes_), base_margin, cover=np.concatenate(cover))
+
+
+def _tree_depth(left, right):
+    depth, level = 0, [0]
+    while level:
+        level = [child for node in level for child in (left[node], right[node]) if child >= 0]
+        depth += bool(level)
+    return depth
+
+
+def compile_ensemble(model, scaler=None):
+    """Compile a fitted RandomForest/ExtraTrees classifier or binary XGBClassifier"""
+    if type(model).__name__ == 'XGBClassifier':
+        compiled = _compile_xgboost(model)
+    elif hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):
+        compiled = _compile_forest(model)
+    else:
+        raise TypeError(f"{type(model).__name__} is not a supported tree ensemble")
+    if scaler is not None:
+        compiled.scaler = StandardScaling(scaler.mean_, scaler.scale_, np.asarray(scaler.feature_names_in_, dtype=object))
+    return compiled
+
+
+def verify_parity(model, compiled, X, scaler=None, explainer=None):
+    """Compare against the original model; returns a dict of exact-match flags and the largest difference
+
+    With `explainer`, the compiled model adopts its settings when it can reproduce them, and
+    SHAP values of the first SHAP_PARITY_ROWS rows are compared as well.
+    """
+    report = {}
+    if scaler is not None:
+        report['scaler_exact'] = np.array_equal(compiled.scaler.transform(X), scaler.transform(X))
+        X = scaler.transform(X)
+    expected, actual = model.predict_proba(X), compiled.predict_proba(X)
+    report['proba_exact'] = np.array_equal(expected, actual)
+    report['proba_max_diff'] = float(np.max(np.abs(expected - actual)))
+    report['predict_exact'] = np.array_equal(model.predict(X), compiled.predict(X))
+    if compiled.kind == 'xgboost':
+        report['margin_exact'] = np.array_equal(model.predict(X, output_margin=True), compiled.decision_margin(X))
+    if explainer is not None:
+        report['shap_supported'] = compiled.use_explainer(explainer)
+        if report['shap_supported']:
+            from shap_summary import positive_class
+            rows = np.asarray(X)[:SHAP_PARITY_ROWS]
+            expected, actual = positive_class(explainer(rows)), compiled.shap_values(rows)
+            report['shap_max_diff'] = float(max(np.max(np.abs(e - a)) for e, a in zip(expected, actual)))
+    return report
+
+
+def parity_ok(report):
+    """Whether a verify_parity report meets the guarantees in the header"""
+    required = [key for key in report if key.endswith('_exact')]
+    if 'margin_exact' in report:
+        required.remove('proba_exact')
+        if report['proba_max_diff'] > XGB_PROBA_TOLERANCE:
+            return False
+    if report.get('shap_max_diff', 0.0) > SHAP_TOLERANCE:
+        return False
+    return all(report[key] for key in required)
+
+
+def single_row_seconds(predict_proba, X, rounds=50):
+    """Mean wall time of predict_proba on one row, after a warm-up call"""
+    one_row = X[:1]
+    predict_proba(one_row)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        predict_proba(one_row)
+    return (time.perf_counter() - start) / rounds
+
+
+def ship_compiled(model, compiled, X, scaler=None, explainer=None, path='compiled_model.npz'):
+    """Save `compiled` for serving only if it passes parity on X and answers one row faster than `model`
+
+    Otherwise `path` is removed, so the advisor falls back to the pickled model. With the
+    served `explainer`, the saved model also computes SHAP values when it can reproduce them
+    (report['shap_supported']); the advisor then never unpickles the explainer. Returns
+    (shipped, parity report with the single-row timings added).
+    """
+    report = verify_parity(model, compiled, X, scaler, explainer)
+    X_scaled = scaler.transform(X) if scaler is not None else np.asarray(X)
+    report['original_ms'] = single_row_seconds(model.predict_proba, X_scaled) * 1000
+    report['compiled_ms'] = single_row_seconds(compiled.predict_proba, X_scaled) * 1000
+    shipped = parity_ok(report) and report['compiled_ms'] < report['original_ms']
+    if shipped:
+        compiled.save(path)
+    elif os.path.exists(path):
+        os.remove(path)
+    return shipped, report
+
+
+# --- CLI: COMPILE, VERIFY AND BENCHMARK ---
+def parity_inputs(data_path, columns, rows, seed=0):
+    """The training data plus `rows` resampled rows with every feature value drawn from its observed values"""
+    import pandas as pd
+    data = pd.read_csv(data_path)[columns]
+    rng = np.random.default_rng(seed)
+    synthetic = pd.DataFrame({col: rng.choice(data[col].to_numpy(), rows) for col in columns})
+    return pd.concat([data, synthetic], ignore_index=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile the trained tree ensemble into a NumPy-only .npz model.")
+    parser.add_argument('--model', default='best_model.pkl')
+    parser.add_argument('--scaler', default='scaler.pkl')
+    parser.add_argument('--explainer', default='shap_explainer.pkl', help='SHAP explainer to reproduce, if present')
+    parser.add_argument('-o', '--output', default='compiled_model.npz')
+    parser.add_argument('--data', default='cleaned_data.csv', help='Rows used for the parity check')
+    parser.add_argument('--rows', type=int, default=100_000, help='Extra synthetic rows for the parity check')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    import pickle
+    args = parse_args()
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    with open(args.scaler, 'rb') as f:
+        scaler = pickle.load(f)
+    explainer = None
+    if os.path.exists(args.explainer):
+        with open(args.explainer, 'rb') as f:
+            explainer = pickle.load(f)
+
+    start = time.perf_counter()
+    compiled = compile_ensemble(model, scaler)
+    if explainer is not None and not compiled.use_explainer(explainer):
+        print(f"⚠️ {type(explainer).__name__} settings are not reproducible; the advisor will unpickle '{args.explainer}'")
+    compiled.save(args.output)
+    print(f"🌲 Compiled {type(model).__name__}: {compiled.n_trees} trees, {len(compiled.feature)} nodes, "
+          f"depth {compiled.max_depth} in {time.perf_counter() - start:.2f}s -> '{args.output}' "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+    compiled = CompiledEnsemble.load(args.output)
+    X = parity_inputs(args.data, list(scaler.feature_names_in_), args.rows)
+    report = verify_parity(model, compiled, X, scaler, explainer)
+    passed = parity_ok(report)
+    print(f"{'✅' if passed else '❌'} Parity on {len(X)} rows: {report}")
+    if not passed:
+        os.remove(args.output)  # The advisor must not serve a model that disagrees with the original
+        print(f"🗑️ Removed '{args.output}'")
+
+    X_scaled = scaler.transform(X)
+    for label, fn in (('original', model.predict_proba), ('compiled', compiled.predict_proba)):
+        single = single_row_seconds(fn, X_scaled)
+        t = time.perf_counter()
+        fn(X_scaled)
+        bulk = time.perf_counter() - t
+        print(f"⚡ {label:<9} 1 row {single * 1000:7.2f} ms | {len(X_scaled)} rows {bulk:6.2f}s")
+    sys.exit(0 if passed else 1)